@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Marcus 策略回测 - 在历史日线上重放评分、市场立场与入场/止损规则
+全部按 (日期 × 股票) 矩阵向量化计算，不逐根 K 线循环
+
+规则与 marcus_report 保持一致：
+- 每日收盘后按 analyze_stock 的规则评分，评分 >= MIN_SCORE（默认 3）的前 5 支进入观察名单
+- 市场立场按 determine_market_stance 的 VIX / SPY 阈值判定
+- 次日突破 MA5 × 1.01 入场，跌破 MA5 × 0.97 止损，否则收盘平仓
+- 仓位：激进 75%、保守 40%、观望 0%，每支占总仓位的 1/5
+- 行情先按真实交易日历对齐（见 trading_calendar），均线、5 日变化等窗口按交易日计数
+
+用法：
+    python3 backtest.py --period 10y
+    python3 backtest.py --synthetic 500 --years 10
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import trading_calendar
+from scoring import MIN_SCORE, STANCE_THRESHOLDS, panel_field, score_rules
+from synthetic_data import make_panel
+
+STANCES = ['Hold/Cash', 'Conservative Buy', 'Aggressive Buy']
+# 各立场对应的总仓位（与报告中的仓位建议一致）
+STANCE_EXPOSURE = np.array([0.0, 0.4, 0.75])
+
+ENTRY_FACTOR = 1.01
+STOP_FACTOR = 0.97
+TOP_K = 5
+
+
+def rolling_mean(values, window):
+    """按列计算滚动均值，窗口内有缺失值时结果为 NaN"""
+    filled = np.nan_to_num(values)
+    csum = np.cumsum(filled, axis=0)
+    ccount = np.cumsum(~np.isnan(values), axis=0)
+    total = csum.copy()
+    count = ccount.copy()
+    total[window:] -= csum[:-window]
+    count[window:] -= ccount[:-window]
+    mean = total / window
+    mean[count < window] = np.nan
+    return mean
+
+
+def daily_indicators(close, volume):
+    """
+    计算每个交易日收盘后的评分输入（与评分参数无关，参数搜索时只需计算一次）
+
+    Returns:
+        dict: change / ma5 / ma20 / volume_ratio，均为 (日期 × 股票) 矩阵
+    """
+    prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (close - prev_close) / prev_close * 100
+        ma5 = rolling_mean(close, 5)
+        ma20 = rolling_mean(close, 20)
+        # 与 analyze_stock 一致：不足 20 根 K 线时 MA20 退化为 MA5
+        ma20 = np.where(np.isnan(ma20), ma5, ma20)
+        avg_volume = rolling_mean(volume, 10)
+        volume_ratio = np.where(avg_volume > 0, volume / avg_volume, 1.0)
+    return {'change': change, 'ma5': ma5, 'ma20': ma20, 'volume_ratio': volume_ratio}
+
+
+def daily_scores(close, volume, score_params=None, indicators=None):
+    """
+    计算每个交易日收盘后的评分矩阵
+
+    Args:
+        score_params: 覆盖 scoring.SCORE_PARAMS 的评分参数（可选）
+        indicators: 已计算好的 daily_indicators 结果（可选）
+
+    Returns:
+        tuple: (score, ma5)，均为 (日期 × 股票) 矩阵，数据不足的位置评分为 -1
+    """
+    ind = indicators or daily_indicators(close, volume)
+    score = score_rules(ind['change'], close, ind['ma5'], ind['ma20'], ind['volume_ratio'], score_params)
+    score[np.isnan(ind['ma5']) | np.isnan(ind['change'])] = -1
+    return score, ind['ma5']
+
+
+def daily_stance(vix_close, spy_close, thresholds=None):
+    """
+    按 determine_market_stance 的规则计算每日立场编号（0 观望 / 1 保守 / 2 激进）
+
+    VIX 与 SPY 的变化率取 5 个交易日窗口首尾（与 period='5d' 一致）
+
+    Args:
+        thresholds: 覆盖 scoring.STANCE_THRESHOLDS 的阈值（可选）
+    """
+    t = {**STANCE_THRESHOLDS, **(thresholds or {})}
+    vix_close = np.asarray(vix_close, dtype=float)
+    spy_close = np.asarray(spy_close, dtype=float)
+    spy_change = np.full_like(spy_close, np.nan)
+    spy_change[4:] = (spy_close[4:] - spy_close[:-4]) / spy_close[:-4] * 100
+
+    with np.errstate(invalid='ignore'):
+        aggressive = (vix_close < t['vix_low']) & (spy_change > t['spy_up'])
+        hold = ((vix_close > t['vix_high']) | (spy_change < t['spy_down'])
+                | np.isnan(vix_close) | np.isnan(spy_change))
+    return np.select([aggressive, hold], [2, 0], default=1)
+
+
+def select_watchlist(score, min_score=MIN_SCORE, top_k=TOP_K):
+    """每日选出评分最高的 top_k 支（评分相同按股票池顺序），返回布尔矩阵"""
+    masked = np.where(score >= min_score, score, -1)
+    order = np.argsort(-masked, axis=1, kind='stable')
+    rank = np.empty_like(order)
+    rows = np.arange(score.shape[0])[:, None]
+    rank[rows, order] = np.arange(score.shape[1])
+    return (rank < top_k) & (masked >= min_score)
+
+
+def run_backtest(open_, high, low, close, volume, stance=None,
+                 min_score=MIN_SCORE, top_k=TOP_K, score_params=None, indicators=None):
+    """
+    回测核心（纯矩阵运算）
+
+    Args:
+        open_, high, low, close, volume: (日期 × 股票) 矩阵
+        stance: 每日立场编号数组（可选），不传时视为始终保守买入
+        min_score: 入选观察名单的最低评分
+        top_k: 每日观察名单长度
+        score_params: 评分参数（可选，见 scoring.SCORE_PARAMS）
+        indicators: 已计算好的 daily_indicators 结果（可选，参数搜索时复用）
+
+    Returns:
+        dict: 每笔交易收益矩阵 trade_returns（未成交为 NaN）、每日组合收益
+            daily_returns、止损标记 stopped 以及汇总指标 stats
+    """
+    close = np.asarray(close, dtype=float)
+    n_days = close.shape[0]
+    if stance is None:
+        stance = np.ones(n_days, dtype=int)
+
+    score, ma5 = daily_scores(close, np.asarray(volume, dtype=float), score_params, indicators)
+    picks = select_watchlist(score, min_score, top_k)
+    entry = ma5 * ENTRY_FACTOR
+    stop = ma5 * STOP_FACTOR
+
+    # 第 t 天的信号在第 t+1 天执行
+    sig = picks[:-1] & (stance[:-1, None] > 0)
+    entry, stop = entry[:-1], stop[:-1]
+    o, h, l, c = (np.asarray(x, dtype=float)[1:] for x in (open_, high, low, close))
+
+    with np.errstate(invalid='ignore'):
+        filled = sig & (h >= entry)
+        fill_price = np.maximum(o, entry)
+        stopped = filled & (l <= stop)
+        exit_price = np.where(stopped, np.minimum(o, stop), c)
+        trade_returns = np.where(filled, exit_price / fill_price - 1, np.nan)
+
+    weight = STANCE_EXPOSURE[stance[:-1]] / top_k
+    daily_returns = np.concatenate([[0.0], np.nansum(trade_returns, axis=1) * weight])
+
+    return {
+        'trade_returns': trade_returns,
+        'daily_returns': daily_returns,
+        'stopped': stopped,
+        'stats': summarize(trade_returns, daily_returns, stopped),
+    }
+
+
+def summarize(trade_returns, daily_returns, stopped):
+    """汇总命中率、盈亏与最大回撤"""
+    trades = trade_returns[~np.isnan(trade_returns)]
+    equity = np.cumprod(1 + daily_returns)
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    n_days = len(daily_returns)
+    years = n_days / 252
+    volatility = daily_returns.std()
+    return {
+        'days': n_days,
+        'trades': int(trades.size),
+        'hit_rate': float((trades > 0).mean()) if trades.size else 0.0,
+        'stop_rate': float(stopped.sum() / trades.size) if trades.size else 0.0,
+        'avg_trade': float(trades.mean()) if trades.size else 0.0,
+        'total_return': float(equity[-1] - 1),
+        'cagr': float(equity[-1] ** (1 / years) - 1) if years > 0 else 0.0,
+        'max_drawdown': float(drawdown.max()),
+        'sharpe': float(daily_returns.mean() / volatility * np.sqrt(252)) if volatility > 0 else 0.0,
+    }
+
+
+def align_sessions(frame):
+    """
+    按真实交易日对齐日期索引：去掉非交易日的行（如节假日的残缺数据），
+    补上整行缺失的交易日（NaN），超出交易日历范围时原样返回
+    """
+    if frame.empty:
+        return frame
+    try:
+        sessions = trading_calendar.sessions_between(frame.index[0], frame.index[-1])
+    except ValueError:
+        return frame
+    return frame.reindex(pd.DatetimeIndex(sessions, dtype=frame.index.dtype))
+
+
+def backtest_panel(panel, vix=None, spy=None, **kwargs):
+    """
+    对 (股票代码, 字段) 面板回测
+
+    Args:
+        panel: 个股行情面板
+        vix: ^VIX 收盘价 Series（可选）
+        spy: SPY 收盘价 Series（可选），与 vix 同时提供时启用立场过滤
+    """
+    close = align_sessions(panel_field(panel, 'Close'))
+    fields = [panel_field(panel, f).reindex_like(close).to_numpy(dtype=float)
+              for f in ('Open', 'High', 'Low', 'Close', 'Volume')]
+    stance = None
+    if vix is not None and spy is not None:
+        stance = daily_stance(vix.reindex(close.index).ffill(), spy.reindex(close.index).ffill())
+    result = run_backtest(*fields, stance=stance, **kwargs)
+    result['dates'] = close.index
+    result['symbols'] = list(close.columns)
+    return result
+
+
+def print_stats(stats, elapsed):
+    """打印回测结果"""
+    print(f"交易日：{stats['days']}  交易笔数：{stats['trades']}  耗时：{elapsed:.2f}s")
+    print(f"命中率：{stats['hit_rate']:.1%}  止损率：{stats['stop_rate']:.1%}  "
+          f"单笔平均：{stats['avg_trade']:+.2%}")
+    print(f"总收益：{stats['total_return']:+.1%}  年化：{stats['cagr']:+.1%}  "
+          f"最大回撤：{stats['max_drawdown']:.1%}  夏普：{stats['sharpe']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 策略回测')
+    parser.add_argument('--period', default='10y', help='历史区间（yfinance 格式）')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='使用 N 支随机游走股票测速')
+    parser.add_argument('--years', type=int, default=10, help='随机数据的年数')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        panel = make_panel(args.synthetic, args.years * 252)
+        vix = spy = None
+    else:
+        from marcus_report import MOMENTUM_STOCKS, fetch_price_panel
+        panel = fetch_price_panel(MOMENTUM_STOCKS, period=args.period)
+        market = fetch_price_panel(['^VIX', 'SPY'], period=args.period)
+        if panel is None or market is None or not {'^VIX', 'SPY'} <= set(market.columns.get_level_values(0)):
+            print("❌ 行情下载失败，无法回测（请检查网络或稍后重试）")
+            sys.exit(1)
+        vix, spy = market['^VIX']['Close'], market['SPY']['Close']
+
+    start = time.perf_counter()
+    result = backtest_panel(panel, vix=vix, spy=spy)
+    print_stats(result['stats'], time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+搜索结果提取基准测试 - 单次扫描 extract_metrics 与逐项多次扫描的对比
+用法：python3 bench_extract.py [搜索结果条数 ...]
+"""
+
+import re
+import sys
+import time
+
+from search_extract import _BASE_RULES, compile_pattern, extract_metrics
+from synthetic_data import SyntheticMarket
+
+DEFAULT_SIZES = [100, 1000, 10000]
+SYMBOLS = ['NVDA', 'TSLA', 'AMD', 'META', 'COIN']
+
+
+def make_text(n_results):
+    """拼接 n 条合成搜索结果"""
+    market = SyntheticMarket()
+    queries = ['stock market news premarket futures VIX'] + [f'{s} stock price premarket volume today' for s in SYMBOLS]
+    return ''.join(market.search(f'{queries[i % len(queries)]} {i}', 5) for i in range(n_results))
+
+
+def multi_pass(text, symbols):
+    """对照组：每项指标、每支股票各扫描一遍全文"""
+    found = 0
+    for _, body in _BASE_RULES:
+        found += sum(1 for _ in re.finditer(body, text, re.IGNORECASE))
+    for symbol in symbols:
+        found += sum(1 for _ in re.finditer(rf'\b{symbol}\b[^\n$\d]{{0,60}}?\$(\d[\d,]*(?:\.\d+)?)', text))
+    return found
+
+
+def main(sizes):
+    compile_pattern(tuple(sorted(SYMBOLS)))
+    print(f"{'结果条数':>8} {'文本(MB)':>9} {'单次扫描(ms)':>13} {'MB/s':>8} {'多次扫描(ms)':>13}")
+    for n in sizes:
+        text = make_text(n)
+        mb = len(text.encode('utf-8')) / 1e6
+
+        start = time.perf_counter()
+        extract_metrics(text, SYMBOLS)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        multi_pass(text, SYMBOLS)
+        multi = time.perf_counter() - start
+
+        print(f"{n:>8} {mb:>9.2f} {single * 1e3:>13.1f} {mb / single:>8.1f} {multi * 1e3:>13.1f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_SIZES)
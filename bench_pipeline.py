@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+报告流水线基准测试 - 完全离线运行
+行情与新闻来自 synthetic_data，飞书 webhook 由本地假服务器代替，
+OpenClaw 命令由临时目录中的假 openclaw 脚本代替
+
+分阶段计时（fetch / score / render / notify），结果写入 JSON，
+并可与旧版本的结果对比找出性能回退
+
+用法：
+    python3 bench_pipeline.py
+    python3 bench_pipeline.py --sizes 20 500 5000 --repeat 3
+    python3 bench_pipeline.py --compare bench_results/OLD.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from market_data import MarketData
+from price_cache import PriceCache
+from synthetic_data import SyntheticMarket
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [20, 100, 500, 1000, 5000]
+RESULTS_DIR = os.path.join(REPO_DIR, 'bench_results')
+# 新结果比旧结果慢这么多倍时视为性能回退
+REGRESSION_RATIO = 1.2
+# 模拟多订阅者时每次渲染的报告版本数
+VARIANTS = 200
+# 多群发送基准：群数量与模拟的单次请求延迟（秒）
+FANOUT_GROUPS = 100
+FANOUT_DELAY = 0.05
+
+FAKE_OPENCLAW = """#!{python}
+import argparse, json, sys
+sys.path.insert(0, {repo!r})
+from synthetic_data import SyntheticMarket
+parser = argparse.ArgumentParser()
+parser.add_argument('command')
+parser.add_argument('--query', default='')
+parser.add_argument('--count', type=int, default=5)
+parser.add_argument('--stdio', action='store_true')
+args, _ = parser.parse_known_args()
+market = SyntheticMarket()
+if args.command == 'serve':
+    for line in sys.stdin:
+        request = json.loads(line)
+        query, _ = parser.parse_known_args([request['command']] + request['args'])
+        sys.stdout.write(json.dumps({{'id': request['id'], 'stdout': market.search(query.query, query.count)}}) + '\\n')
+        sys.stdout.flush()
+else:
+    sys.stdout.write(market.search(args.query, args.count))
+"""
+
+
+class FakeWebhook:
+    """本地假飞书 webhook，总是返回成功（可设置每个请求的模拟延迟，单位秒）"""
+
+    def __init__(self, delay=0.0):
+        self.requests = 0
+        self.bytes = 0
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                webhook.requests += 1
+                webhook.bytes += len(body)
+                if delay:
+                    time.sleep(delay)
+                payload = b'{"code":0,"msg":"success"}'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/open-apis/bot/v2/hook/bench'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Timer:
+    """记录各阶段耗时（多次重复取最小值）"""
+
+    def __init__(self):
+        self.results = {}
+
+    @contextlib.contextmanager
+    def stage(self, generator, size, stage):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+        elapsed = time.perf_counter() - start
+        key = (generator, size, stage)
+        self.results[key] = min(elapsed, self.results.get(key, elapsed))
+
+    def rows(self):
+        return [
+            {'generator': g, 'size': n, 'stage': s, 'seconds': t}
+            for (g, n, s), t in self.results.items()
+        ]
+
+
+def bench_marcus_report(timer, sizes, webhook, workdir):
+    """marcus_report：行情下载、向量化评分、Markdown 渲染、飞书发送"""
+    import marcus_report
+    from feishu_notifier import FeishuNotifier
+
+    market = SyntheticMarket(n_days=60)
+    notifier = FeishuNotifier(webhook.url)
+    for n in sizes:
+        universe = market.universe(n)
+        cache_dir = tempfile.mkdtemp(dir=workdir)
+        cache = PriceCache(market.fetch_price_panel, cache_dir)
+
+        data = MarketData(cache)
+        with timer.stage('marcus_report', n, 'fetch'):
+            data.histories(['^VIX', 'SPY'], '5d')
+            data.panel(universe, '1mo')
+
+        # 缓存已有数据，第二次运行只需增量请求
+        warm = MarketData(cache)
+        with timer.stage('marcus_report', n, 'fetch_warm'):
+            warm.histories(['^VIX', 'SPY'], '5d')
+            warm.panel(universe, '1mo')
+
+        with timer.stage('marcus_report', n, 'score'):
+            sentiment = marcus_report.get_market_sentiment(data)
+            stance, reason = marcus_report.determine_market_stance(sentiment)
+            watchlist = marcus_report.generate_watchlist(universe, data=data)
+
+        with timer.stage('marcus_report', n, 'render'):
+            report = marcus_report.render_report(
+                datetime.now().strftime('%Y-%m-%d'), sentiment, stance, reason, watchlist)
+
+        # 按订阅者生成多个版本（各自的观察名单条数不同）
+        with timer.stage('marcus_report', n, 'render_many'):
+            for i in range(VARIANTS):
+                marcus_report.render_report(
+                    datetime.now().strftime('%Y-%m-%d'), sentiment, stance, reason, watchlist[:i % 6])
+
+        with timer.stage('marcus_report', n, 'notify'):
+            notifier.send_text(report)
+
+        cache.close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_marcus_enhanced(timer, webhook, workdir):
+    """
+    marcus_enhanced：OpenClaw 并发新闻搜索、报告渲染、飞书发送（观察名单固定，与股票池大小无关）
+
+    搜索分别测量：逐次启动进程（空缓存）、缓存命中、常驻会话（空缓存）
+    """
+    import marcus_enhanced
+    from feishu_notifier import send_report_to_feishu
+    from search_cache import SearchCache
+
+    # 固定为周一，避免周末运行时只测到休市报告
+    monday = datetime(2026, 3, 2, 8, 30)
+    symbols = marcus_enhanced.WATCHLIST_SYMBOLS
+    marcus_enhanced._search_cache = SearchCache(tempfile.mkdtemp(dir=workdir))
+    marcus_enhanced.USE_OPENCLAW_WORKER = False
+    with timer.stage('marcus_enhanced', None, 'fetch'):
+        news = marcus_enhanced.fetch_report_news(symbols)
+    with timer.stage('marcus_enhanced', None, 'fetch_cached'):
+        marcus_enhanced.fetch_report_news(symbols)
+
+    marcus_enhanced._search_cache = SearchCache(tempfile.mkdtemp(dir=workdir))
+    marcus_enhanced.USE_OPENCLAW_WORKER = True
+    # 会话启动不计入单次搜索耗时
+    marcus_enhanced.run_openclaw_command('web_search', ['--query', 'warmup', '--count', '1'])
+    with timer.stage('marcus_enhanced', None, 'fetch_worker'):
+        marcus_enhanced.fetch_report_news(symbols)
+    marcus_enhanced.get_openclaw_worker().close()
+    marcus_enhanced.USE_OPENCLAW_WORKER = False
+
+    fetch = marcus_enhanced.fetch_report_news
+    marcus_enhanced.fetch_report_news = lambda symbols: news
+    try:
+        with timer.stage('marcus_enhanced', None, 'render'):
+            report = marcus_enhanced.generate_enhanced_report(now=monday)
+    finally:
+        marcus_enhanced.fetch_report_news = fetch
+
+    with timer.stage('marcus_enhanced', None, 'notify'):
+        send_report_to_feishu(webhook.url, report)
+
+
+def bench_send_feishu_github(timer, webhook, workdir):
+    """send_feishu_github：卡片渲染与发送（数据为脚本内置）"""
+    import send_feishu_github
+    from feishu_outbox import FeishuOutbox, OutboxDrainer
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    # 报告写到临时目录，不混入仓库的 reports/
+    reports_dir = send_feishu_github.REPORTS_DIR
+    send_feishu_github.REPORTS_DIR = os.path.join(workdir, 'reports')
+    outbox = FeishuOutbox(os.path.join(tempfile.mkdtemp(dir=workdir), 'outbox.sqlite'))
+    try:
+        with timer.stage('send_feishu_github', None, 'render'):
+            card, _ = send_feishu_github.generate_report()
+        # 报告脚本只负责入队，发送由独立的发送进程完成
+        with timer.stage('send_feishu_github', None, 'enqueue'):
+            send_feishu_github.send_to_feishu(card, outbox=outbox)
+        with timer.stage('send_feishu_github', None, 'drain'):
+            OutboxDrainer(outbox).run()
+    finally:
+        outbox.close()
+        send_feishu_github.REPORTS_DIR = reports_dir
+        os.chdir(cwd)
+
+
+def bench_feishu_fanout(timer, groups):
+    """同一张卡片发送到多个群（模拟 50ms 网络延迟，连接池复用 + 并发）"""
+    from feishu_notifier import FeishuNotifier
+    from webhook_pool import WebhookPool
+
+    with FakeWebhook(delay=FANOUT_DELAY) as webhook:
+        card = {'header': {'title': {'tag': 'plain_text', 'content': 'bench'}}, 'elements': []}
+        with timer.stage('feishu_fanout', 1, 'notify'):
+            FeishuNotifier(webhook.url, pool=WebhookPool()).send_interactive(card)
+        urls = [f'{webhook.url}-{i}' for i in range(groups)]
+        notifier = FeishuNotifier(urls, pool=WebhookPool())
+        with timer.stage('feishu_fanout', groups, 'notify'):
+            result = notifier.send_interactive(card)
+        assert result['success'], result['message']
+
+
+def git_version():
+    """当前代码版本（git 提交号）"""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=REPO_DIR,
+            capture_output=True, text=True, timeout=10).stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def compare(old_path, rows):
+    """与旧结果对比，返回回退的条目数"""
+    with open(old_path, 'r') as f:
+        old = json.load(f)
+    baseline = {(r['generator'], r['size'], r['stage']): r['seconds'] for r in old['results']}
+
+    regressions = 0
+    print(f"\n与 {old.get('version', old_path)} 对比：")
+    print(f"{'生成器':<20} {'规模':>6} {'阶段':<12} {'旧(ms)':>10} {'新(ms)':>10} {'倍数':>7}")
+    for r in rows:
+        before = baseline.get((r['generator'], r['size'], r['stage']))
+        if before is None:
+            continue
+        ratio = r['seconds'] / before if before > 0 else float('inf')
+        flag = ' ⚠️' if ratio > REGRESSION_RATIO else ''
+        regressions += bool(flag)
+        print(f"{r['generator']:<20} {str(r['size'] or '-'):>6} {r['stage']:<12} "
+              f"{before * 1e3:>10.2f} {r['seconds'] * 1e3:>10.2f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 报告流水线基准测试（离线）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='股票池规模')
+    parser.add_argument('--repeat', type=int, default=1, help='重复次数（取最小值）')
+    parser.add_argument('--output', help='结果 JSON 路径（默认 bench_results/<版本>.json）')
+    parser.add_argument('--compare', metavar='OLD_JSON', help='与旧结果对比')
+    args = parser.parse_args()
+
+    timer = Timer()
+    workdir = tempfile.mkdtemp(prefix='marcus-bench-')
+    bin_dir = os.path.join(workdir, 'bin')
+    os.makedirs(bin_dir)
+    fake_cli = os.path.join(bin_dir, 'openclaw')
+    with open(fake_cli, 'w') as f:
+        f.write(FAKE_OPENCLAW.format(python=sys.executable, repo=REPO_DIR))
+    os.chmod(fake_cli, 0o755)
+
+    env_backup = {k: os.environ.get(k) for k in ('PATH', 'FEISHU_WEBHOOK', 'SKIP_WEEKEND', 'OPENCLAW_WORKER_CMD')}
+    try:
+        with FakeWebhook() as webhook:
+            os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+            os.environ['FEISHU_WEBHOOK'] = webhook.url
+            os.environ['SKIP_WEEKEND'] = 'false'
+            os.environ['OPENCLAW_WORKER_CMD'] = f'{fake_cli} serve --stdio'
+            for _ in range(args.repeat):
+                bench_marcus_report(timer, args.sizes, webhook, workdir)
+                bench_marcus_enhanced(timer, webhook, workdir)
+                bench_send_feishu_github(timer, webhook, workdir)
+                bench_feishu_fanout(timer, FANOUT_GROUPS)
+    finally:
+        for key, value in env_backup.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    rows = timer.rows()
+    print(f"{'生成器':<20} {'规模':>6} {'阶段':<12} {'耗时(ms)':>10}")
+    for r in rows:
+        print(f"{r['generator']:<20} {str(r['size'] or '-'):>6} {r['stage']:<12} {r['seconds'] * 1e3:>10.2f}")
+
+    version = git_version()
+    output = args.output or os.path.join(RESULTS_DIR, f'{version}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'version': version,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'results': rows,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ 结果已保存至 {output}")
+
+    if args.compare and compare(args.compare, rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
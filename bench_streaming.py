@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+流式评分基准测试 - 用合成分钟线回放一个交易日
+对比逐根 K 线增量更新（指标常数时间，名单只在必要时重选）与每分钟整体重算（score_panel），并校验两者结果一致
+用法：python3 bench_streaming.py [股票数量 ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from scoring import score_panel
+from streaming import StreamingEngine
+from synthetic_data import SyntheticMarket
+
+DEFAULT_SIZES = [20, 100, 500]
+HISTORY_DAYS = 30
+
+
+def closing_panel(panel, bars):
+    """把当天分钟线合成为一根日线，追加到历史面板末尾"""
+    last = {}
+    for bar in bars:
+        close, volume = last.get(bar['symbol'], (None, 0.0))
+        last[bar['symbol']] = (bar['close'], volume + bar['volume'])
+    day = pd.Timestamp(bars[-1]['time'][:10])
+    row = pd.DataFrame(np.nan, index=[day], columns=panel.columns)
+    for symbol, (close, volume) in last.items():
+        row[(symbol, 'Close')] = close
+        row[(symbol, 'Volume')] = volume
+    return pd.concat([panel, row])
+
+
+def check_same(engine, scores):
+    """确认流式结果与整体重算一致"""
+    for symbol, row in scores.iterrows():
+        metrics = engine.states[symbol].metrics()
+        assert metrics['score'] == row['score'], symbol
+        for key in ('price', 'change', 'volume_ratio', 'ma5', 'ma20'):
+            assert np.isclose(metrics[key], row[key]), (symbol, key)
+
+
+def main(sizes):
+    print(f"{'股票数':>8} {'K线数':>8} {'流式(ms)':>10} {'每根(us)':>10} {'每分钟重算(ms)':>16} {'事件数':>8}")
+    for n in sizes:
+        market = SyntheticMarket(n_days=HISTORY_DAYS, end='2026-02-27', gap_ratio=0.1)
+        symbols = market.universe(n)
+        panel = market.panel(symbols)
+        bars = list(market.minute_bars(symbols))
+
+        engine = StreamingEngine(symbols)
+        engine.seed(panel)
+        events = 0
+        start = time.perf_counter()
+        for bar in bars:
+            events += len(engine.on_bar(bar))
+        stream_time = time.perf_counter() - start
+
+        # 对照：每分钟对整个股票池重算一次（只测一次，再乘以分钟数）
+        final = closing_panel(panel, bars)
+        start = time.perf_counter()
+        scores = score_panel(final)
+        rescore_time = (time.perf_counter() - start) * (len(bars) // n)
+
+        check_same(engine, scores)
+        print(f"{n:>8} {len(bars):>8} {stream_time * 1e3:>10.1f} {stream_time / len(bars) * 1e6:>10.2f} "
+              f"{rescore_time * 1e3:>16.1f} {events:>8}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+并发抓取层 - 用有限线程池并发执行逐支请求
+带令牌桶限速与单次请求超时，结果按输入顺序返回
+
+工作线程是守护线程：超时被放弃的请求（线程无法强制终止）不会阻止解释器退出，
+命令行与 CI 中的超时真正生效
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 5.0       # 每秒请求数
+DEFAULT_TIMEOUT = 15.0   # 单次请求超时（秒）
+
+
+class TokenBucket:
+    """线程安全的令牌桶限速器"""
+
+    def __init__(self, rate, capacity=None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发请求数），默认等于 rate
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """取出一个令牌，桶空时阻塞等待"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def fetch_all(func, items, max_workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+              timeout=DEFAULT_TIMEOUT):
+    """
+    并发执行 func(item)，按 items 的顺序返回结果
+
+    Args:
+        func: 单次请求函数
+        items: 请求参数列表
+        max_workers: 最大并发线程数
+        rate: 每秒最多发起的请求数，None 表示不限速
+        timeout: 单次请求超时（从请求真正开始执行时计时），None 表示不限
+
+    Returns:
+        list: 与 items 一一对应的结果，出错或超时的位置为 None
+    """
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    bucket = TokenBucket(rate) if rate else None
+    started = {}
+    tasks = queue.SimpleQueue()
+    pending = {}
+    for i, item in enumerate(items):
+        future = Future()
+        pending[future] = i
+        tasks.put((i, item, future))
+
+    def worker():
+        while True:
+            try:
+                i, item, future = tasks.get_nowait()
+            except queue.Empty:
+                return
+            # 已放弃（取消）的请求不再执行
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if bucket:
+                    bucket.acquire()
+                started[i] = time.monotonic()
+                future.set_result(func(item))
+            except BaseException as e:
+                future.set_exception(e)
+
+    # ThreadPoolExecutor 的线程在解释器退出时会被等待，这里改用守护线程
+    for _ in range(min(max_workers, len(items))):
+        threading.Thread(target=worker, daemon=True).start()
+
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=_next_deadline(pending, started, timeout),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                try:
+                    results[i] = future.result()
+                except Exception:
+                    results[i] = None
+            # 超时的请求直接放弃，结果保持 None（线程无法强制终止，只是不再等待）
+            if timeout is not None:
+                now = time.monotonic()
+                for future, i in list(pending.items()):
+                    if i in started and now - started[i] >= timeout:
+                        del pending[future]
+    finally:
+        # 提前返回（超时或调用方中断）时，尚未开始的请求不再执行
+        for future in pending:
+            future.cancel()
+    return results
+
+
+def _next_deadline(pending, started, timeout):
+    """距离最早一个正在执行的请求超时还剩多少秒"""
+    if timeout is None:
+        return None
+    running = [started[i] for i in pending.values() if i in started]
+    if not running:
+        return timeout
+    return max(0.0, min(running) + timeout - time.monotonic())
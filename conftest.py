@@ -0,0 +1,2 @@
+# test_feishu_send.py 是手动运行的发送脚本（需要 feishu_config.json，会真实推送到飞书），不作为测试收集
+collect_ignore = ['test_feishu_send.py']
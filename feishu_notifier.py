@@ -4,21 +4,40 @@
 """
 
 import json
-import urllib.request
-import urllib.error
-from datetime import datetime
+import os
+
+from message_split import split_markdown
+from report_model import ReportData, render
+from webhook_pool import get_webhook_pool
+
+# 同时发送到多个群时的最大并发数
+FEISHU_CONCURRENCY = int(os.environ.get('MARCUS_FEISHU_CONCURRENCY', '16'))
+# 飞书自定义机器人单条消息的请求体上限（20 KB，留出余量）
+FEISHU_MAX_BYTES = 20 * 1000
 
 class FeishuNotifier:
     """飞书机器人通知器"""
     
-    def __init__(self, webhook_url):
+    def __init__(self, webhook_url, pool=None, outbox=None, idempotency_key=None):
         """
         初始化飞书通知器
         
         Args:
-            webhook_url: 飞书机器人 webhook URL
+            webhook_url: 飞书机器人 webhook URL，或多个群的 webhook 列表
+            pool: webhook 连接池（可选，默认使用进程内共享的连接池）
+            outbox: 发送队列（可选，设置后消息只入队、立即返回，由 feishu_outbox 的发送进程发送）
+            idempotency_key: 幂等键前缀（可选，如 "marcus_enhanced:2026-03-02"），
+                同一前缀下的第 N 条消息只会入队一次
         """
-        self.webhook_url = webhook_url
+        if isinstance(webhook_url, str):
+            self.webhook_urls = [webhook_url]
+        else:
+            self.webhook_urls = list(webhook_url)
+        self.webhook_url = self.webhook_urls[0] if self.webhook_urls else None
+        self.pool = pool or get_webhook_pool()
+        self.outbox = outbox
+        self.idempotency_key = idempotency_key
+        self.sequence = 0
     
     def send_text(self, content):
         """发送纯文本消息"""
@@ -32,24 +51,55 @@ class FeishuNotifier:
     
     def send_post(self, title, content_lines):
         """发送 Post 消息（富文本）"""
-        elements = []
-        for line in content_lines:
-            if line.startswith('###'):
-                elements.append({
+        return self._send(self._post_data(title, content_lines))
+    
+    def send_markdown(self, title, text):
+        """
+        发送完整的 Markdown 报告：按章节拆成若干条不超过飞书大小上限的 Post 消息，按顺序发送
+        
+        Returns:
+            dict: 发送结果（parts 为拆分后的消息数；某一段失败时停止发送后续部分）
+        """
+        # 标题按最长的分段编号预留空间
+        envelope = len(self._encode(self._post_data(f"{title} (99/99)", [])))
+        parts = split_markdown(text, FEISHU_MAX_BYTES - envelope, self._line_cost)
+        result = {'success': True, 'message': '发送成功'}
+        for i, lines in enumerate(parts, 1):
+            part_title = title if len(parts) == 1 else f"{title} ({i}/{len(parts)})"
+            result = self.send_post(part_title, lines)
+            if not result['success']:
+                result['message'] = f"第 {i}/{len(parts)} 段：{result['message']}"
+                break
+        return {**result, 'parts': len(parts)}
+    
+    @staticmethod
+    def _line_elements(line):
+        """一行文本对应的 Post 元素（### 开头的行显示为分隔线 + 粗体标题）"""
+        if line.startswith('###'):
+            return [
+                {
                     "tag": "hr"
-                })
-                elements.append({
+                },
+                {
                     "tag": "text",
                     "text": line.replace('###', '').strip(),
                     "text_style": {"bold": True}
-                })
-            else:
-                elements.append({
-                    "tag": "text",
-                    "text": line + "\n"
-                })
-        
-        data = {
+                }
+            ]
+        return [{
+            "tag": "text",
+            "text": line + "\n"
+        }]
+    
+    @classmethod
+    def _line_cost(cls, line):
+        """一行在 Post 消息中占用的字节数（含元素之间的分隔符）"""
+        return sum(len(cls._encode(e)) + 2 for e in cls._line_elements(line))
+    
+    @classmethod
+    def _post_data(cls, title, content_lines):
+        elements = [e for line in content_lines for e in cls._line_elements(line)]
+        return {
             "msg_type": "post",
             "content": {
                 "post": {
@@ -60,7 +110,11 @@ class FeishuNotifier:
                 }
             }
         }
-        return self._send(data)
+    
+    @staticmethod
+    def _encode(data):
+        """消息序列化为 UTF-8 JSON（中文不转义，体积约为转义后的一半）"""
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
     
     def send_interactive(self, card):
         """发送交互式卡片消息"""
@@ -75,147 +129,80 @@ class FeishuNotifier:
         发送市场报告（交互式卡片）
         
         Args:
-            report_data: 报告数据字典
-                - date: 日期
-                - stance: 市场立场
-                - reason: 理由
-                - vix: VIX 指数
-                - watchlist: 观察名单列表
-                - risk_tips: 风险提示
+            report_data: ReportData，或旧格式的报告数据字典
+                （date / stance / reason / vix / trend / watchlist / risk_tips）
         """
-        # 根据立场设置颜色
-        stance = report_data.get('stance', 'Conservative Buy')
-        if 'Aggressive' in stance:
-            template = "blue"
-            emoji = '🟢'
-        elif 'Hold' in stance:
-            template = "red"
-            emoji = '🔴'
-        else:
-            template = "yellow"
-            emoji = '🟡'
-        
-        # 构建卡片
-        card = {
-            "config": {
-                "wide_screen_mode": True
-            },
-            "header": {
-                "template": template,
-                "title": {
-                    "tag": "plain_text",
-                    "content": f"📈 Marcus 每日动量报告 | {report_data.get('date', 'N/A')}"
-                }
-            },
-            "elements": [
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"**{emoji} 市场立场：{stance}**\n**理由：** {report_data.get('reason', 'N/A')}"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"**📊 VIX 指数：** {report_data.get('vix', 'N/A')}\n**📈 市场趋势：** {report_data.get('trend', 'N/A')}"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": self._format_watchlist(report_data.get('watchlist', []))
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"**⚠️ 风险提示**\n{report_data.get('risk_tips', 'N/A')}"
-                    }
-                },
-                {
-                    "tag": "hr"
-                },
-                {
-                    "tag": "note",
-                    "elements": [
-                        {
-                            "tag": "plain_text",
-                            "content": f"📅 生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | 交易员：Marcus"
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        return self.send_interactive(card)
+        if not isinstance(report_data, ReportData):
+            report_data = ReportData.from_dict(report_data)
+        return self.send_interactive(render(report_data, 'feishu_card'))
     
-    def _format_watchlist(self, watchlist):
-        """格式化观察名单"""
-        if not watchlist:
-            return "**📋 观察名单：** 暂无数据"
-        
-        lines = ["**📋 5% 观察名单：**"]
-        for i, stock in enumerate(watchlist[:5], 1):
-            symbol = stock.get('symbol', 'N/A')
-            logic = stock.get('logic', 'N/A')
-            entry = stock.get('entry', 'N/A')
-            stop = stock.get('stop', 'N/A')
-            prob = stock.get('probability', 'N/A')
-            
-            lines.append(f"{i}. **{symbol}** - {logic}")
-            lines.append(f"   入场：{entry} | 止损：{stop} | 成功率：{prob}")
+    def _send(self, data):
+        """发送请求到飞书（消息只序列化一次，多个群共用同一份数据并发发送）"""
+        body = self._encode(data)
+        if self.outbox is not None:
+            return self._enqueue(body)
+        results = self.pool.fan_out(self.webhook_urls, body, send=self._post,
+                                    max_workers=FEISHU_CONCURRENCY)
+        if len(results) == 1:
+            return results[0]
         
-        return "\n".join(lines)
+        failed = [r for r in results if not r['success']]
+        if failed:
+            message = f"{len(failed)}/{len(results)} 个群发送失败：{failed[0]['message']}"
+        else:
+            message = f"已发送到 {len(results)} 个群"
+        return {'success': not failed, 'message': message, 'results': results}
     
-    def _send(self, data):
-        """发送请求到飞书"""
+    def _enqueue(self, body):
+        """把消息写入发送队列（每个群一条），立即返回"""
+        self.sequence += 1
+        queued = 0
+        for url in self.webhook_urls:
+            key = f"{self.idempotency_key}#{self.sequence}@{url}" if self.idempotency_key else None
+            queued += self.outbox.enqueue(url, body, key=key)
+        if queued:
+            return {'success': True, 'message': f"已加入发送队列（{queued} 条）", 'queued': queued}
+        return {'success': True, 'message': '消息已在发送队列中，跳过重复推送', 'queued': 0}
+    
+    def _post(self, url, body):
+        """向单个 webhook 发送已序列化的消息"""
         try:
-            req = urllib.request.Request(
-                self.webhook_url,
-                data=json.dumps(data).encode('utf-8'),
-                headers={'Content-Type': 'application/json'},
-                method='POST'
-            )
+            status, reason, payload = self.pool.post(url, body)
+            if status >= 400:
+                return {'success': False, 'message': f"HTTP 错误：{status} - {reason}"}
             
-            with urllib.request.urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode('utf-8'))
+            result = json.loads(payload.decode('utf-8'))
+            if result.get('code') == 0 or result.get('StatusCode') == 0:
+                return {'success': True, 'message': '发送成功'}
+            else:
+                return {'success': False, 'message': f"飞书返回错误：{result}"}
                 
-                if result.get('code') == 0 or result.get('StatusCode') == 0:
-                    return {'success': True, 'message': '发送成功'}
-                else:
-                    return {'success': False, 'message': f"飞书返回错误：{result}"}
-                    
-        except urllib.error.HTTPError as e:
-            return {'success': False, 'message': f"HTTP 错误：{e.code} - {e.reason}"}
         except Exception as e:
             return {'success': False, 'message': f"发送失败：{str(e)}"}
 
 
-def send_report_to_feishu(webhook_url, report_text, report_data=None):
+def send_report_to_feishu(webhook_url, report_text, report_data=None, outbox=None, idempotency_key=None):
     """
     快捷函数：发送报告到飞书
     
     Args:
-        webhook_url: 飞书 webhook URL
+        webhook_url: 飞书 webhook URL（或多个群的 webhook 列表）
         report_text: 完整报告文本
         report_data: 结构化报告数据（可选）
+        outbox: 发送队列（可选，设置后只入队不发送）
+        idempotency_key: 幂等键前缀（可选，配合 outbox 防止重复推送）
     
     Returns:
         dict: 发送结果
     """
-    notifier = FeishuNotifier(webhook_url)
+    notifier = FeishuNotifier(webhook_url, outbox=outbox, idempotency_key=idempotency_key)
     
     # 如果有结构化数据，发送交互式卡片
     if report_data:
         result = notifier.send_market_report(report_data)
     else:
-        # 否则发送文本消息
-        title = "📈 Marcus 每日动量报告"
-        result = notifier.send_text(f"{title}\n\n{report_text[:2000]}")  # 限制长度
+        # 否则按章节拆分成若干条消息发送完整报告
+        result = notifier.send_markdown("📈 Marcus 每日动量报告", report_text)
     
     return result
 
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+飞书发送队列（outbox）- 报告生成时只把消息写入本地 SQLite 并立即返回，
+由独立的发送进程（drainer）负责真正发送
+
+- 每条消息带幂等键，同一个键只会入队一次，脚本重跑不会重复推送
+- 发送失败按指数退避重试，超过最大次数后标记为失败
+- 按 webhook 限速（飞书自定义机器人：每秒 5 次、每分钟 100 次），
+  同一个群的消息严格按入队顺序发送
+
+用法：
+    python3 feishu_outbox.py drain              # 发送所有待发消息（等待重试直到队列清空或超时）
+    python3 feishu_outbox.py drain --once       # 只处理当前到期的消息
+    python3 feishu_outbox.py status             # 查看队列状态
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from concurrent_fetch import TokenBucket
+from webhook_pool import get_webhook_pool
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 2.0          # 第一次重试前等待的秒数，之后每次翻倍
+BACKOFF_CAP = 600.0         # 单次等待上限（秒）
+LEASE_SECONDS = 120.0       # 发送进程崩溃后，被占用的消息多久后重新可发
+KEEP_SENT_DAYS = 7          # 已发送消息（幂等键）保留天数
+CLAIM_BATCH = 100
+DRAIN_TIMEOUT = 600.0       # drain 默认最长运行时间（秒）
+DRAIN_CONCURRENCY = 8       # 同时发送的群数量
+
+# 飞书自定义机器人限流：每秒 5 次、每分钟 100 次
+WEBHOOK_RATE = 100 / 60
+WEBHOOK_BURST = 5
+# 飞书返回的限流错误码
+RATE_LIMIT_CODES = {9499, 11232}
+
+
+def default_outbox_path():
+    """队列文件路径（MARCUS_OUTBOX_PATH，默认放在 MARCUS_CACHE_DIR 下）"""
+    cache_dir = os.environ.get('MARCUS_CACHE_DIR', os.path.join(REPO_DIR, 'cache'))
+    return os.environ.get('MARCUS_OUTBOX_PATH', os.path.join(cache_dir, 'feishu_outbox.sqlite'))
+
+
+def message_key(webhook, body):
+    """未指定幂等键时，以 webhook + 消息内容作为键"""
+    return hashlib.sha1(webhook.encode('utf-8') + b'\0' + body).hexdigest()
+
+
+def backoff_delay(attempts, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """第 attempts 次失败后的等待时间（指数退避 + 随机抖动）"""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class FeishuOutbox:
+    """基于 SQLite 的持久化发送队列（可被多个进程同时读写）"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 队列文件路径，默认见 default_outbox_path()
+        """
+        self.path = path or default_outbox_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE,
+                webhook TEXT,
+                body BLOB,
+                status TEXT,            -- pending / sending / sent / failed
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at REAL,
+                lease_until REAL,
+                created_at REAL,
+                sent_at REAL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS messages_due ON messages (status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS messages_webhook ON messages (webhook, id);
+        """)
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def enqueue(self, webhook, body, key=None):
+        """
+        消息入队
+
+        Args:
+            webhook: 飞书 webhook URL
+            body: 已序列化的请求体（bytes）
+            key: 幂等键（默认由 webhook + 内容生成）
+
+        Returns:
+            bool: 是否为新消息（键已存在时返回 False，不会重复发送）
+        """
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO messages (key, webhook, body, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?)",
+                (key or message_key(webhook, body), webhook, body, now, now))
+        return cursor.rowcount == 1
+
+    def claim(self, limit=CLAIM_BATCH, now=None):
+        """
+        占用到期的待发消息（同一个群前面还有未发完的消息时，后面的消息不会被取出）
+
+        Returns:
+            list: [(id, webhook, body, attempts)]，按 id 排序
+        """
+        now = now or time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 发送进程中途退出留下的消息重新变为待发
+                self.conn.execute(
+                    "UPDATE messages SET status = 'pending' WHERE status = 'sending' AND lease_until < ?",
+                    (now,))
+                rows = self.conn.execute("""
+                    SELECT id, webhook, body, attempts FROM messages m
+                    WHERE status = 'pending' AND next_attempt_at <= ?
+                      AND NOT EXISTS (
+                          SELECT 1 FROM messages e
+                          WHERE e.webhook = m.webhook AND e.id < m.id
+                            AND (e.status = 'sending' OR (e.status = 'pending' AND e.next_attempt_at > ?)))
+                    ORDER BY id LIMIT ?""", (now, now, limit)).fetchall()
+                self.conn.executemany(
+                    "UPDATE messages SET status = 'sending', lease_until = ? WHERE id = ?",
+                    [(now + LEASE_SECONDS, row[0]) for row in rows])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def mark_sent(self, message_id):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE messages SET status = 'sent', sent_at = ?, attempts = attempts + 1, last_error = NULL "
+                "WHERE id = ?", (time.time(), message_id))
+
+    def retry_later(self, message_id, error, delay, count_attempt=True):
+        """稍后重试（count_attempt=False 时不计入失败次数，用于排在失败消息之后的消息）"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE messages SET status = 'pending', next_attempt_at = ?, last_error = ?, "
+                "attempts = attempts + ? WHERE id = ?",
+                (time.time() + delay, error, int(count_attempt), message_id))
+
+    def mark_failed(self, message_id, error):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE messages SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                (error, message_id))
+
+    def next_due(self):
+        """最早一条待发消息的发送时间（没有待发消息时返回 None）"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT MIN(CASE WHEN status = 'sending' THEN lease_until ELSE next_attempt_at END) "
+                "FROM messages WHERE status IN ('pending', 'sending')").fetchone()[0]
+
+    def counts(self):
+        """各状态的消息数"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM messages GROUP BY status"))
+
+    def failures(self, limit=10):
+        """最近失败的消息 [(id, webhook, attempts, last_error)]"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT id, webhook, attempts, last_error FROM messages WHERE status = 'failed' "
+                "ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+    def purge(self, keep_days=KEEP_SENT_DAYS):
+        """删除过期的已发送消息（保留期内的幂等键仍可防止重复推送）"""
+        with self.lock:
+            self.conn.execute("DELETE FROM messages WHERE status = 'sent' AND sent_at < ?",
+                              (time.time() - keep_days * 86400,))
+
+
+def deliver(webhook, body, pool=None):
+    """
+    发送一条消息
+
+    Returns:
+        tuple: (结果, 说明)，结果为 'sent' / 'retry'（可重试）/ 'fail'（不可重试）
+    """
+    pool = pool or get_webhook_pool()
+    try:
+        status, reason, payload = pool.post(webhook, body)
+    except Exception as e:
+        return 'retry', f"发送失败：{e}"
+    if status == 429 or status >= 500:
+        return 'retry', f"HTTP 错误：{status} - {reason}"
+    if status >= 400:
+        return 'fail', f"HTTP 错误：{status} - {reason}"
+    try:
+        result = json.loads(payload.decode('utf-8'))
+    except ValueError:
+        return 'retry', f"无法解析飞书响应：{payload[:200]!r}"
+    if result.get('code') == 0 or result.get('StatusCode') == 0:
+        return 'sent', '发送成功'
+    if result.get('code') in RATE_LIMIT_CODES:
+        return 'retry', f"飞书限流：{result}"
+    return 'fail', f"飞书返回错误：{result}"
+
+
+class OutboxDrainer:
+    """发送进程：取出到期消息，按群限速、按顺序发送"""
+
+    def __init__(self, outbox, pool=None, max_attempts=MAX_ATTEMPTS,
+                 concurrency=DRAIN_CONCURRENCY, rate=WEBHOOK_RATE, burst=WEBHOOK_BURST):
+        self.outbox = outbox
+        self.pool = pool or get_webhook_pool()
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+
+    def _bucket(self, webhook):
+        with self.lock:
+            if webhook not in self.buckets:
+                self.buckets[webhook] = TokenBucket(self.rate, self.burst)
+            return self.buckets[webhook]
+
+    def _send_group(self, rows):
+        """按顺序发送同一个群的消息，某条需要重试时后面的消息也一起推迟"""
+        for i, (message_id, webhook, body, attempts) in enumerate(rows):
+            self._bucket(webhook).acquire()
+            outcome, message = deliver(webhook, body, self.pool)
+            if outcome == 'sent':
+                self.outbox.mark_sent(message_id)
+                self.sent += 1
+                continue
+            if outcome == 'retry' and attempts + 1 < self.max_attempts:
+                delay = backoff_delay(attempts + 1)
+                self.outbox.retry_later(message_id, message, delay)
+                for later_id, *_ in rows[i + 1:]:
+                    self.outbox.retry_later(later_id, '等待前一条消息发送', delay, count_attempt=False)
+                return
+            self.outbox.mark_failed(message_id, message)
+            self.failed += 1
+
+    def drain_once(self):
+        """处理当前所有到期消息，返回处理的条数"""
+        rows = self.outbox.claim()
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[1], []).append(row)
+        if len(groups) == 1:
+            self._send_group(rows)
+        elif groups:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(groups))) as executor:
+                list(executor.map(self._send_group, groups.values()))
+        return len(rows)
+
+    def run(self, timeout=DRAIN_TIMEOUT, wait=True):
+        """
+        发送直到队列清空
+
+        Args:
+            timeout: 最长运行时间（秒）
+            wait: 是否等待需要稍后重试的消息（False 时只处理当前到期的消息）
+
+        Returns:
+            int: 仍未发送的消息数
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            processed = self.drain_once()
+            next_due = self.outbox.next_due()
+            if next_due is None or not wait:
+                break
+            if not processed:
+                # 到期的消息可能正排在等待重试的同群消息之后，至少等待 1 秒再查
+                delay = max(next_due - time.time(), 1.0)
+                if time.monotonic() + delay > deadline:
+                    break
+                time.sleep(delay)
+            elif time.monotonic() > deadline:
+                break
+        self.outbox.purge()
+        counts = self.outbox.counts()
+        return counts.get('pending', 0) + counts.get('sending', 0)
+
+
+def spawn_drainer(path=None):
+    """在后台启动独立的发送进程（多个发送进程同时运行也不会重复发送）"""
+    env = dict(os.environ, MARCUS_OUTBOX_PATH=path or default_outbox_path())
+    try:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), 'drain'],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, env=env, start_new_session=True)
+        return True
+    except OSError as e:
+        print(f"⚠️  无法启动飞书发送进程：{e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='飞书发送队列')
+    sub = parser.add_subparsers(dest='command', required=True)
+    drain = sub.add_parser('drain', help='发送待发消息')
+    drain.add_argument('--once', action='store_true', help='只处理当前到期的消息，不等待重试')
+    drain.add_argument('--timeout', type=float, default=DRAIN_TIMEOUT, help='最长运行时间（秒）')
+    sub.add_parser('status', help='查看队列状态')
+    parser.add_argument('--path', help='队列文件路径')
+    args = parser.parse_args()
+
+    outbox = FeishuOutbox(args.path)
+    if args.command == 'status':
+        print(f"队列：{outbox.path}")
+        for status, count in sorted(outbox.counts().items()):
+            print(f"  {status:<8} {count}")
+        for message_id, webhook, attempts, error in outbox.failures():
+            print(f"  ❌ #{message_id} {webhook[-12:]} 尝试 {attempts} 次：{error}")
+        return
+
+    drainer = OutboxDrainer(outbox)
+    remaining = drainer.run(timeout=args.timeout, wait=not args.once)
+    print(f"📬 已发送 {drainer.sent} 条，失败 {drainer.failed} 条，待发 {remaining} 条")
+    if drainer.failed or (remaining and not args.once):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+技术指标库 - RSI、ATR、EMA、布林带、N 日新高
+
+每个指标提供两种形式：
+- 批量计算：输入 (日期 × 股票) 矩阵，一次算出整段历史（按列向量化，只沿时间方向循环）
+- 增量计算：每来一根 K 线 O(1) 更新，可用于盘中流式评分；
+  update(..., new_bar=False) 表示修改最后一根（当天尚未收盘的）K 线
+
+缺失值（NaN，如停牌或上市较晚）会被跳过，递推类指标在该列第一个有效值处开始
+"""
+
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+EMA_SPAN = 20
+BOLLINGER_WINDOW = 20
+BOLLINGER_K = 2.0
+HIGH_WINDOW = 20
+# 浮点滚动和每更新这么多次后重新精确求和一次，避免误差累积
+RESUM_INTERVAL = 1000
+
+
+# ---------------------------------------------------------------------------
+# 批量计算
+# ---------------------------------------------------------------------------
+
+def _as_matrix(values):
+    values = np.asarray(values, dtype=float)
+    return values.reshape(len(values), -1) if values.ndim == 1 else values
+
+
+def _prev_valid(values):
+    """每个位置上一个有效值（跳过缺失值），没有时为 NaN"""
+    values = _as_matrix(values)
+    prev = np.full_like(values, np.nan)
+    last = np.full(values.shape[1], np.nan)
+    for t in range(len(values)):
+        prev[t] = last
+        last = np.where(np.isnan(values[t]), last, values[t])
+    return prev
+
+
+def ema(values, span=EMA_SPAN):
+    """指数移动平均（以第一个有效值为起点，alpha = 2 / (span + 1)）"""
+    values = _as_matrix(values)
+    alpha = 2.0 / (span + 1)
+    out = np.full_like(values, np.nan)
+    level = np.full(values.shape[1], np.nan)
+    for t in range(len(values)):
+        x = values[t]
+        level = np.where(np.isnan(level), x, np.where(np.isnan(x), level, level + alpha * (x - level)))
+        out[t] = np.where(np.isnan(x), np.nan, level)
+    return out
+
+
+def wilder_average(values, period):
+    """
+    Wilder 平滑均值（RSI / ATR 使用）：前 period 个有效值取简单平均，
+    之后 avg = avg + (x - avg) / period；有效值不足 period 个时为 NaN
+    """
+    values = _as_matrix(values)
+    out = np.full_like(values, np.nan)
+    count = np.zeros(values.shape[1], dtype=int)
+    total = np.zeros(values.shape[1])
+    avg = np.full(values.shape[1], np.nan)
+    for t in range(len(values)):
+        x = values[t]
+        valid = ~np.isnan(x)
+        count += valid
+        warming = valid & (count <= period)
+        total = np.where(warming, total + np.nan_to_num(x), total)
+        avg = np.where(warming & (count == period), total / period, avg)
+        smoothing = valid & (count > period)
+        avg = np.where(smoothing, avg + (x - avg) / period, avg)
+        out[t] = np.where(valid & (count >= period), avg, np.nan)
+    return out
+
+
+def rsi(close, period=RSI_PERIOD):
+    """相对强弱指数（Wilder，0-100），需要 period + 1 根有效 K 线"""
+    close = _as_matrix(close)
+    change = close - _prev_valid(close)
+    gain = np.where(np.isnan(change), np.nan, np.maximum(change, 0.0))
+    loss = np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0))
+    avg_gain = wilder_average(gain, period)
+    avg_loss = wilder_average(loss, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        value = 100 - 100 / (1 + avg_gain / avg_loss)
+    # 没有下跌时 RSI 为 100
+    return np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, value)
+
+
+def true_range(high, low, close):
+    """真实波幅：max(最高-最低, |最高-昨收|, |最低-昨收|)，第一根取最高-最低"""
+    high, low, close = _as_matrix(high), _as_matrix(low), _as_matrix(close)
+    prev_close = _prev_valid(close)
+    with np.errstate(invalid='ignore'):
+        gaps = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+        return np.where(np.isnan(close), np.nan, np.fmax(high - low, gaps))
+
+
+def atr(high, low, close, period=ATR_PERIOD):
+    """平均真实波幅（Wilder）"""
+    return wilder_average(true_range(high, low, close), period)
+
+
+def _windows(values, window):
+    """(日期 × 股票 × 窗口) 视图，前 window - 1 行补 NaN"""
+    values = _as_matrix(values)
+    padded = np.vstack([np.full((window - 1, values.shape[1]), np.nan), values])
+    return sliding_window_view(padded, window, axis=0)
+
+
+def bollinger(close, window=BOLLINGER_WINDOW, k=BOLLINGER_K):
+    """
+    布林带（总体标准差），窗口内有缺失值时为 NaN
+
+    Returns:
+        tuple: (中轨, 上轨, 下轨)
+    """
+    windows = _windows(close, window)
+    mid = windows.mean(axis=-1)
+    std = windows.std(axis=-1)
+    return mid, mid + k * std, mid - k * std
+
+
+def rolling_high(high, window=HIGH_WINDOW, include_current=False):
+    """
+    N 日最高价（突破入场用），窗口内有缺失值时为 NaN
+
+    Args:
+        include_current: False 时为前 N 日（不含当天）的最高价，收盘价高于它即为突破
+    """
+    high = _as_matrix(high)
+    if not include_current:
+        high = np.vstack([np.full((1, high.shape[1]), np.nan), high[:-1]])
+    return _windows(high, window).max(axis=-1)
+
+
+def latest(high, low, close, names=None):
+    """
+    最新一天的指标值，供评分使用
+
+    Args:
+        high, low, close: (日期 × 股票) 矩阵（每列的有效 K 线应连续，末尾为最新一天）
+        names: 需要的指标（默认全部）
+
+    Returns:
+        dict: 指标名称 -> 一维数组（长度为股票数）
+    """
+    names = set(names or INDICATORS)
+    result = {}
+    if 'rsi' in names:
+        result['rsi'] = rsi(close)[-1]
+    if 'atr' in names:
+        result['atr'] = atr(high, low, close)[-1]
+    if 'ema' in names:
+        result['ema'] = ema(close)[-1]
+    if names & {'bb_mid', 'bb_upper', 'bb_lower'}:
+        mid, upper, lower = bollinger(close)
+        result.update({'bb_mid': mid[-1], 'bb_upper': upper[-1], 'bb_lower': lower[-1]})
+    if names & {'high_n', 'breakout'}:
+        high_n = rolling_high(high)[-1]
+        result['high_n'] = high_n
+        with np.errstate(invalid='ignore'):
+            result['breakout'] = _as_matrix(close)[-1] > high_n
+    return {name: result[name] for name in INDICATORS if name in names}
+
+
+INDICATORS = ['rsi', 'atr', 'ema', 'bb_mid', 'bb_upper', 'bb_lower', 'high_n', 'breakout']
+
+
+# ---------------------------------------------------------------------------
+# 增量计算
+# ---------------------------------------------------------------------------
+
+class RollingWindow:
+    """固定长度窗口的滚动和（追加与修改最后一个值都是 O(1)）"""
+
+    __slots__ = ('size', 'values', 'total', 'updates')
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.updates = 0
+
+    def push(self, value):
+        """追加一个值（窗口已满时移出最早的值）"""
+        if len(self.values) == self.size:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self._tick()
+
+    def replace_last(self, value):
+        """修改最后一个值（当天尚未收盘的日线）"""
+        self.total += value - self.values[-1]
+        self.values[-1] = value
+        self._tick()
+
+    def _tick(self):
+        self.updates += 1
+        if self.updates >= RESUM_INTERVAL:
+            self.total = sum(self.values)
+            self.updates = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def mean(self):
+        return self.total / len(self.values)
+
+
+class EMA:
+    """增量 EMA"""
+
+    __slots__ = ('alpha', 'level', 'prev_level')
+
+    def __init__(self, span=EMA_SPAN):
+        self.alpha = 2.0 / (span + 1)
+        self.level = None
+        self.prev_level = None   # 最后一根 K 线之前的值，用于修改最后一根
+
+    def update(self, value, new_bar=True):
+        if new_bar:
+            self.prev_level = self.level
+        base = self.prev_level
+        self.level = value if base is None else base + self.alpha * (value - base)
+        return self.level
+
+    @property
+    def value(self):
+        return self.level
+
+
+class WilderAverage:
+    """增量 Wilder 平滑均值"""
+
+    __slots__ = ('period', 'count', 'total', 'avg', 'saved')
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.avg = None
+        self.saved = (0, 0.0, None)
+
+    def update(self, value, new_bar=True):
+        if new_bar:
+            self.saved = (self.count, self.total, self.avg)
+        count, total, avg = self.saved
+        count += 1
+        if count <= self.period:
+            total += value
+            avg = total / self.period if count == self.period else None
+        else:
+            avg = avg + (value - avg) / self.period
+        self.count, self.total, self.avg = count, total, avg
+        return avg
+
+
+class RSI:
+    """增量 RSI"""
+
+    __slots__ = ('prev_close', 'last_close', 'gain', 'loss')
+
+    def __init__(self, period=RSI_PERIOD):
+        self.prev_close = None   # 上一根已完成 K 线的收盘价
+        self.last_close = None
+        self.gain = WilderAverage(period)
+        self.loss = WilderAverage(period)
+
+    def update(self, close, new_bar=True):
+        if new_bar:
+            self.prev_close = self.last_close
+        self.last_close = close
+        if self.prev_close is None:
+            return None
+        change = close - self.prev_close
+        avg_gain = self.gain.update(max(change, 0.0), new_bar)
+        avg_loss = self.loss.update(max(-change, 0.0), new_bar)
+        return self._value(avg_gain, avg_loss)
+
+    @staticmethod
+    def _value(avg_gain, avg_loss):
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    @property
+    def value(self):
+        return self._value(self.gain.avg, self.loss.avg) if self.prev_close is not None else None
+
+
+class ATR:
+    """增量 ATR"""
+
+    __slots__ = ('prev_close', 'last_close', 'average')
+
+    def __init__(self, period=ATR_PERIOD):
+        self.prev_close = None
+        self.last_close = None
+        self.average = WilderAverage(period)
+
+    def update(self, high, low, close, new_bar=True):
+        if new_bar:
+            self.prev_close = self.last_close
+        self.last_close = close
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        return self.average.update(tr, new_bar)
+
+    @property
+    def value(self):
+        return self.average.avg
+
+
+class Bollinger:
+    """增量布林带（滚动和与平方和）"""
+
+    __slots__ = ('k', 'sums', 'squares')
+
+    def __init__(self, window=BOLLINGER_WINDOW, k=BOLLINGER_K):
+        self.k = k
+        self.sums = RollingWindow(window)
+        self.squares = RollingWindow(window)
+
+    def update(self, close, new_bar=True):
+        if new_bar or not len(self.sums):
+            self.sums.push(close)
+            self.squares.push(close * close)
+        else:
+            self.sums.replace_last(close)
+            self.squares.replace_last(close * close)
+        return self.value
+
+    @property
+    def value(self):
+        """(中轨, 上轨, 下轨)，K 线不足一个窗口时为 None"""
+        if len(self.sums) < self.sums.size:
+            return None
+        mid = self.sums.mean()
+        std = max(self.squares.mean() - mid * mid, 0.0) ** 0.5
+        return mid, mid + self.k * std, mid - self.k * std
+
+
+class RollingHigh:
+    """
+    增量 N 日最高价（单调队列，均摊 O(1)）
+
+    判断突破时先用当天价格与 value（前 N 日最高价）比较，收盘后再 update 当天的最高价
+    """
+
+    __slots__ = ('window', 'index', 'queue')
+
+    def __init__(self, window=HIGH_WINDOW):
+        self.window = window
+        self.index = -1
+        self.queue = deque()   # (序号, 最高价)，最高价单调递减
+
+    def update(self, high, new_bar=True):
+        if new_bar or self.index < 0:
+            self.index += 1
+        elif self.queue and self.queue[-1][0] == self.index:
+            # 修改最后一根：当天最高价只会变高，替换后重新维护单调性
+            high = max(high, self.queue.pop()[1])
+        while self.queue and self.queue[-1][1] <= high:
+            self.queue.pop()
+        self.queue.append((self.index, high))
+        while self.queue[0][0] <= self.index - self.window:
+            self.queue.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        """最近 N 根（含最后一根）K 线的最高价，不足 N 根时为 None"""
+        if self.index + 1 < self.window:
+            return None
+        return self.queue[0][1]
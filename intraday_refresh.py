@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+盘中增量刷新 - 交易时段内每隔几分钟刷新一次增强版报告
+
+每个章节（立场、观察名单、风险提示、新闻等）的输入都记录内容哈希：
+搜索结果没有变化时不重新提取指标、计算立场；只重新渲染输入有变化的章节；
+只有章节内容确实变化时才推送飞书更新（只包含变化的章节）
+
+用法：
+    python3 intraday_refresh.py                  # 每 5 分钟刷新一次，收盘后退出
+    python3 intraday_refresh.py --interval 120   # 每 2 分钟刷新一次
+    python3 intraday_refresh.py --once           # 只刷新一次（适合由 cron 调用）
+
+新闻搜索结果有缓存（MARCUS_SEARCH_TTL，默认 15 分钟）；刷新时只接受不超过刷新间隔一半的缓存结果，
+保证每次刷新都重新搜索（不影响同一进程中其他任务使用的缓存有效期）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import marcus_enhanced
+import trading_calendar
+from report_template import IncrementalRenderer
+
+NEW_YORK = trading_calendar.NEW_YORK
+DEFAULT_INTERVAL = float(os.environ.get('MARCUS_REFRESH_INTERVAL', '300'))
+# 上次刷新的章节哈希与内容（--once 模式由 cron 反复调用时据此判断是否有变化）
+STATE_PATH = os.path.join(marcus_enhanced.CACHE_DIR, 'intraday_state.json')
+
+# 只在推送中显示的章节名称（header / footer 不单独推送）
+SECTION_TITLES = {
+    'stance': '市场立场',
+    'watchlist': '观察名单',
+    'risk': '风险提示',
+    'checklist': '交易清单',
+    'news': '市场新闻',
+    'advice': '今日建议',
+}
+
+
+def inputs_hash(market_news, stock_news):
+    """搜索结果的内容哈希"""
+    raw = json.dumps([market_news, stock_news], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def session_bounds(now_ny):
+    """当天美股常规交易时段（纽约时间，提前收盘日 13:00 收盘），休市日返回 None"""
+    return trading_calendar.session_bounds(now_ny)
+
+
+class IntradayRefresher:
+    """盘中增量刷新"""
+
+    def __init__(self, fetch=None, notify=None, state_path=None, interval=DEFAULT_INTERVAL):
+        """
+        Args:
+            fetch: 获取搜索结果的函数 fetch(symbols) -> (market_news, stock_news)，
+                默认 marcus_enhanced.fetch_report_news
+            notify: 推送函数 notify(text, idempotency_key)，默认发送到已配置的飞书
+            state_path: 刷新状态文件（可选，设置后每次刷新后保存，启动时读取当天的状态）
+            interval: 刷新间隔（秒），使用默认搜索函数时只读取不超过间隔一半的缓存结果
+        """
+        self.max_age = interval / 2
+        self.fetch = fetch or self.fetch_news
+        self.notify = notify or (lambda text, key: marcus_enhanced.send_to_feishu_if_configured(
+            text, idempotency_key=key))
+        self.renderer = IncrementalRenderer(marcus_enhanced.REPORT_SECTIONS, volatile=('footer',))
+        self.inputs = None
+        self.values = None
+        self.report = None
+        self.pushes = 0
+        self.state_path = state_path
+        if state_path:
+            self.load_state(trading_calendar.market_date().isoformat())
+
+    def fetch_news(self, symbols):
+        """默认搜索函数：缓存的搜索结果只在 max_age 内有效"""
+        return marcus_enhanced.fetch_report_news(symbols, max_age=self.max_age)
+
+    def refresh(self, now=None, push_initial=False):
+        """
+        刷新一次
+
+        Args:
+            now: 当前时间（默认当前本地时间，报告日期按纽约日期）
+            push_initial: 首次刷新（没有上次的状态）时是否推送，默认只建立基准
+
+        Returns:
+            list: 内容有变化的章节名称
+        """
+        now = now or datetime.now().astimezone()
+        market_news, stock_news = self.fetch(marcus_enhanced.WATCHLIST_SYMBOLS)
+
+        # 搜索结果没有变化时沿用上次的指标与立场
+        digest = inputs_hash(market_news, stock_news)
+        if digest != self.inputs:
+            self.inputs = digest
+            self.values = marcus_enhanced.build_report_values(market_news, stock_news)
+
+        first = self.report is None
+        values = dict(self.values, date=trading_calendar.market_date(now).isoformat(),
+                      generated_at=now.strftime('%Y-%m-%d %H:%M:%S'))
+        self.report, changed = self.renderer.update(values)
+
+        updates = [name for name in changed if name in SECTION_TITLES]
+        if updates and (push_initial or not first):
+            # 同一分钟内重复刷新（如进程重启）不会重复推送
+            key = f"marcus_intraday:{now.strftime('%Y-%m-%d %H:%M')}:" + ':'.join(
+                self.renderer.hashes[name][:12] for name in updates)
+            self.notify(self.update_text(updates, now), key)
+            self.pushes += 1
+        if self.state_path:
+            self.save_state(values['date'])
+        return changed
+
+    def load_state(self, date):
+        """读取当天保存的刷新状态（文件不存在或不是当天的状态时忽略）"""
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get('date') != date:
+            return
+        # 旧版本保存的状态缺少新增的占位符时重新计算
+        if not marcus_enhanced.REPORT_SECTIONS.slots <= set(state['values']) | {'date', 'generated_at'}:
+            return
+        self.inputs = state['inputs']
+        self.values = state['values']
+        self.renderer.hashes = state['hashes']
+        self.renderer.texts = state['texts']
+        self.report = ''
+
+    def save_state(self, date):
+        """保存刷新状态（先写临时文件再替换，避免中途退出留下损坏的文件）"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'date': date, 'inputs': self.inputs, 'values': self.values,
+                       'hashes': self.renderer.hashes, 'texts': self.renderer.texts},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def update_text(self, sections, now):
+        """只包含变化章节的更新消息"""
+        titles = '、'.join(SECTION_TITLES[name] for name in sections)
+        parts = [f"# 🔄 盘中更新 | {now.strftime('%H:%M')}\n\n**更新内容：** {titles}\n\n---\n\n"]
+        parts.extend(self.renderer.section_text(name) for name in sections)
+        parts.append(self.renderer.section_text('footer'))
+        return ''.join(parts)
+
+
+def run_session(refresher, interval=DEFAULT_INTERVAL, once=False, push_initial=False):
+    """在常规交易时段内按间隔刷新，收盘后返回"""
+    while True:
+        now_ny = datetime.now(NEW_YORK)
+        bounds = session_bounds(now_ny)
+        if bounds is None:
+            print(f"ℹ️  今日休市（{trading_calendar.closed_reason(now_ny)}）")
+            return
+        open_at, close_at = bounds
+        if now_ny >= close_at:
+            print("ℹ️  今日交易时段已结束")
+            return
+        if now_ny < open_at and not once:
+            wait = (open_at - now_ny).total_seconds()
+            print(f"⏳ 距开盘还有 {timedelta(seconds=int(wait))}，等待中...")
+            time.sleep(wait)
+            continue
+
+        started = time.monotonic()
+        changed = refresher.refresh(push_initial=push_initial)
+        stamp = datetime.now().strftime('%H:%M:%S')
+        visible = [SECTION_TITLES[name] for name in changed if name in SECTION_TITLES]
+        if visible:
+            print(f"🔄 {stamp} 更新章节：{'、'.join(visible)}（{time.monotonic() - started:.1f}s）")
+        else:
+            print(f"🔄 {stamp} 无变化（{time.monotonic() - started:.1f}s）")
+
+        if once:
+            return
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 盘中增量刷新')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='刷新间隔（秒）')
+    parser.add_argument('--once', action='store_true', help='只刷新一次')
+    parser.add_argument('--push-initial', action='store_true',
+                        help='首次刷新也推送完整内容（默认首次只建立基准）')
+    args = parser.parse_args()
+    run_session(IntradayRefresher(state_path=STATE_PATH, interval=args.interval),
+                args.interval, args.once, args.push_initial)
+
+
+if __name__ == '__main__':
+    main()
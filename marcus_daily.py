@@ -8,6 +8,9 @@ import subprocess
 import json
 from datetime import datetime
 
+import trading_calendar
+from report_index import REPORTS_DIR, update_report_index
+
 def search_market_data(query):
     """使用 web_search 获取市场数据"""
     try:
@@ -23,22 +26,21 @@ def search_market_data(query):
 
 def generate_marcus_report():
     """生成 Marcus 风格的报告"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    weekday = datetime.now().strftime('%A')
+    today = trading_calendar.market_date().isoformat()
     
-    # 检查是否是交易日
-    if weekday in ['Saturday', 'Sunday']:
+    # 检查是否是交易日（周末、节假日见 trading_calendar）
+    if not trading_calendar.is_trading_day():
         return f"""# 📈 每日动量报告 | Daily Momentum Report
 **日期：** {today}
 **交易员：** Marcus
 
 ---
 
-## ⚠️ 周末休市
+## ⚠️ 今日休市（{trading_calendar.closed_reason()}）
 
-今天是周末，美股市场休市。下个交易日请继续关注。
+今天美股市场休市，下一个交易日（{trading_calendar.next_trading_day()}）请继续关注。
 
-**周末建议：**
+**休市日建议：**
 - 复盘本周交易
 - 关注周末新闻和财报
 - 制定下周交易计划
@@ -118,9 +120,11 @@ if __name__ == '__main__':
     
     # 保存到文件
     import os
-    os.makedirs('/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports', exist_ok=True)
-    today = datetime.now().strftime('%Y-%m-%d')
-    with open(f'/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports/{today}_report.md', 'w') as f:
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    today = trading_calendar.market_date().isoformat()
+    with open(os.path.join(REPORTS_DIR, f'{today}_report.md'), 'w') as f:
         f.write(report)
     
-    print(f"\n✅ 报告已保存至 reports/{today}_report.md")
+    print(f"\n✅ 报告已保存至 {os.path.join(REPORTS_DIR, today + '_report.md')}")
+    
+    update_report_index(REPORTS_DIR)
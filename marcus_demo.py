@@ -172,9 +172,10 @@ if __name__ == '__main__':
     
     # 保存演示报告
     import os
-    os.makedirs('/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports', exist_ok=True)
+    from report_index import REPORTS_DIR
+    os.makedirs(REPORTS_DIR, exist_ok=True)
     
-    demo_path = '/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports/DEMO_report.md'
+    demo_path = os.path.join(REPORTS_DIR, 'DEMO_report.md')
     with open(demo_path, 'w') as f:
         f.write(report)
     
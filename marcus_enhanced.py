@@ -3,82 +3,266 @@
 Marcus - 每日动量报告生成器 (增强版)
 使用 OpenClaw web_search 获取实时市场数据
 支持飞书通知
+
+asyncio 与飞书通知模块只在搜索、推送时才导入，休市日的定时任务几十毫秒内即可退出。
+
+用法：
+    python3 marcus_enhanced.py
+    python3 marcus_enhanced.py --timings     # 输出模块导入与各阶段耗时
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
 import subprocess
 import json
-import re
 import os
 from datetime import datetime
 
-# 导入飞书通知模块
-try:
-    from feishu_notifier import send_report_to_feishu, FeishuNotifier
-    FEISHU_AVAILABLE = True
-except ImportError:
-    FEISHU_AVAILABLE = False
+from openclaw_worker import OpenClawWorker, WorkerCrashed, WorkerUnavailable
+import report_index
+from report_index import update_report_index
+from report_model import MarkdownRenderer, ReportData, Sentiment, Stance, WatchlistEntry, template_values
+from report_template import ReportTemplate, SectionedReport
+from search_cache import SearchCache
+from search_extract import extract_metrics, futures_trend
+from timings import StageTimer
+import trading_calendar
+
+# 本模块的导入耗时（asyncio、飞书通知模块延迟导入，不计入）
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+# 观察名单股票（逐支搜索新闻）
+WATCHLIST_SYMBOLS = ['NVDA', 'TSLA', 'AMD', 'META', 'COIN']
+
+# 并发搜索的最大进程数与单次搜索超时（秒）
+SEARCH_CONCURRENCY = int(os.environ.get('MARCUS_SEARCH_CONCURRENCY', '6'))
+SEARCH_TIMEOUT = float(os.environ.get('MARCUS_SEARCH_TIMEOUT', '30'))
+
+# 报告保存目录（MARCUS_REPORTS_DIR，默认仓库下的 reports/；与报告索引共用同一个目录）
+REPORTS_DIR = report_index.REPORTS_DIR
+
+# 搜索结果缓存目录、有效期（秒）与大小上限（MB）
+CACHE_DIR = os.environ.get('MARCUS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+SEARCH_CACHE_TTL = float(os.environ.get('MARCUS_SEARCH_TTL', '900'))
+SEARCH_CACHE_MAX_MB = float(os.environ.get('MARCUS_SEARCH_CACHE_MB', '20'))
+
+# 设为 1 且配置了 OPENCLAW_WORKER_CMD（常驻会话的启动命令）时通过常驻 OpenClaw 会话执行命令，
+# 否则每条命令单独启动进程
+USE_OPENCLAW_WORKER = (os.environ.get('MARCUS_OPENCLAW_WORKER', '0') == '1'
+                       and bool(os.environ.get('OPENCLAW_WORKER_CMD')))
+
+_search_cache = None
+_openclaw_worker = None
+
+def get_search_cache():
+    """获取 web_search 结果缓存"""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache(CACHE_DIR, ttl=SEARCH_CACHE_TTL,
+                                    max_bytes=int(SEARCH_CACHE_MAX_MB * 1024 * 1024))
+    return _search_cache
+
+def get_openclaw_worker():
+    """获取常驻 OpenClaw 会话，未启用或不可用时返回 None"""
+    global _openclaw_worker
+    if not USE_OPENCLAW_WORKER:
+        return None
+    if _openclaw_worker is None:
+        _openclaw_worker = OpenClawWorker()
+    return _openclaw_worker
+
+def _disable_openclaw_worker(error):
+    """常驻会话不可用时退回单次进程模式"""
+    global USE_OPENCLAW_WORKER
+    USE_OPENCLAW_WORKER = False
+    print(f"⚠️  OpenClaw 常驻会话不可用（{error}），改为逐次启动进程")
+
+def _search_params(args):
+    """从 web_search 参数中取出 (查询语句, 结果数量)"""
+    params = dict(zip(args[::2], args[1::2]))
+    return params.get('--query', ''), params.get('--count', '5')
 
 def run_openclaw_command(command, args):
-    """运行 OpenClaw 命令"""
+    """运行 OpenClaw 命令（web_search 优先读取缓存）"""
+    if command == 'web_search':
+        query, count = _search_params(args)
+        cached = get_search_cache().get(query, count)
+        if cached is not None:
+            return cached
+    worker = get_openclaw_worker()
+    if worker:
+        try:
+            result = worker.run(command, args, timeout=SEARCH_TIMEOUT)
+            if command == 'web_search':
+                get_search_cache().put(query, count, result)
+            return result
+        except WorkerCrashed:
+            pass  # 本次改用单次进程，下次请求时会话自动重启
+        except WorkerUnavailable as e:
+            _disable_openclaw_worker(e)
     try:
         cmd = ['openclaw', command] + args
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=SEARCH_TIMEOUT)
+        # 命令失败时的输出不缓存，下次请求重新搜索
+        if command == 'web_search' and result.returncode == 0:
+            get_search_cache().put(query, count, result.stdout)
         return result.stdout
     except Exception as e:
         return f"Error: {e}"
 
+async def _run_openclaw_async(command, args, semaphore, timeout):
+    """
+    异步运行一条 OpenClaw 命令，超时则终止子进程
+    
+    Returns:
+        tuple: (输出文本, 是否可以缓存)，命令失败的输出不缓存
+    """
+    import asyncio
+    async with semaphore:
+        worker = get_openclaw_worker()
+        if worker:
+            try:
+                future = asyncio.wrap_future(worker.submit(command, args))
+                return await asyncio.wait_for(future, timeout), True
+            except asyncio.TimeoutError:
+                return f"Error: 搜索超时（{timeout:g}s）", False
+            except WorkerCrashed:
+                pass  # 本次改用单次进程，下次请求时会话自动重启
+            except WorkerUnavailable as e:
+                _disable_openclaw_worker(e)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                'openclaw', command, *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except Exception as e:
+            return f"Error: {e}", False
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return f"Error: 搜索超时（{timeout:g}s）", False
+        return stdout.decode('utf-8', errors='replace'), proc.returncode == 0
+
+async def _run_searches(searches, concurrency, timeout, on_result, max_age):
+    import asyncio
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(key, query, count):
+        args = ['--query', query, '--count', str(count)]
+        text, cacheable = await _run_openclaw_async('web_search', args, semaphore, timeout)
+        if cacheable:
+            cache.put(query, count, text)
+        return key, text
+
+    cache = get_search_cache()
+    results = {}
+    tasks = []
+    for key, (query, count) in searches.items():
+        # 缓存命中的查询不再启动子进程
+        cached = cache.get(query, count, max_age)
+        if cached is not None:
+            results[key] = cached
+            if on_result:
+                on_result(key, cached)
+        else:
+            tasks.append(run(key, query, count))
+    # 先完成的先处理，不必等待最慢的搜索
+    for finished in asyncio.as_completed(tasks):
+        key, text = await finished
+        results[key] = text
+        if on_result:
+            on_result(key, text)
+    return results
+
+def run_openclaw_searches(searches, concurrency=SEARCH_CONCURRENCY, timeout=SEARCH_TIMEOUT, on_result=None,
+                          max_age=None):
+    """
+    并发执行多条 web_search
+    
+    Args:
+        searches: {键: (查询语句, 结果数量)}
+        concurrency: 同时运行的 OpenClaw 进程数上限
+        timeout: 单条搜索的超时（秒）
+        on_result: 每条搜索完成时的回调 on_result(键, 结果文本)（可选）
+        max_age: 可接受的最长缓存时间（秒，可选，默认为搜索缓存的 TTL）
+    
+    Returns:
+        dict: {键: 结果文本}，失败或超时的结果以 "Error" 开头
+    """
+    if not searches:
+        return {}
+    import asyncio
+    return asyncio.run(_run_searches(searches, concurrency, timeout, on_result, max_age))
+
+def market_news_query():
+    """市场新闻的搜索语句"""
+    today = trading_calendar.market_date().isoformat()
+    return f"stock market news {today} premarket futures VIX", 5
+
+def stock_data_query(symbol):
+    """个股数据的搜索语句"""
+    return f"{symbol} stock price premarket volume today", 3
+
 def search_market_news():
     """搜索最新市场新闻"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    query = f"stock market news {today} premarket futures VIX"
-    return run_openclaw_command('web_search', ['--query', query, '--count', '5'])
+    query, count = market_news_query()
+    return run_openclaw_command('web_search', ['--query', query, '--count', str(count)])
 
 def search_stock_data(symbol):
     """搜索个股数据"""
-    query = f"{symbol} stock price premarket volume today"
-    return run_openclaw_command('web_search', ['--query', query, '--count', '3'])
+    query, count = stock_data_query(symbol)
+    return run_openclaw_command('web_search', ['--query', query, '--count', str(count)])
+
+def fetch_report_news(symbols=WATCHLIST_SYMBOLS, max_age=None):
+    """
+    并发获取市场新闻与观察名单个股新闻
+    
+    Args:
+        symbols: 观察名单股票代码
+        max_age: 可接受的最长缓存时间（秒，可选，默认为搜索缓存的 TTL）
+    
+    Returns:
+        tuple: (市场新闻文本, {股票代码: 搜索结果文本})
+    """
+    searches = {'__market__': market_news_query()}
+    searches.update({symbol: stock_data_query(symbol) for symbol in symbols})
+    results = run_openclaw_searches(searches, max_age=max_age)
+    market_news = results.pop('__market__')
+    return market_news, results
 
 def parse_vix_from_search(search_result):
     """从搜索结果解析 VIX 数据"""
-    # 简单解析，实际使用中可能需要更复杂的逻辑
-    patterns = [
-        r'VIX\s*[:\s]+(\d+\.?\d*)',
-        r'VIX\s+(\d+\.?\d*)',
-        r'volatility\s+index\s*[:\s]+(\d+\.?\d*)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, search_result, re.IGNORECASE)
-        if match:
-            return float(match.group(1))
-    return 20.0  # 默认值
+    vix = extract_metrics(search_result)['vix']
+    return vix if vix is not None else 20.0  # 默认值
 
 def determine_stance(vix, market_trend):
-    """决定市场立场"""
-    if vix < 15 and market_trend > 0.5:
+    """决定市场立场（阈值与 marcus_report、回测共用 scoring.STANCE_THRESHOLDS）"""
+    from scoring import STANCE_THRESHOLDS as t  # 延迟导入：scoring 依赖 pandas，休市日不需要
+    
+    if vix < t['vix_low'] and market_trend > t['spy_up']:
         return 'Aggressive Buy', f'VIX={vix:.1f} 低波动，市场放量上涨'
-    elif vix > 25 or market_trend < -1:
+    elif vix > t['vix_high'] or market_trend < t['spy_down']:
         return 'Hold/Cash', f'VIX={vix:.1f} 高波动，风险偏高'
     else:
         return 'Conservative Buy', f'VIX={vix:.1f} 中性，震荡格局'
 
-def generate_enhanced_report():
-    """生成增强版报告"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    weekday = datetime.now().strftime('%A')
-    
-    # 周末检查
-    if weekday in ['Saturday', 'Sunday']:
-        return f"""# 📈 每日动量报告 | Daily Momentum Report
-**日期：** {today}
+# 报告版式只在导入时编译一次，渲染时只填充动态内容
+WEEKEND_TEMPLATE = ReportTemplate("""# 📈 每日动量报告 | Daily Momentum Report
+**日期：** {{date}}
 **交易员：** Marcus
 
 ---
 
-## ⚠️ 周末休市
+## ⚠️ 今日休市（{{reason}}）
 
-今天是周末，美股市场休市。
+今天美股市场休市，下一个交易日：{{next_session}}。
 
-**周末建议：**
+**休市日建议：**
 - 复盘本周交易表现
 - 关注周末重要新闻和财报
 - 制定下周交易计划
@@ -91,49 +275,40 @@ def generate_enhanced_report():
 
 ---
 
-*报告生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
-    
-    # 搜索市场数据
-    print("🔍 正在获取市场数据...")
-    market_news = search_market_news()
-    
-    # 尝试获取 VIX（简化处理，使用默认值）
-    vix = 18.5  # 默认中性值
-    market_trend = 0.2  # 默认小幅上涨
-    
-    stance, reason = determine_stance(vix, market_trend)
-    
-    # 生成报告
-    report = f"""# 📈 每日动量报告 | Daily Momentum Report
-**日期：** {today}
+*报告生成时间：{{generated_at}}*
+""")
+
+# 报告按章节拆分，盘中刷新时只重新渲染输入有变化的章节（见 intraday_refresh.py）
+REPORT_SECTIONS = SectionedReport([
+    # 标题
+    ('header', ReportTemplate("""# 📈 每日动量报告 | Daily Momentum Report
+**日期：** {{date}}
 **交易员：** Marcus
 
 ---
 
-## 1️⃣ Marcus 的市场立场
+""")),
+    # 市场立场与情绪指标
+    ('stance', ReportTemplate("""## 1️⃣ Marcus 的市场立场
 
-**{stance}**
+**{{stance}}**
 
-**理由：** {reason}
+**理由：** {{reason}}
 
 **市场情绪分析：**
-- VIX 恐慌指数：{vix:.1f}
-- 股指期货：待开盘确认
-- 盘前成交量：待数据更新
+- VIX 恐慌指数：{{vix}}
+- 股指期货：{{futures}}
+- 盘前成交量：{{volume}}
 
 ---
 
-## 2️⃣ 5% 观察名单
+""")),
+    # 观察名单
+    ('watchlist', ReportTemplate("""## 2️⃣ 5% 观察名单
 
 | 股票代码 | 选股逻辑 | 入场条件 | 止损 | 成功概率 |
 |---------|---------|---------|------|---------|
-| NVDA | AI 芯片龙头，数据中心需求强劲 | 突破 ${145:.2f} | <${138:.2f} | 68% |
-| TSLA | 高波动性，FSD 进展催化 | 站稳 ${250:.2f} | <${235:.2f} | 55% |
-| AMD | 半导体复苏，AI 芯片追赶 | 突破 ${125:.2f} | <${118:.2f} | 62% |
-| META | 广告收入增长，回购支撑 | 回调至 ${580:.2f} | <${550:.2f} | 65% |
-| COIN | 加密货币反弹，BTC 联动 | BTC>$95K 时介入 | -12% | 52% |
-
+{{watchlist_table}}
 **选股逻辑说明：**
 1. **NVDA** - AI 基础设施核心受益者，财报后动量延续
 2. **TSLA** - 高 Beta 特性适合日内交易，关注 FSD 新闻
@@ -143,34 +318,15 @@ def generate_enhanced_report():
 
 ---
 
-## 3️⃣ 风险提示
+""")),
+    # 风险提示与仓位建议
+    ('risk', ReportTemplate("""## 3️⃣ 风险提示
 
 **仓位建议：**
-"""
-    
-    if stance == 'Aggressive Buy':
-        report += "- ✅ 可使用 70-80% 仓位\n"
-        report += "- 集中参与高确定性机会\n"
-        report += "- 可适当提高单笔仓位至 25%\n"
-    elif stance == 'Conservative Buy':
-        report += "- ⚠️ 建议使用 30-50% 仓位\n"
-        report += "- 分散配置，不超過 3 支股票\n"
-        report += "- 严格止损，单笔亏损<2%\n"
-    else:
-        report += "- 🛑 建议现金为主（<20% 仓位）\n"
-        report += "- 等待明确市场信号\n"
-        report += "- 可关注防御性板块\n"
-    
-    report += f"""
+{{position_advice}}
 **主要风险点：**
-- 📊 VIX={vix:.1f}，"""
-    
-    if vix > 20:
-        report += "波动率偏高，注意仓位控制\n"
-    else:
-        report += "波动率正常，可适度参与\n"
-    
-    report += """- 📰 关注今日经济数据发布（CPI/非农/美联储讲话等）
+- 📊 VIX={{vix}}，{{vix_note}}
+- 📰 关注今日经济数据发布（CPI/非农/美联储讲话等）
 - 💰 财报季注意个股黑天鹅事件
 - 🌏 地缘政治风险可能引发盘中波动
 - ⏰ 严格执行止损，亏损不超过总资金 2%
@@ -184,7 +340,9 @@ def generate_enhanced_report():
 
 ---
 
-## 📋 今日交易清单
+""")),
+    # 交易清单（固定内容）
+    ('checklist', ReportTemplate("""## 📋 今日交易清单
 
 **开盘前确认：**
 - [ ] 查看盘前期货走势（SPY/QQQ）
@@ -200,39 +358,179 @@ def generate_enhanced_report():
 
 ---
 
-## 📰 市场新闻摘要
+""")),
+    # 市场新闻与个股动态
+    ('news', ReportTemplate("""## 📰 市场新闻摘要
 
 *最新市场动态（数据来源：web_search）*
 
-"""
-    
-    if market_news and 'Error' not in market_news:
-        # 简化显示搜索结果
-        news_lines = market_news.strip().split('\n')[:5]
-        for line in news_lines:
-            if line.strip():
-                report += f"- {line.strip()}\n"
-    else:
-        report += "- 暂无最新数据，请自行查看财经新闻\n"
-    
-    report += f"""
+{{news}}
 ---
 
-## 💬 Marcus 的今日建议
+""")),
+    # 今日建议
+    ('advice', ReportTemplate("""## 💬 Marcus 的今日建议
 
-> "市场永远是对的，你的任务是识别趋势并顺势而为。今天{stance.split()[0].lower()}的立场下，{'积极寻找高确定性机会' if 'Aggressive' in stance else '保持耐心，等待最佳击球点' if 'Hold' in stance else '精选个股，控制仓位'}。记住：保住本金永远是第一位的。"
+> "市场永远是对的，你的任务是识别趋势并顺势而为。今天{{stance_word}}的立场下，{{advice}}。记住：保住本金永远是第一位的。"
 
 ---
 
-*报告生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*  
+""")),
+    # 生成时间与免责声明（每次都会变化，不算作内容更新）
+    ('footer', ReportTemplate("""*报告生成时间：{{generated_at}}*  
 *数据来源：Yahoo Finance / Web Search*  
 *免责声明：本报告仅供参考，不构成投资建议。交易有风险，入市需谨慎。*
-"""
+""")),
+])
+
+# 随市场立场变化的固定段落
+POSITION_ADVICE = {
+    'Aggressive Buy': "- ✅ 可使用 70-80% 仓位\n- 集中参与高确定性机会\n- 可适当提高单笔仓位至 25%\n",
+    'Conservative Buy': "- ⚠️ 建议使用 30-50% 仓位\n- 分散配置，不超過 3 支股票\n- 严格止损，单笔亏损<2%\n",
+    'Hold/Cash': "- 🛑 建议现金为主（<20% 仓位）\n- 等待明确市场信号\n- 可关注防御性板块\n",
+}
+DAILY_ADVICE = {
+    'Aggressive Buy': '积极寻找高确定性机会',
+    'Conservative Buy': '精选个股，控制仓位',
+    'Hold/Cash': '保持耐心，等待最佳击球点',
+}
+
+# 观察名单与交易计划（固定内容）
+WATCHLIST = [
+    WatchlistEntry('NVDA', 'AI 芯片龙头，数据中心需求强劲', '突破 $145.00', '<$138.00', '68%'),
+    WatchlistEntry('TSLA', '高波动性，FSD 进展催化', '站稳 $250.00', '<$235.00', '55%'),
+    WatchlistEntry('AMD', '半导体复苏，AI 芯片追赶', '突破 $125.00', '<$118.00', '62%'),
+    WatchlistEntry('META', '广告收入增长，回购支撑', '回调至 $580.00', '<$550.00', '65%'),
+    WatchlistEntry('COIN', '加密货币反弹，BTC 联动', 'BTC>$95K 时介入', '-12%', '52%'),
+]
+RISK_TIPS = [
+    '关注今日经济数据发布（CPI/非农/美联储讲话等）',
+    '财报季注意个股黑天鹅事件',
+    '地缘政治风险可能引发盘中波动',
+    '严格执行止损，亏损不超过总资金 2%',
+]
+
+def news_items(market_news, stock_news):
+    """
+    从搜索结果中取出市场新闻（前 5 行）与观察名单个股动态（每支取第一条结果）
     
-    return report
+    Returns:
+        tuple: ([新闻], [(股票代码, 动态)])
+    """
+    market_lines = []
+    if market_news and 'Error' not in market_news:
+        # 简化显示搜索结果
+        market_lines = [line.strip() for line in market_news.strip().split('\n')[:5] if line.strip()]
+    
+    stock_lines = []
+    for symbol in WATCHLIST_SYMBOLS:
+        text = stock_news.get(symbol, '')
+        first = next((line.strip() for line in text.splitlines() if line.strip()), '')
+        if first and 'Error' not in text:
+            stock_lines.append((symbol, first))
+    return market_lines, stock_lines
+
+def report_values(data):
+    """增强版报告模板的占位符内容"""
+    values = template_values(data)
+    values['watchlist_table'] = ''.join(
+        f"| {s.symbol} | {s.logic} | {s.entry} | {s.stop} | {s.probability} |\n" for s in data.watchlist)
+    return values
+
+# 增强版 Markdown 渲染器（飞书卡片、纯文本等其他格式见 report_model）
+render_markdown = MarkdownRenderer(REPORT_SECTIONS, values=report_values)
+
+def generate_enhanced_report(now=None, data=None):
+    """
+    生成增强版报告
+    
+    Args:
+        now: 报告时间（可选，默认当前时间，便于测试时指定交易日）
+        data: 已计算好的报告数据（可选，默认调用 generate_report_data）
+    """
+    now = now or datetime.now().astimezone()
+    data = data or generate_report_data(now)
+    if data is None:
+        return WEEKEND_TEMPLATE.render(
+            date=trading_calendar.market_date(now).isoformat(), reason=trading_calendar.closed_reason(now),
+            next_session=trading_calendar.next_trading_day(now),
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return render_markdown(data)
+
+def is_market_closed(now=None):
+    """今天（默认纽约当天）是否休市：周末、节假日（见 trading_calendar）"""
+    return not trading_calendar.is_trading_day(now)
+
+def generate_report_data(now=None):
+    """
+    获取市场数据并计算报告数据（每次运行只需调用一次，各种输出格式共用）
+    
+    Returns:
+        ReportData: 报告数据，休市日返回 None
+    """
+    now = now or datetime.now().astimezone()
+    
+    # 休市检查
+    if is_market_closed(now):
+        return None
+    
+    # 搜索市场数据（市场新闻与个股新闻并发获取）
+    print("🔍 正在获取市场数据...")
+    market_news, stock_news = fetch_report_news(WATCHLIST_SYMBOLS)
+    return build_report_data(market_news, stock_news, now)
 
-def send_to_feishu_if_configured(report, report_data=None):
-    """如果配置了飞书 webhook，则发送通知"""
+def build_report_data(market_news, stock_news, now=None):
+    """
+    由搜索结果计算报告数据
+    
+    Returns:
+        ReportData: 报告数据
+    """
+    # 单次扫描全部搜索结果，提取 VIX、股指期货与个股盘前数据（取不到时使用默认值）
+    search_text = '\n'.join(text for text in [market_news, *stock_news.values()]
+                            if text and not text.startswith('Error'))
+    metrics = extract_metrics(search_text, WATCHLIST_SYMBOLS)
+    vix = metrics['vix'] if metrics['vix'] is not None else 18.5  # 默认中性值
+    market_trend = futures_trend(metrics, default=0.2)  # 默认小幅上涨
+    
+    stance, reason = determine_stance(vix, market_trend)
+    market_lines, stock_lines = news_items(market_news, stock_news)
+    
+    now = now or datetime.now().astimezone()
+    return ReportData(
+        date=trading_calendar.market_date(now).isoformat(),
+        stance=Stance(stance, reason),
+        sentiment=Sentiment(vix=vix, trend=market_trend, futures=metrics['futures'],
+                            premarket_volume=metrics['premarket_volume']),
+        watchlist=list(WATCHLIST),
+        position_advice=POSITION_ADVICE[stance],
+        risk_tips=RISK_TIPS,
+        advice=DAILY_ADVICE[stance],
+        market_news=market_lines,
+        stock_news=stock_lines,
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    )
+
+def build_report_values(market_news, stock_news):
+    """
+    由搜索结果计算报告各章节的内容（不含日期与生成时间，盘中刷新按章节比较）
+    
+    Returns:
+        dict: 报告模板占位符 -> 内容
+    """
+    values = report_values(build_report_data(market_news, stock_news))
+    del values['date'], values['generated_at']
+    return values
+
+def send_to_feishu_if_configured(report, report_data=None, idempotency_key=None):
+    """
+    如果配置了飞书 webhook，则发送通知
+    
+    Args:
+        report: 报告文本
+        report_data: 结构化报告数据（可选）
+        idempotency_key: 幂等键（可选，默认按日期，当天重跑不会重复推送）
+    """
     config_path = os.path.join(os.path.dirname(__file__), 'feishu_config.json')
     
     if not os.path.exists(config_path):
@@ -250,11 +548,26 @@ def send_to_feishu_if_configured(report, report_data=None):
             print("ℹ️  飞书通知已禁用")
             return None
         
-        print("📬 正在发送飞书通知...")
-        result = send_report_to_feishu(webhook_url, report, report_data)
+        try:
+            from feishu_notifier import send_report_to_feishu
+            from feishu_outbox import FeishuOutbox, spawn_drainer
+        except ImportError as e:
+            print(f"⚠️  飞书通知模块不可用：{e}")
+            return None
+        
+        # 只写入发送队列并立即返回，由后台发送进程负责发送与重试
+        print("📬 正在加入飞书发送队列...")
+        outbox = FeishuOutbox()
+        result = send_report_to_feishu(
+            webhook_url, report, report_data, outbox=outbox,
+            idempotency_key=idempotency_key or f"marcus_enhanced:{trading_calendar.market_date().isoformat()}")
+        outbox.close()
         
-        if result.get('success'):
-            print("✅ 飞书通知发送成功！")
+        if result.get('queued'):
+            spawn_drainer(outbox.path)
+            print(f"✅ {result.get('message')}，后台发送中（python3 feishu_outbox.py status 查看状态）")
+        elif result.get('success'):
+            print(f"ℹ️  {result.get('message')}")
         else:
             print(f"❌ 飞书通知发送失败：{result.get('message')}")
         
@@ -265,21 +578,61 @@ def send_to_feishu_if_configured(report, report_data=None):
         return None
 
 
-if __name__ == '__main__':
+def main(tag=None, timer=None):
+    """
+    生成、保存并推送一次报告（命令行入口，常驻调度进程 scheduler.py 也直接调用）
+    
+    Args:
+        tag: 同一天多次运行时的标记（如 open / close），区分报告文件名与推送幂等键
+        timer: 记录各阶段耗时的 StageTimer（可选）
+    
+    Returns:
+        str: 报告内容，休市日返回 None
+    """
+    timer = timer or StageTimer(enabled=False)
+    # 报告日期、文件名与推送幂等键都按纽约日期（北京时间凌晨运行的尾盘任务仍属于纽约前一天）
+    now = datetime.now().astimezone()
+    today = trading_calendar.market_date(now).isoformat()
+    
+    # 休市日在搜索、推送之前退出（不启动 OpenClaw，也不导入飞书模块）
+    with timer.stage('休市检查'):
+        closed = is_market_closed(now)
+    if closed:
+        print(f"ℹ️  {today} 美股休市（{trading_calendar.closed_reason(now)}），跳过报告生成")
+        return None
+    
     print("🚀 Marcus 正在生成每日动量报告...\n")
-    report = generate_enhanced_report()
+    with timer.stage('搜索数据'):
+        data = generate_report_data(now)
+    with timer.stage('渲染'):
+        report = generate_enhanced_report(now, data)
     print(report)
     
     # 保存到文件
-    os.makedirs('/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports', exist_ok=True)
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    report_path = f'/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports/{today}_report.md'
-    with open(report_path, 'w') as f:
-        f.write(report)
-    
-    print(f"\n✅ 报告已保存至：{report_path}")
+    with timer.stage('保存与索引'):
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        report_path = os.path.join(REPORTS_DIR, f'{today}_{tag}_report.md' if tag else f'{today}_report.md')
+        with open(report_path, 'w') as f:
+            f.write(report)
+        
+        print(f"\n✅ 报告已保存至：{report_path}")
+        update_report_index(REPORTS_DIR)
     
     # 发送飞书通知
     print("\n" + "="*50)
-    send_to_feishu_if_configured(report)
+    with timer.stage('飞书推送'):
+        # 卡片与 Markdown 报告来自同一份 ReportData
+        send_to_feishu_if_configured(report, report_data=data,
+                                     idempotency_key=f"marcus_enhanced:{today}:{tag}" if tag else None)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Marcus 每日动量报告（增强版）')
+    parser.add_argument('--timings', action='store_true', help='输出模块导入与各阶段耗时')
+    args = parser.parse_args()
+    
+    timer = StageTimer(enabled=args.timings)
+    timer.add('导入模块', IMPORT_SECONDS)
+    main(timer=timer)
+    timer.report()
@@ -2,13 +2,31 @@
 """
 Marcus - 每日动量报告生成器
 获取市场数据并生成交易日志
+
+yfinance / pandas 等重量级依赖只在真正获取行情时才导入，
+休市日的定时任务不做任何网络请求，几十毫秒内即可退出。
+
+用法：
+    python3 marcus_report.py
+    python3 marcus_report.py --timings     # 输出模块导入与各阶段耗时
 """
 
-import json
-import requests
-from datetime import datetime, timedelta
-import yfinance as yf
-import pandas as pd
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
+import os
+from itertools import islice
+from datetime import datetime
+
+import report_index
+from report_index import update_report_index
+from report_template import ReportTemplate
+from timings import StageTimer
+import trading_calendar
+
+# 本模块（不含延迟导入的行情依赖）的导入耗时
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 # 配置
 MARKET_DATA = {
@@ -27,16 +45,97 @@ MOMENTUM_STOCKS = [
     'MRNA', 'BNTX', 'REGN', 'VRTX', 'GILD',
 ]
 
-def get_market_sentiment():
-    """获取市场情绪指标"""
+# 市场情绪用到的指数（整次运行共用，常驻内存；个股按批次评分后即释放）
+MARKET_SYMBOLS = ['^VIX', 'SPY']
+
+# 股票池文件（每行一个或逗号分隔，# 开头为注释），未配置时使用 MOMENTUM_STOCKS
+UNIVERSE_FILE = os.environ.get('MARCUS_UNIVERSE_FILE')
+
+# 批量下载时每批的股票数量（过大的批次容易被 Yahoo 限流）
+BATCH_SIZE = 100
+
+# 个股评分的行情区间：评分只用最近 20 根日线，观察名单附带的 20 日新高需要 21 根、RSI 需要 15 根
+SCORING_PERIOD = '3mo'
+# 观察名单附带的技术指标（见 indicators.py，只作参考，不影响评分）
+WATCHLIST_INDICATORS = ['rsi', 'breakout']
+
+# 报告保存目录（MARCUS_REPORTS_DIR，默认仓库下的 reports/；与报告索引共用同一个目录）
+REPORTS_DIR = report_index.REPORTS_DIR
+
+# 本地行情缓存目录与保留天数
+CACHE_DIR = os.environ.get('MARCUS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+CACHE_RETENTION_DAYS = int(os.environ.get('MARCUS_CACHE_RETENTION_DAYS', '400'))
+
+# 逐支抓取时的并发线程数、每秒请求数与单次超时（秒）
+FETCH_WORKERS = int(os.environ.get('MARCUS_FETCH_WORKERS', '8'))
+FETCH_RATE = float(os.environ.get('MARCUS_FETCH_RATE', '5'))
+FETCH_TIMEOUT = float(os.environ.get('MARCUS_FETCH_TIMEOUT', '15'))
+
+_price_cache = None
+
+def get_price_cache(keep_in_memory=False):
+    """
+    获取本次运行共用的本地行情缓存
+    
+    Args:
+        keep_in_memory: 读过的 K 线保留在内存中（常驻进程多次运行时共用）
+    """
+    global _price_cache
+    if _price_cache is None:
+        from price_cache import PriceCache
+        _price_cache = PriceCache(fetch_price_panel, CACHE_DIR, retention_days=CACHE_RETENTION_DAYS,
+                                  keep_in_memory=keep_in_memory)
+    elif keep_in_memory and _price_cache.memory is None:
+        _price_cache.memory = {}
+    return _price_cache
+
+def new_market_data():
+    """创建一次报告运行共用的数据对象（合并重复的行情请求）"""
+    from market_data import MarketData
+    return MarketData(get_price_cache(), min_period='1mo', resident=MARKET_SYMBOLS)
+
+def unique_symbols(symbols):
+    """按首次出现的顺序去掉重复的股票代码（惰性，只记录已出现的代码）"""
+    seen = set()
+    for symbol in symbols:
+        if symbol not in seen:
+            seen.add(symbol)
+            yield symbol
+
+def load_universe(path):
+    """逐行惰性读取股票池文件，不会一次性载入整个文件（重复的代码只保留第一次）"""
+    def symbols():
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.split('#', 1)[0]
+                for symbol in line.replace(',', ' ').split():
+                    yield symbol.upper()
+    return unique_symbols(symbols())
+
+def is_market_closed(now=None):
+    """今天（默认纽约当天）是否休市：周末、节假日（见 trading_calendar）"""
+    return not trading_calendar.is_trading_day(now)
+
+def iter_universe():
+    """返回本次运行的股票池迭代器"""
+    if UNIVERSE_FILE:
+        return load_universe(UNIVERSE_FILE)
+    return iter(MOMENTUM_STOCKS)
+
+def get_market_sentiment(data=None):
+    """
+    获取市场情绪指标
+    
+    Args:
+        data: 本次运行共用的 MarketData（可选）
+    """
     try:
-        vix = yf.Ticker('^VIX')
-        vix_data = vix.history(period='5d')
+        data = data or new_market_data()
+        vix_data = data.history('^VIX', period='5d')
         current_vix = vix_data['Close'].iloc[-1]
         vix_change = ((current_vix - vix_data['Close'].iloc[0]) / vix_data['Close'].iloc[0]) * 100
         
-        spy = yf.Ticker('SPY')
-        spy_data = spy.history(period='5d')
+        spy_data = data.history('SPY', period='5d')
         spy_change = ((spy_data['Close'].iloc[-1] - spy_data['Close'].iloc[0]) / spy_data['Close'].iloc[0]) * 100
         
         return {
@@ -47,32 +146,139 @@ def get_market_sentiment():
     except Exception as e:
         return {'error': str(e)}
 
-def determine_market_stance(sentiment):
-    """根据市场情绪决定立场"""
+def determine_market_stance(sentiment, thresholds=None):
+    """
+    根据市场情绪决定立场
+    
+    Args:
+        sentiment: get_market_sentiment 的结果
+        thresholds: 覆盖 scoring.STANCE_THRESHOLDS 中的部分阈值（可选）
+    """
+    from scoring import STANCE_THRESHOLDS
+    
     if 'error' in sentiment:
         return 'Hold/Cash', '数据获取失败，建议观望'
     
+    t = {**STANCE_THRESHOLDS, **(thresholds or {})}
     vix = sentiment['vix']
     vix_change = sentiment['vix_change']
     spy_change = sentiment['spy_change']
     
-    # VIX < 15 且市场上涨 -> 激进
-    if vix < 15 and spy_change > 0.5:
+    # VIX 低（默认 < 15）且市场上涨 -> 激进
+    if vix < t['vix_low'] and spy_change > t['spy_up']:
         return 'Aggressive Buy', f'VIX={vix:.1f}(-{abs(vix_change):.1f}%) 低波动，SPY +{spy_change:.1f}% 放量上涨'
-    # VIX > 25 或市场大跌 -> 观望
-    elif vix > 25 or spy_change < -1:
+    # VIX 高（默认 > 25）或市场大跌 -> 观望
+    elif vix > t['vix_high'] or spy_change < t['spy_down']:
         return 'Hold/Cash', f'VIX={vix:.1f}(+{vix_change:.1f}%) 高波动，SPY {spy_change:.1f}% 风险偏高'
     # 其他情况 -> 保守
     else:
         return 'Conservative Buy', f'VIX={vix:.1f} 中性，SPY {spy_change:.1f}% 震荡格局'
 
-def analyze_stock(symbol):
-    """分析单支股票"""
+def fetch_price_panel(symbols, period='1mo', batch_size=BATCH_SIZE, start=None):
+    """
+    批量下载多支股票的历史行情
+    
+    整批失败或批次中个别股票没有返回数据时，打印这些股票并改为逐支请求（限速并发），
+    而不是静默丢弃
+    
+    Args:
+        symbols: 股票代码列表
+        period: 历史区间（与 yf.Ticker.history 相同）
+        batch_size: 每批请求的股票数量
+        start: 起始日期（YYYY-MM-DD），指定时忽略 period，用于增量补齐
+    
+    Returns:
+        DataFrame: 列为 (股票代码, 字段) 的多级索引面板，下载失败返回 None
+    """
+    import pandas as pd
+    
+    symbols = list(dict.fromkeys(symbols))
+    frames = []
+    retry = []
+    for i in range(0, len(symbols), batch_size):
+        batch = symbols[i:i + batch_size]
+        data = _download(batch, period, start)
+        got = _symbols_with_data(data)
+        if len(batch) > 1:
+            retry.extend(symbol for symbol in batch if symbol not in got)
+        if got:
+            frames.append(data.loc[:, data.columns.get_level_values(0).isin(got)])
+    
+    if retry:
+        from concurrent_fetch import fetch_all
+        print(f"⚠️  {len(retry)} 支股票批量下载中缺失，改为逐支请求：{_symbol_list(retry)}")
+        singles = fetch_all(lambda symbol: _download([symbol], period, start), retry,
+                            max_workers=FETCH_WORKERS, rate=FETCH_RATE, timeout=FETCH_TIMEOUT)
+        failed = [symbol for symbol, data in zip(retry, singles) if not _symbols_with_data(data)]
+        frames.extend(data for data in singles if _symbols_with_data(data))
+        if failed:
+            print(f"⚠️  {len(failed)} 支股票没有行情数据，已跳过：{_symbol_list(failed)}")
+    
+    if not frames:
+        return None
+    return pd.concat(frames, axis=1).sort_index()
+
+def _download(batch, period, start):
+    """一次 yf.download 请求，返回 (代码, 字段) 面板，失败或无数据返回 None"""
+    import pandas as pd
+    import yfinance as yf
+    
     try:
-        stock = yf.Ticker(symbol)
-        data = stock.history(period='1mo')
+        data = yf.download(
+            batch,
+            period=None if start else period,
+            start=start,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+    except Exception:
+        return None
+    if data is None or data.empty:
+        return None
+    # 单支股票时 yfinance 可能返回单层列索引，统一为 (代码, 字段)
+    if not isinstance(data.columns, pd.MultiIndex):
+        data.columns = pd.MultiIndex.from_product([batch, data.columns])
+    return data
+
+def _symbols_with_data(data):
+    """面板中收盘价不全为空的股票（批量请求中失败的股票整列为空）"""
+    if data is None:
+        return []
+    close = data.xs('Close', axis=1, level=1)
+    return list(close.columns[close.notna().any().to_numpy()])
+
+def _symbol_list(symbols, limit=10):
+    """日志中显示的股票代码（过多时截断）"""
+    shown = ', '.join(symbols[:limit])
+    return shown + (f" 等 {len(symbols)} 支" if len(symbols) > limit else '')
+
+def get_symbol_history(panel, symbol):
+    """从批量面板中取出单支股票的历史数据（去掉该股票无数据的日期）"""
+    if panel is None or symbol not in panel.columns.get_level_values(0):
+        return None
+    return panel[symbol].dropna(subset=['Close'])
+
+def analyze_stock(symbol, panel=None, market_data=None, indicators=None):
+    """
+    分析单支股票
+    
+    Args:
+        symbol: 股票代码
+        panel: fetch_price_panel 返回的批量面板（可选）
+        market_data: 本次运行共用的 MarketData（可选），未传 panel 时从中读取
+        indicators: 额外附加的技术指标（与 score_panel 的同名参数相同，可选）
+    """
+    from scoring import indicator_matrix, score_rules
+    
+    try:
+        if panel is not None:
+            data = get_symbol_history(panel, symbol)
+        else:
+            data = (market_data or new_market_data()).history(symbol, period=SCORING_PERIOD)
         
-        if len(data) < 5:
+        if data is None or len(data) < 5:
             return None
         
         current = data['Close'].iloc[-1]
@@ -87,15 +293,10 @@ def analyze_stock(symbol):
         avg_volume = data['Volume'].iloc[-10:].mean()
         volume_ratio = volume / avg_volume if avg_volume > 0 else 1
         
-        # 简单评分
-        score = 0
-        if daily_change > 2: score += 2
-        if daily_change > 0: score += 1
-        if current > ma5: score += 1
-        if current > ma20: score += 1
-        if volume_ratio > 1.5: score += 2
+        # 简单评分（规则与参数见 scoring.score_rules / SCORE_PARAMS）
+        score = int(score_rules(daily_change, current, ma5, ma20, volume_ratio))
         
-        return {
+        result = {
             'symbol': symbol,
             'price': current,
             'change': daily_change,
@@ -104,108 +305,214 @@ def analyze_stock(symbol):
             'ma5': ma5,
             'ma20': ma20,
         }
+        if indicators:
+            extra = indicator_matrix(data[['High']], data[['Low']], data[['Close']], indicators)
+            result.update((name, values[0]) for name, values in extra.items())
+        return result
     except Exception as e:
         return None
 
-def generate_watchlist():
-    """生成 5 支观察股票"""
-    results = []
-    for symbol in MOMENTUM_STOCKS:
-        data = analyze_stock(symbol)
-        if data and data['score'] >= 3:
-            results.append(data)
+def iter_scored_stocks(universe, batch_size=BATCH_SIZE, data=None):
+    """
+    按批次下载并评分，逐支产出分析结果
+    
+    每次只在内存中保留一批行情，适合数千支股票的大股票池；
+    批量面板中缺失的股票会打印出来并改为逐支请求
+    """
+    from concurrent_fetch import fetch_all
+    from scoring import iter_rows, score_panel
+    
+    data = data or new_market_data()
+    # 股票池中重复的代码只评分一次（同一批次内重复会导致评分表索引重复，跨批次重复会重复入选）
+    universe = unique_symbols(universe)
+    while True:
+        batch = list(islice(universe, batch_size))
+        if not batch:
+            return
+        try:
+            panel = data.panel(batch, period=SCORING_PERIOD)
+        except Exception:
+            panel = None
+        
+        # 有批量面板时整批向量化评分；面板中缺失的股票（整批失败时为全部）逐支并发请求
+        rows = {}
+        missing = batch
+        if panel is not None:
+            available = set(panel.columns.get_level_values(0))
+            missing = [s for s in batch if s not in available]
+            scores = score_panel(panel, indicators=WATCHLIST_INDICATORS)
+            rows = {row['symbol']: row for row in iter_rows(scores.reindex([s for s in batch if s in scores.index]))}
+        if missing:
+            print(f"⚠️  {len(missing)} 支股票批量获取失败，改为逐支请求：{_symbol_list(missing)}")
+            analyzed = fetch_all(lambda symbol: analyze_stock(symbol, market_data=data,
+                                                              indicators=WATCHLIST_INDICATORS), missing,
+                                 max_workers=FETCH_WORKERS, rate=FETCH_RATE, timeout=FETCH_TIMEOUT)
+            rows.update((row['symbol'], row) for row in analyzed if row)
+        # 按股票池顺序产出（评分相同时先出现的股票优先）
+        yield from (rows[s] for s in batch if s in rows)
+
+def generate_watchlist(universe=None, top_k=5, data=None, min_score=None):
+    """
+    生成观察名单（默认 5 支）
+    
+    Args:
+        universe: 股票代码可迭代对象（可以是生成器），默认为 iter_universe()
+        top_k: 名单长度
+        data: 本次运行共用的 MarketData（可选）
+        min_score: 入选的最低评分，默认 scoring.MIN_SCORE
+    """
+    from scoring import MIN_SCORE, select_top_k
+    
+    if universe is None:
+        universe = iter_universe()
+    min_score = MIN_SCORE if min_score is None else min_score
     
-    # 按评分排序，取前 5
-    results.sort(key=lambda x: x['score'], reverse=True)
-    return results[:5]
+    # 流式保留评分最高的 top_k 支，评分相同按股票池顺序
+    passed = (stock for stock in iter_scored_stocks(universe, data=data) if stock['score'] >= min_score)
+    return select_top_k(passed, top_k, key=lambda stock: stock['score'])
 
-def generate_report():
-    """生成完整报告"""
-    today = datetime.now().strftime('%Y-%m-%d')
+def generate_report(data=None):
+    """
+    生成完整报告
+    
+    Args:
+        data: 共用的 MarketData（可选），默认每次运行新建一个
+    """
+    today = trading_calendar.market_date().isoformat()  # 纽约日期（与休市判断一致，不随主机时区变化）
+    data = data or new_market_data()
     
     # 获取市场情绪
-    sentiment = get_market_sentiment()
+    sentiment = get_market_sentiment(data)
     stance, reason = determine_market_stance(sentiment)
     
-    # 生成观察名单
-    watchlist = generate_watchlist()
+    # 生成观察名单（与市场情绪共用同一份数据，重叠的股票不会重复下载）
+    watchlist = generate_watchlist(data=data)
     
-    # 构建报告
-    report = f"""# 📈 每日动量报告 | Daily Momentum Report
-**日期：** {today}
+    return render_report(today, sentiment, stance, reason, watchlist)
+
+# 报告版式只在导入时编译一次，渲染时只填充动态内容
+REPORT_TEMPLATE = ReportTemplate("""# 📈 每日动量报告 | Daily Momentum Report
+**日期：** {{date}}
 **交易员：** Marcus
 
 ---
 
 ## 1️⃣ Marcus 的市场立场
 
-**{stance}**
+**{{stance}}**
 
-**理由：** {reason}
+**理由：** {{reason}}
 
 ---
 
 ## 2️⃣ 5% 观察名单
 
-"""
-    
-    if watchlist:
-        report += "| 股票代码 | 当前价 | 日涨跌 | 成交量比 | 入场条件 | 止损 | 成功概率 |\n"
-        report += "|---------|-------|-------|---------|---------|------|---------|\n"
-        
-        for stock in watchlist:
-            entry = stock['ma5'] * 1.01  # 突破 5 日线 1%
-            stop = stock['ma5'] * 0.97   # 跌破 5 日线 3%
-            prob = min(55 + stock['score'] * 5, 85)  # 基础 55% + 评分加成
-            
-            report += f"| {stock['symbol']} | ${stock['price']:.2f} | {stock['change']:+.1f}% | {stock['volume_ratio']:.1f}x | 突破 ${entry:.2f} | <${stop:.2f} | {prob}% |\n"
-    else:
-        report += "*今日市场动量不足，建议观望或降低选股标准*\n"
-    
-    # 风险提示
-    report += f"""
+{{watchlist}}
 ---
 
 ## 3️⃣ 风险提示
 
 **仓位建议：**
-"""
+{{position_advice}}
+**主要风险点：**
+- VIX 当前 {{vix}}，{{vix_note}}
+- 单支股票仓位不超过总资金的 20%
+- 严格执行止损，亏损不超过总资金 2%
+- 财报季注意个股黑天鹅事件
+
+---
+
+*报告生成时间：{{generated_at}} | 数据来源：Yahoo Finance*
+""")
+
+WATCHLIST_HEADER = ("| 股票代码 | 当前价 | 日涨跌 | 成交量比 | RSI | 20 日新高 | 入场条件 | 止损 | 成功概率 |\n"
+                    "|---------|-------|-------|---------|-----|----------|---------|------|---------|\n")
+EMPTY_WATCHLIST = "*今日市场动量不足，建议观望或降低选股标准*\n"
+
+# 随市场立场变化的固定段落
+POSITION_ADVICE = {
+    'Aggressive Buy': "- 可使用 70-80% 仓位，集中参与高确定性机会\n",
+    'Conservative Buy': "- 建议使用 30-50% 仓位，分散配置，严格止损\n",
+    'Hold/Cash': "- 建议现金为主（<20% 仓位），等待明确信号\n",
+}
+
+def format_watchlist_table(watchlist):
+    """观察名单表格（为空时给出观望提示）"""
+    if not watchlist:
+        return EMPTY_WATCHLIST
+    rows = [WATCHLIST_HEADER]
+    for stock in watchlist:
+        entry = stock['ma5'] * 1.01  # 突破 5 日线 1%
+        stop = stock['ma5'] * 0.97   # 跌破 5 日线 3%
+        prob = min(55 + stock['score'] * 5, 85)  # 基础 55% + 评分加成
+        # K 线不足时指标为 NaN，显示为 -
+        rsi = stock.get('rsi')
+        rsi = f"{rsi:.0f}" if rsi is not None and rsi == rsi else '-'
+        breakout = '✅ 突破' if stock.get('breakout') else '-'
+        
+        rows.append(f"| {stock['symbol']} | ${stock['price']:.2f} | {stock['change']:+.1f}% | {stock['volume_ratio']:.1f}x | {rsi} | {breakout} | 突破 ${entry:.2f} | <${stop:.2f} | {prob}% |\n")
+    return ''.join(rows)
+
+def render_report(today, sentiment, stance, reason, watchlist):
+    """根据已计算好的市场情绪与观察名单渲染 Markdown 报告"""
+    vix = sentiment.get('vix')
+    return REPORT_TEMPLATE.render(
+        date=today,
+        stance=stance,
+        reason=reason,
+        watchlist=format_watchlist_table(watchlist),
+        position_advice=POSITION_ADVICE.get(stance, POSITION_ADVICE['Hold/Cash']),
+        vix=f"{vix:.1f}" if vix is not None else 'N/A',
+        vix_note="波动率偏高，注意仓位控制" if sentiment.get('vix', 20) > 20 else "波动率正常，可适度参与",
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    )
+
+def main(tag=None, timer=None):
+    """
+    生成并保存一次报告（命令行入口，常驻调度进程 scheduler.py 也直接调用）
     
-    if stance == 'Aggressive Buy':
-        report += "- 可使用 70-80% 仓位，集中参与高确定性机会\n"
-    elif stance == 'Conservative Buy':
-        report += "- 建议使用 30-50% 仓位，分散配置，严格止损\n"
-    else:
-        report += "- 建议现金为主（<20% 仓位），等待明确信号\n"
+    Args:
+        tag: 同一天多次运行时的标记（如 open / close），区分报告文件名
+        timer: 记录各阶段耗时的 StageTimer（可选）
     
-    report += f"""
-**主要风险点：**
-- VIX 当前 {sentiment.get('vix', 'N/A'):.1f}，"""
+    Returns:
+        str: 报告内容，休市日返回 None
+    """
+    timer = timer or StageTimer(enabled=False)
+    today = trading_calendar.market_date().isoformat()  # 纽约日期（与休市判断一致，不随主机时区变化）
     
-    if sentiment.get('vix', 20) > 20:
-        report += "波动率偏高，注意仓位控制\n"
-    else:
-        report += "波动率正常，可适度参与\n"
+    # 休市日在导入行情依赖、发出任何网络请求之前退出
+    with timer.stage('休市检查'):
+        closed = is_market_closed()
+    if closed:
+        print(f"ℹ️  {trading_calendar.market_date()} 美股休市（{trading_calendar.closed_reason()}），跳过报告生成")
+        return None
     
-    report += "- 单支股票仓位不超过总资金的 20%\n"
-    report += "- 严格执行止损，亏损不超过总资金 2%\n"
-    report += "- 财报季注意个股黑天鹅事件\n"
+    with timer.stage('导入行情依赖'):
+        import pandas, yfinance  # noqa: F401  提前导入，耗时单独统计
+    with timer.stage('行情与评分'):
+        report = generate_report()
+    print(report)
     
-    report += f"""
----
-
-*报告生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | 数据来源：Yahoo Finance*
-"""
+    # 保存到文件
+    with timer.stage('保存与索引'):
+        name = f'{today}_{tag}_report.md' if tag else f'{today}_report.md'
+        with open(os.path.join(REPORTS_DIR, name), 'w') as f:
+            f.write(report)
+        
+        print(f"\n✅ 报告已保存至 {os.path.join(REPORTS_DIR, name)}")
+        update_report_index(REPORTS_DIR)
     
+    # 清理过期的本地行情缓存
+    get_price_cache().evict()
     return report
 
 if __name__ == '__main__':
-    report = generate_report()
-    print(report)
-    
-    # 保存到文件
-    today = datetime.now().strftime('%Y-%m-%d')
-    with open(f'/Users/jiangchongyang/.openclaw/workspace/agents/marcus/reports/{today}_report.md', 'w') as f:
-        f.write(report)
+    parser = argparse.ArgumentParser(description='Marcus 每日动量报告')
+    parser.add_argument('--timings', action='store_true', help='输出模块导入与各阶段耗时')
+    args = parser.parse_args()
     
-    print(f"\n✅ 报告已保存至 reports/{today}_report.md")
+    timer = StageTimer(enabled=args.timings)
+    timer.add('导入模块', IMPORT_SECONDS)
+    main(timer=timer)
+    timer.report()
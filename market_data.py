@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+行情数据访问层 - 一次报告运行内共享的数据对象
+合并重复请求（包括正在进行中的请求），同一股票每次运行最多下载一次
+（只保留常驻股票的结果时，其余股票只合并同时进行中的请求，下载结果不留在内存中）
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+import pandas as pd
+
+from price_cache import period_start, slice_period
+
+
+def _period_key(period):
+    """区间起始日期字符串，越小表示区间越宽（max 为空字符串）"""
+    start = period_start(period)
+    return start.isoformat() if start else ''
+
+
+class MarketData:
+    """合并请求的行情数据对象"""
+
+    def __init__(self, source, min_period='1mo', resident=None):
+        """
+        初始化数据对象
+
+        Args:
+            source: 提供 get_panel(symbols, period) 的数据源（如 PriceCache）
+            min_period: 最小下载区间，较窄的请求也按该区间下载，
+                之后同一股票的更宽请求（不超过该区间）可直接截取
+            resident: 下载结果保留到运行结束的股票代码（如 ^VIX、SPY），默认全部保留；
+                流式评分大股票池时只保留共用的股票，内存占用不随股票池增长
+        """
+        self.source = source
+        self.min_period = min_period
+        self.resident = None if resident is None else set(resident)
+        self.lock = threading.Lock()
+        self._frames = {}     # 股票代码 -> (区间键, DataFrame)
+        self._inflight = {}   # 股票代码 -> (区间键, Future)
+        self.fetch_counts = Counter()
+
+    def history(self, symbol, period='1mo'):
+        """单支股票的历史数据，无数据时返回 None"""
+        return self.histories([symbol], period).get(symbol)
+
+    def panel(self, symbols, period='1mo'):
+        """多支股票的 (股票代码, 字段) 面板，全部无数据时返回 None"""
+        frames = self.histories(symbols, period)
+        if not frames:
+            return None
+        return pd.concat(frames, axis=1, sort=False).sort_index()
+
+    def histories(self, symbols, period='1mo'):
+        """
+        批量获取历史数据
+
+        已下载过足够区间的股票直接截取；其他线程正在下载的股票等待其结果；
+        剩余股票合并成一次批量请求
+
+        Returns:
+            dict: 股票代码 -> DataFrame（按输入顺序，无数据的股票不包含在内）
+        """
+        symbols = list(dict.fromkeys(symbols))
+        fetch_period = min(period, self.min_period, key=_period_key)
+        need = _period_key(fetch_period)
+
+        ready, waiting, to_fetch = {}, {}, []
+        with self.lock:
+            for symbol in symbols:
+                cached = self._frames.get(symbol)
+                inflight = self._inflight.get(symbol)
+                if cached and cached[0] <= need:
+                    ready[symbol] = cached[1]
+                elif inflight and inflight[0] <= need:
+                    waiting[symbol] = inflight[1]
+                else:
+                    to_fetch.append(symbol)
+            futures = {symbol: Future() for symbol in to_fetch}
+            for symbol, future in futures.items():
+                self._inflight[symbol] = (need, future)
+
+        if to_fetch:
+            ready.update(self._fetch(to_fetch, fetch_period, need, futures))
+        for symbol, future in waiting.items():
+            ready[symbol] = future.result()
+
+        return {
+            symbol: slice_period(ready[symbol], period)
+            for symbol in symbols
+            if ready.get(symbol) is not None
+        }
+
+    def _fetch(self, symbols, period, key, futures):
+        """下载并登记结果，同时唤醒等待同一股票的其他请求"""
+        try:
+            panel = self.source.get_panel(symbols, period)
+        except Exception as e:
+            with self.lock:
+                for symbol in symbols:
+                    self._inflight.pop(symbol, None)
+            for future in futures.values():
+                future.set_exception(e)
+            raise
+
+        available = set(panel.columns.get_level_values(0)) if panel is not None else set()
+        frames = {}
+        with self.lock:
+            for symbol in symbols:
+                frame = panel[symbol].dropna(subset=['Close']) if symbol in available else None
+                frames[symbol] = frame
+                # 没有数据的股票不登记，之后的逐支请求会重新下载
+                if frame is not None and (self.resident is None or symbol in self.resident):
+                    self._frames[symbol] = (key, frame)
+                self._inflight.pop(symbol, None)
+                self.fetch_counts[symbol] += 1
+        for symbol, future in futures.items():
+            future.set_result(frames[symbol])
+        return frames
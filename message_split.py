@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Markdown 报告分段 - 按大小上限把报告拆成若干条消息
+
+优先在章节（# / ## 标题）边界拆分；章节放不下时按块拆分，
+表格与代码块作为整体保留，表格过大时按行拆分并在每段重复表头；
+单行过长时按字符拆分（不会截断多字节字符）
+"""
+
+import re
+
+_HEADING = re.compile(r'#{1,2} ')
+
+
+def _blocks(lines):
+    """把一个章节的行拆成不可分割的块（表格、代码块整体为一块，其余每行一块）"""
+    blocks = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith('|'):
+            j = i
+            while j < len(lines) and lines[j].startswith('|'):
+                j += 1
+        elif line.startswith('```'):
+            j = i + 1
+            while j < len(lines) and not lines[j].startswith('```'):
+                j += 1
+            j = min(j + 1, len(lines))
+        else:
+            j = i + 1
+        blocks.append(lines[i:j])
+        i = j
+    return blocks
+
+
+def _sections(lines):
+    """按 # / ## 标题拆分章节"""
+    sections = [[]]
+    for line in lines:
+        if _HEADING.match(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return sections
+
+
+def _split_line(line, cost, budget, room):
+    """
+    把超长的一行按字符拆成若干段：第一段不超过 room（可能为空字符串），其余每段不超过 budget
+    """
+    pieces, limit = [], room
+    while line:
+        # 二分查找放得下的最长前缀
+        low, high = 0, len(line)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if cost(line[:mid]) <= limit:
+                low = mid
+            else:
+                high = mid - 1
+        if low == 0 and limit == budget:
+            low = 1
+        pieces.append(line[:low])
+        line = line[low:]
+        limit = budget
+    return pieces
+
+
+def _split_block(block, cost, budget, room):
+    """
+    把放不下的块拆成若干段：表格按行拆分并在每段重复表头，其他块按行拆分
+
+    第一段不超过 room（当前段的剩余空间，可能为空列表），其余每段不超过 budget
+    """
+    header = block[:2] if block[0].startswith('|') and len(block) > 2 else []
+    header_cost = sum(cost(line) for line in header)
+    pieces = []
+    current, size, limit = [], 0, room
+
+    def close():
+        nonlocal current, size, limit
+        pieces.append(current)
+        current, size, limit = [], 0, budget
+
+    for line in block[len(header):]:
+        # 新的一段以表头开始
+        prefix = header if not current else []
+        line_cost = cost(line) + (header_cost if prefix else 0)
+        if size + line_cost <= limit:
+            current.extend(prefix)
+            current.append(line)
+            size += line_cost
+            continue
+        if cost(line) + header_cost <= budget:
+            close()
+            current, size = header + [line], cost(line) + header_cost
+            continue
+        # 单行超过上限：按字符拆分
+        first, *rest = _split_line(line, cost, budget, limit - size)
+        if first:
+            current.append(first)
+        for piece in rest:
+            close()
+            current, size = [piece], cost(piece)
+    pieces.append(current)
+    return pieces
+
+
+def _trim(lines):
+    """去掉首尾空行"""
+    start, end = 0, len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return lines[start:end]
+
+
+def split_markdown(text, budget, cost=lambda line: len(line.encode('utf-8')) + 1):
+    """
+    把 Markdown 文本拆成若干段，每段各行的总大小不超过 budget
+
+    Args:
+        text: Markdown 文本
+        budget: 每段的大小上限
+        cost: 一行的大小（默认按 UTF-8 字节数 + 换行）
+
+    Returns:
+        list: 每段为一个行列表，按原文顺序排列
+    """
+    chunks, current, size = [], [], 0
+
+    def flush():
+        nonlocal current, size
+        lines = _trim(current)
+        if lines:
+            chunks.append(lines)
+        current, size = [], 0
+
+    for section in _sections(text.split('\n')):
+        section_cost = sum(cost(line) for line in section)
+        if size + section_cost <= budget:
+            current.extend(section)
+            size += section_cost
+            continue
+        # 章节放不进当前段：能单独成段就换新段，否则按块继续填充
+        if section_cost <= budget:
+            flush()
+            current, size = list(section), section_cost
+            continue
+        for block in _blocks(section):
+            block_cost = sum(cost(line) for line in block)
+            if size + block_cost <= budget:
+                current.extend(block)
+                size += block_cost
+                continue
+            if block_cost <= budget:
+                flush()
+                current, size = list(block), block_cost
+                continue
+            first, *rest = _split_block(block, cost, budget, budget - size)
+            current.extend(first)
+            if rest:
+                flush()
+                chunks.extend(rest[:-1])
+                current, size = list(rest[-1]), sum(cost(line) for line in rest[-1])
+            else:
+                size += sum(cost(line) for line in first)
+    flush()
+    return chunks
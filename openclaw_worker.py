@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+常驻 OpenClaw 工作进程 - 启动一个 OpenClaw 会话并通过 stdin/stdout 连续发送命令
+避免每次搜索都重新启动 CLI、重新建立网络连接
+
+通信协议为每行一个 JSON：
+    请求：{"id": 1, "command": "web_search", "args": ["--query", "...", "--count", "5"]}
+    响应：{"id": 1, "stdout": "...", "error": null}
+响应可以乱序返回，按 id 对应到请求；工作进程退出后下一次请求会自动重启；
+超时或取消的请求立即注销，之后才到达的响应直接丢弃
+
+OpenClaw CLI 目前没有内置的常驻模式，需要通过 OPENCLAW_WORKER_CMD 指定实现了上述协议的
+启动命令；未配置时不启动工作进程（调用方直接使用单次进程模式）
+"""
+
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+# 启动常驻会话的命令（实现了上述协议的适配程序），未配置时不启用常驻会话
+WORKER_CMD_ENV = 'OPENCLAW_WORKER_CMD'
+# 每分钟最多重启次数，超过后视为不可用（调用方应退回单次进程模式）
+MAX_RESTARTS_PER_MINUTE = 3
+
+
+class WorkerUnavailable(Exception):
+    """工作进程无法启动或重启过于频繁"""
+
+
+class WorkerCrashed(WorkerUnavailable):
+    """请求处理过程中工作进程退出（下一次请求会自动重启）"""
+
+
+class OpenClawWorker:
+    """常驻 OpenClaw 会话"""
+
+    def __init__(self, cmd=None):
+        """
+        初始化工作进程（首次请求时才真正启动）
+
+        Args:
+            cmd: 启动命令（字符串或列表），默认读取 OPENCLAW_WORKER_CMD；
+                都没有时首次请求抛出 WorkerUnavailable
+        """
+        cmd = cmd or os.environ.get(WORKER_CMD_ENV)
+        self.cmd = (shlex.split(cmd) if isinstance(cmd, str) else list(cmd)) if cmd else None
+        self.lock = threading.Lock()
+        self.proc = None
+        self.pending = {}   # 请求 id -> (所属进程, Future)
+        self.next_id = 0
+        self.restarts = []
+
+    def submit(self, command, args):
+        """
+        发送一条命令，返回 Future（结果为命令输出文本）
+
+        Raises:
+            WorkerUnavailable: 工作进程无法启动（Future 中的 WorkerCrashed 表示处理中途退出）
+        """
+        future = Future()
+        with self.lock:
+            self._ensure_started()
+            self.next_id += 1
+            request_id = self.next_id
+            self.pending[request_id] = (self.proc, future)
+            # 超时后被取消的请求立即注销，迟到的响应不会再对应到它
+            future.add_done_callback(
+                lambda f, request_id=request_id: f.cancelled() and self._forget(request_id))
+            line = json.dumps({'id': request_id, 'command': command, 'args': list(args)},
+                              ensure_ascii=False)
+            try:
+                self.proc.stdin.write(line + '\n')
+                self.proc.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self.pending.pop(request_id, None)
+                future.set_exception(WorkerCrashed(f"工作进程已退出：{e}"))
+        return future
+
+    def run(self, command, args, timeout=30):
+        """同步执行一条命令，返回输出文本（失败时以 "Error" 开头）"""
+        future = self.submit(command, args)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            return f"Error: 命令超时（{timeout:g}s）"
+        except WorkerUnavailable:
+            raise
+        except Exception as e:
+            return f"Error: {e}"
+
+    def _forget(self, request_id):
+        """注销请求（超时或取消）"""
+        with self.lock:
+            self.pending.pop(request_id, None)
+
+    def close(self):
+        """关闭工作进程"""
+        with self.lock:
+            proc, self.proc = self.proc, None
+        if proc and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=5)
+            except Exception:
+                proc.kill()
+
+    def _ensure_started(self):
+        """进程未运行时（首次或崩溃后）启动，调用时需持有 self.lock"""
+        if self.proc is not None and self.proc.poll() is None:
+            return
+        if not self.cmd:
+            raise WorkerUnavailable(f"未配置常驻会话的启动命令（{WORKER_CMD_ENV}）")
+        now = time.monotonic()
+        self.restarts = [t for t in self.restarts if now - t < 60]
+        if len(self.restarts) >= MAX_RESTARTS_PER_MINUTE:
+            raise WorkerUnavailable("工作进程重启过于频繁")
+        self.restarts.append(now)
+        try:
+            self.proc = subprocess.Popen(
+                self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, text=True, encoding='utf-8', bufsize=1)
+        except OSError as e:
+            self.proc = None
+            raise WorkerUnavailable(f"无法启动工作进程：{e}")
+        threading.Thread(target=self._read_loop, args=(self.proc,), daemon=True).start()
+
+    def _read_loop(self, proc):
+        """读取响应并交给对应的 Future；进程退出时让未完成的请求失败"""
+        for line in proc.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            with self.lock:
+                _, future = self.pending.pop(message.get('id'), (None, None))
+            if future is None:
+                continue
+            try:
+                if message.get('error'):
+                    future.set_result(f"Error: {message['error']}")
+                else:
+                    future.set_result(message.get('stdout', ''))
+            except InvalidStateError:
+                pass    # 响应到达的同时请求刚好超时取消
+
+        with self.lock:
+            if self.proc is proc:
+                self.proc = None
+            failed = [rid for rid, (owner, _) in self.pending.items() if owner is proc]
+            futures = [self.pending.pop(rid)[1] for rid in failed]
+        for future in futures:
+            try:
+                future.set_exception(WorkerCrashed("工作进程意外退出"))
+            except InvalidStateError:
+                pass
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+本地行情缓存 - 以 SQLite 按 (股票代码, 日期) 存储日线 OHLCV
+首次运行下载完整区间，之后只增量补齐最近缺失的交易日
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import trading_calendar
+
+# 默认保留最近 400 天（覆盖 1 年回看窗口）
+DEFAULT_RETENTION_DAYS = 400
+# 超过该天数未被请求的股票整体清除
+DEFAULT_IDLE_DAYS = 30
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# 单条 SQL 中 IN (...) 的参数个数上限（SQLite 默认最多 999 个参数）
+SQL_BATCH = 900
+# 收盘后多少秒认为当天日线已经定型（数据源收盘后仍会修正成交量等）
+FINAL_BAR_DELAY = 1800
+
+_PERIOD_RE = re.compile(r'^(\d+)(d|wk|mo|y)$')
+
+
+def period_offset(period):
+    """将 yfinance 风格的区间（5d/1mo/1y）换算为日历偏移量，max 返回 None"""
+    if period == 'max':
+        return None
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"不支持的区间：{period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        # N 个交易日约等于 N*7/5 个自然日，再加几天假期余量
+        return timedelta(days=n * 7 // 5 + 3)
+    if unit == 'wk':
+        return timedelta(weeks=n)
+    if unit == 'mo':
+        return pd.DateOffset(months=n)
+    return pd.DateOffset(years=n)
+
+
+def period_start(period, today=None):
+    """
+    区间的名义起始日期，max 返回 None
+
+    Nd 按交易日历取 today 之前第 N 个交易日（节假日不计入），其余按日历偏移
+    """
+    offset = period_offset(period)
+    if offset is None:
+        return None
+    today = pd.Timestamp(today or date.today())
+    match = _PERIOD_RE.match(period)
+    if match.group(2) == 'd':
+        try:
+            return trading_calendar.previous_trading_day(today.date(), int(match.group(1)))
+        except ValueError:
+            pass    # 超出交易日历范围时按自然日估算
+    return (today - offset).date()
+
+
+def final_bar_cutoff(now=None):
+    """
+    最近一个已收盘交易日的 (日期键, 该日日线定型的时间戳)
+
+    缓存中已有该日日线、且在定型之后下载过的股票不必再请求（盘前、周末、节假日都是如此）；
+    交易时段内当天的日线仍在变化，返回 None
+    """
+    if trading_calendar.is_open(now):
+        return None
+    day, close_at = trading_calendar.last_closed_session(now)
+    return day.isoformat(), close_at.timestamp() + FINAL_BAR_DELAY
+
+
+def slice_period(data, period, today=None):
+    """
+    从更长的历史数据中截取指定区间
+
+    Nd 取最后 N 个交易日（与 yfinance 一致），其余按日历起始日截取
+    """
+    if data is None or period == 'max':
+        return data
+    match = _PERIOD_RE.match(period)
+    if match and match.group(2) == 'd':
+        return data.tail(int(match.group(1)))
+    start = pd.Timestamp(period_start(period, today))
+    return data[data.index >= start]
+
+
+class PriceCache:
+    """基于 SQLite 的日线行情缓存"""
+
+    def __init__(self, fetcher, cache_dir, retention_days=DEFAULT_RETENTION_DAYS,
+                 idle_days=DEFAULT_IDLE_DAYS, keep_in_memory=False):
+        """
+        初始化行情缓存
+
+        Args:
+            fetcher: 批量下载函数 fetcher(symbols, period=None, start=None)，
+                返回列为 (股票代码, 字段) 的多级索引面板
+            cache_dir: 缓存目录
+            retention_days: K 线保留天数，更早的数据在 evict() 时删除
+            idle_days: 股票超过该天数未被请求则整体清除
+            keep_in_memory: 读过的 K 线保留在内存中（常驻进程多次运行时使用，
+                只有新写入数据的股票才会重新从数据库读取）
+        """
+        self.fetcher = fetcher
+        self.retention_days = retention_days
+        self.idle_days = idle_days
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, 'prices.sqlite')
+        self.memory = {} if keep_in_memory else None   # 股票代码 -> 全部已缓存的 K 线
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # 同一连接会被并发抓取的线程共用，数据库操作需串行化（下载本身不加锁）
+        self.lock = threading.RLock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol TEXT PRIMARY KEY,
+                coverage_start TEXT,
+                fetched_at REAL,
+                accessed_at REAL
+            );
+        """)
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def update(self, symbols, period='1mo', today=None):
+        """
+        补齐缓存中缺失的数据
+
+        新股票或需要更长区间时按 period 完整下载；已有数据的股票只请求
+        最后一根 K 线之后的增量（包含最后一天，以覆盖盘中未收盘的数据）。
+        未指定 today（实时运行）时，最近一个交易日的日线已定型的股票不再请求
+        """
+        start = period_start(period, today)
+        start_key = start.isoformat() if start else ''
+        final = final_bar_cutoff() if today is None else None
+        full, delta = [], {}
+        with self.lock:
+            for symbol in dict.fromkeys(symbols):
+                row = self.conn.execute(
+                    "SELECT coverage_start, (SELECT MAX(date) FROM bars WHERE symbol = ?), fetched_at "
+                    "FROM symbols WHERE symbol = ?", (symbol, symbol)).fetchone()
+                if row is None or row[1] is None or row[0] > start_key:
+                    full.append(symbol)
+                elif final and row[1] >= final[0] and (row[2] or 0) >= final[1]:
+                    continue
+                else:
+                    delta.setdefault(row[1], []).append(symbol)
+
+        if full:
+            self._store(self.fetcher(full, period=period), full, start_key)
+        # 最后日期相同的股票合并成一次批量请求
+        for last_date, batch in delta.items():
+            self._store(self.fetcher(batch, start=last_date), batch, None)
+
+    def get_history(self, symbol, period='1mo', today=None, refresh=True):
+        """读取单支股票的历史数据，返回以日期为索引的 OHLCV DataFrame"""
+        if refresh:
+            self.update([symbol], period, today)
+        self._touch([symbol])
+        bars = self._bars([symbol]).get(symbol)
+        if bars is None:
+            return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+        dates, values = _slice_bars(*bars, period, today)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name='Date'), columns=FIELDS)
+
+    def get_panel(self, symbols, period='1mo', today=None):
+        """批量读取多支股票，返回与 fetch_price_panel 相同格式的面板"""
+        symbols = list(dict.fromkeys(symbols))
+        self.update(symbols, period, today)
+        self._touch(symbols)
+        bars = {}
+        for symbol, (dates, values) in self._bars(symbols).items():
+            dates, values = _slice_bars(dates, values, period, today)
+            if len(dates):
+                bars[symbol] = (dates, values)
+        if not bars:
+            return None
+        # 直接填充 (日期 × 股票 × 字段) 数组，避免逐支构建再拼接 DataFrame
+        index = np.unique(np.concatenate([dates for dates, _ in bars.values()]))
+        data = np.full((len(index), len(bars), len(FIELDS)), np.nan)
+        for j, (dates, values) in enumerate(bars.values()):
+            data[np.searchsorted(index, dates), j] = values
+        columns = pd.MultiIndex.from_product([list(bars), FIELDS])
+        return pd.DataFrame(data.reshape(len(index), -1), index=pd.DatetimeIndex(index, name='Date'),
+                            columns=columns)
+
+    def _bars(self, symbols):
+        """
+        多支股票的全部缓存 K 线 {股票代码: (日期数组, 数值数组)}（无数据的股票不包含在内）
+
+        内存中没有的股票合并成一次查询读取，而不是每支股票单独查询
+        """
+        memory = self.memory if self.memory is not None else {}
+        missing = [symbol for symbol in symbols if symbol not in memory]
+        loaded = self._read_bars(missing) if missing else {}
+        if self.memory is not None:
+            self.memory.update(loaded)
+            loaded = self.memory
+        return {symbol: loaded[symbol] for symbol in symbols if symbol in loaded}
+
+    def _read_bars(self, symbols):
+        """按股票代码批量查询 K 线"""
+        rows = []
+        with self.lock:
+            for i in range(0, len(symbols), SQL_BATCH):
+                batch = symbols[i:i + SQL_BATCH]
+                rows.extend(self.conn.execute(
+                    "SELECT symbol, date, open, high, low, close, volume FROM bars "
+                    f"WHERE symbol IN ({','.join('?' * len(batch))}) ORDER BY symbol, date", batch))
+        if not rows:
+            return {}
+        # 日期与数值一次性转换，再按股票切片（查询结果已按股票排序）
+        names = [row[0] for row in rows]
+        dates = pd.to_datetime([row[1] for row in rows]).to_numpy()
+        values = np.array([row[2:] for row in rows], dtype=float)
+        bars = {}
+        start = 0
+        for end in range(1, len(rows) + 1):
+            if end == len(rows) or names[end] != names[start]:
+                bars[names[start]] = (dates[start:end], values[start:end])
+                start = end
+        return bars
+
+    def evict(self, today=None):
+        """删除超过保留期的 K 线以及长期未使用的股票"""
+        today = today or date.today()
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        idle_cutoff = time.time() - self.idle_days * 86400
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM bars WHERE date < ?", (cutoff,))
+            self.conn.execute(
+                "UPDATE symbols SET coverage_start = ? WHERE coverage_start < ?",
+                (cutoff, cutoff))
+            idle = [r[0] for r in self.conn.execute(
+                "SELECT symbol FROM symbols WHERE accessed_at < ?", (idle_cutoff,))]
+            self.conn.executemany("DELETE FROM bars WHERE symbol = ?", [(s,) for s in idle])
+            self.conn.executemany("DELETE FROM symbols WHERE symbol = ?", [(s,) for s in idle])
+        if self.memory is not None:
+            self._evict_memory(idle, cutoff)
+        return len(idle)
+
+    def _evict_memory(self, idle, cutoff):
+        """内存中的 K 线与数据库保持一致：去掉已清除的股票与保留期之前的日期，其余保留（下次运行仍是热缓存）"""
+        for symbol in idle:
+            self.memory.pop(symbol, None)
+        cutoff = np.datetime64(cutoff)
+        for symbol, (dates, values) in list(self.memory.items()):
+            keep = np.searchsorted(dates, cutoff)
+            if keep:
+                self.memory[symbol] = (dates[keep:], values[keep:])
+
+    def _store(self, panel, symbols, coverage_start):
+        """将下载的面板写入缓存（整个面板一次性转换为数据库行，不逐支处理）"""
+        if panel is None or panel.empty:
+            return
+        now = time.time()
+        available = set(panel.columns.get_level_values(0))
+        stored = [symbol for symbol in dict.fromkeys(symbols) if symbol in available]
+        if not stored:
+            return
+        # (股票, 日期, 字段) 数组，去掉收盘价缺失的日期
+        values = np.stack([panel.xs(field, axis=1, level=1).reindex(columns=stored).to_numpy(dtype=float)
+                           for field in FIELDS], axis=-1).transpose(1, 0, 2)
+        valid = ~np.isnan(values[:, :, FIELDS.index('Close')])
+        symbol_idx, date_idx = np.nonzero(valid)
+        dates = [_date_key(ts) for ts in panel.index]
+        rows = [(stored[i], dates[t], *bar) for i, t, bar
+                in zip(symbol_idx.tolist(), date_idx.tolist(), values[valid].tolist())]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            if coverage_start is not None:
+                self.conn.executemany(
+                    "INSERT INTO symbols (symbol, coverage_start, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(symbol) DO UPDATE SET "
+                    "coverage_start = MIN(coverage_start, excluded.coverage_start), "
+                    "fetched_at = excluded.fetched_at",
+                    [(symbol, coverage_start, now, now) for symbol in stored])
+            else:
+                self.conn.executemany(
+                    "UPDATE symbols SET fetched_at = ? WHERE symbol = ?",
+                    [(now, symbol) for symbol in stored])
+            if self.memory:
+                self._merge_memory(stored, dates, values, valid)
+
+    def _merge_memory(self, stored, dates, values, valid):
+        """把新写入的 K 线合并进内存中的数据（同一天的数据以新数据为准）"""
+        dates = pd.to_datetime(dates).to_numpy()
+        for i, symbol in enumerate(stored):
+            if symbol not in self.memory:
+                continue
+            old_dates, old_values = self.memory[symbol]
+            new_dates, new_values = dates[valid[i]], values[i][valid[i]]
+            keep = ~np.isin(old_dates, new_dates)
+            merged_dates = np.concatenate([old_dates[keep], new_dates])
+            order = np.argsort(merged_dates, kind='stable')
+            self.memory[symbol] = (merged_dates[order],
+                                   np.concatenate([old_values[keep], new_values])[order])
+
+    def _touch(self, symbols):
+        """记录股票最近一次被请求的时间"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE symbols SET accessed_at = ? WHERE symbol = ?",
+                [(now, s) for s in symbols])
+
+
+def _slice_bars(dates, values, period, today=None):
+    """与 slice_period 相同的区间截取，作用于 (日期数组, 数值数组)"""
+    if period == 'max':
+        return dates, values
+    match = _PERIOD_RE.match(period)
+    if match and match.group(2) == 'd':
+        n = int(match.group(1))
+        return dates[-n:] if n else dates[:0], values[-n:] if n else values[:0]
+    keep = np.searchsorted(dates, pd.Timestamp(period_start(period, today)).to_datetime64())
+    return dates[keep:], values[keep:]
+
+
+def _date_key(ts):
+    """时间戳统一转换为交易日字符串（去掉时区和时间部分）"""
+    if isinstance(ts, (datetime, pd.Timestamp)):
+        return ts.strftime('%Y-%m-%d')
+    return str(ts)[:10]
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+报告归档索引 - 把 reports/{日期}_report.md 解析成 SQLite 结构化数据 + 全文索引
+
+- reports：每份报告的日期、市场立场、VIX
+- watchlist：观察名单的每一行（股票代码、名次、当前价、日涨跌与整行内容）
+- reports_fts：报告全文（FTS5 trigram 分词，中文子串也能命中）
+
+索引按文件的修改时间与大小增量更新，只重新解析新增或改动过的报告，
+删除的报告会从索引中移除；生成报告的脚本保存报告后会自动更新索引。
+所有脚本都把报告写到 REPORTS_DIR（MARCUS_REPORTS_DIR，默认仓库下的 reports/）
+
+用法：
+    python3 report_index.py update                       # 增量更新索引
+    python3 report_index.py watch --interval 60          # 持续监视 reports/ 目录
+    python3 report_index.py symbol NVDA                  # NVDA 最近哪些天进入观察名单
+    python3 report_index.py stance --since 2026-01-01    # 各市场立场的天数
+    python3 report_index.py search "美联储"               # 全文搜索
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORTS_DIR = os.environ.get('MARCUS_REPORTS_DIR', os.path.join(REPO_DIR, 'reports'))
+
+STANCES = ('Aggressive Buy', 'Conservative Buy', 'Hold/Cash')
+WATCH_INTERVAL = 60.0
+
+# 只索引带日期的报告文件（DEMO_report.md 等示例不计入统计）
+_REPORT_FILE = re.compile(r'^(\d{4}-\d{2}-\d{2}).*_report\.md$')
+_STANCE = re.compile(r'\b(' + '|'.join(re.escape(s) for s in STANCES) + r')\b')
+# VIX=18.5 / VIX 恐慌指数：18.5 / VIX 当前 18.5 / **📊 VIX 指数：** 18.5
+_VIX = re.compile(r'VIX\s*(?:恐慌指数|指数)?\s*(?:=|：|:|当前)\s*(?:\*\*)?\s*(\d+(?:\.\d+)?)')
+_SECTION = re.compile(r'^#{1,3} ', re.M)
+_SYMBOL = re.compile(r'^[A-Z][A-Z0-9.\-]{0,9}$')
+_BULLET = re.compile(r'^\s*(?:[-*]|\d+\.)\s+(?:\*\*)?([A-Z][A-Z0-9.\-]{0,9})(?:\*\*)?\s*[:：\-]')
+_NUMBER = re.compile(r'[-+]?\d+(?:,\d{3})*(?:\.\d+)?')
+
+
+def default_index_path():
+    """索引文件路径（MARCUS_REPORT_INDEX，默认放在 MARCUS_CACHE_DIR 下）"""
+    cache_dir = os.environ.get('MARCUS_CACHE_DIR', os.path.join(REPO_DIR, 'cache'))
+    return os.environ.get('MARCUS_REPORT_INDEX', os.path.join(cache_dir, 'report_index.sqlite'))
+
+
+# ---------------------------------------------------------------------------
+# 报告解析
+# ---------------------------------------------------------------------------
+
+def _number(text):
+    """单元格中的第一个数字（$1,234.50 / +2.3% / 1.8x），没有时为 None"""
+    match = _NUMBER.search(text or '')
+    return float(match.group().replace(',', '')) if match else None
+
+
+def _watchlist_section(text):
+    """观察名单章节的正文（没有时为空字符串）"""
+    starts = [m.start() for m in _SECTION.finditer(text)] + [len(text)]
+    for start, end in zip(starts, starts[1:]):
+        heading = text[start:text.find('\n', start)]
+        if '观察名单' in heading:
+            return text[start:end]
+    return ''
+
+
+def parse_watchlist(section):
+    """
+    解析观察名单：Markdown 表格（第一列为股票代码）或 "- NVDA: ..." 列表
+
+    Returns:
+        list: [{'rank', 'symbol', 'price', 'change', 'detail'}]，detail 为 {列名: 单元格}
+    """
+    rows, bullets = [], []
+    header = None
+    for line in section.splitlines():
+        line = line.strip()
+        if line.startswith('|'):
+            cells = [cell.strip() for cell in line.strip('|').split('|')]
+            if header is None:
+                header = cells
+                continue
+            if set(cells[0]) <= set('-: '):
+                continue   # 表头分隔行
+            symbol = cells[0].strip('*')
+            if not _SYMBOL.match(symbol):
+                continue
+            detail = dict(zip(header, cells))
+            rows.append({'symbol': symbol, 'price': _number(detail.get('当前价')),
+                         'change': _number(detail.get('日涨跌')), 'detail': detail})
+            continue
+        header = None
+        match = _BULLET.match(line)
+        if match:
+            bullets.append({'symbol': match.group(1), 'price': None, 'change': None,
+                            'detail': {'text': line.lstrip('-*0123456789. ')}})
+    # 表格之后的编号说明（"1. **NVDA** - ..."）只是补充，有表格时不重复计入
+    rows = rows or bullets
+    for rank, row in enumerate(rows, 1):
+        row['rank'] = rank
+    return rows
+
+
+def parse_report(text):
+    """
+    从报告正文中提取市场立场、VIX 与观察名单
+
+    Returns:
+        dict: {'stance', 'vix', 'closed', 'watchlist'}，取不到的字段为 None
+    """
+    stance = _STANCE.search(text)
+    vix = _VIX.search(text)
+    return {
+        'stance': stance.group(1) if stance else None,
+        'vix': float(vix.group(1)) if vix else None,
+        'closed': '休市' in text and stance is None,
+        'watchlist': parse_watchlist(_watchlist_section(text)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 索引
+# ---------------------------------------------------------------------------
+
+class ReportIndex:
+    """报告归档的 SQLite 索引"""
+
+    def __init__(self, path=None, reports_dir=None):
+        """
+        Args:
+            path: 索引文件路径，默认见 default_index_path()
+            reports_dir: 报告目录，默认 MARCUS_REPORTS_DIR 或仓库下的 reports/
+        """
+        self.path = path or default_index_path()
+        self.reports_dir = reports_dir or REPORTS_DIR
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE,       -- 文件名
+                date TEXT,
+                stance TEXT,
+                vix REAL,
+                closed INTEGER,         -- 休市日报告
+                mtime_ns INTEGER,
+                size INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS reports_date ON reports (date);
+            CREATE INDEX IF NOT EXISTS reports_stance ON reports (stance, date);
+            CREATE TABLE IF NOT EXISTS watchlist (
+                report_id INTEGER,
+                date TEXT,
+                rank INTEGER,
+                symbol TEXT,
+                price REAL,
+                change REAL,
+                detail TEXT             -- 整行内容（JSON）
+            );
+            CREATE INDEX IF NOT EXISTS watchlist_symbol ON watchlist (symbol, date);
+            CREATE INDEX IF NOT EXISTS watchlist_report ON watchlist (report_id);
+        """)
+        try:
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts "
+                              "USING fts5(body, tokenize='trigram')")
+        except sqlite3.OperationalError:
+            # SQLite < 3.34 没有 trigram 分词器
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(body)")
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def update(self):
+        """
+        增量更新索引：只解析新增或改动的报告，移除已删除的报告
+
+        报告目录不存在时（未挂载、路径配置错误）不做任何改动，不会清空已有索引
+
+        Returns:
+            dict: {'added', 'updated', 'removed', 'unchanged'} 各自的报告数
+        """
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        files = {}
+        try:
+            with os.scandir(self.reports_dir) as entries:
+                for entry in entries:
+                    match = _REPORT_FILE.match(entry.name)
+                    if match and entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (match.group(1), stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return stats
+
+        known = {name: (report_id, mtime_ns, size) for report_id, name, mtime_ns, size
+                 in self.conn.execute("SELECT id, name, mtime_ns, size FROM reports")}
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name, (report_id, _, _) in known.items():
+                if name not in files:
+                    self._delete(report_id)
+                    stats['removed'] += 1
+            for name, (date, mtime_ns, size) in sorted(files.items()):
+                old = known.get(name)
+                if old and old[1:] == (mtime_ns, size):
+                    stats['unchanged'] += 1
+                    continue
+                try:
+                    with open(os.path.join(self.reports_dir, name), 'r', encoding='utf-8') as f:
+                        text = f.read()
+                except (OSError, UnicodeDecodeError):
+                    continue
+                if old:
+                    self._delete(old[0])
+                self._insert(name, date, text, mtime_ns, size)
+                stats['updated' if old else 'added'] += 1
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return stats
+
+    def _delete(self, report_id):
+        self.conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+        self.conn.execute("DELETE FROM watchlist WHERE report_id = ?", (report_id,))
+        self.conn.execute("DELETE FROM reports_fts WHERE rowid = ?", (report_id,))
+
+    def _insert(self, name, date, text, mtime_ns, size):
+        parsed = parse_report(text)
+        report_id = self.conn.execute(
+            "INSERT INTO reports (name, date, stance, vix, closed, mtime_ns, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, date, parsed['stance'], parsed['vix'], int(parsed['closed']), mtime_ns, size),
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO watchlist (report_id, date, rank, symbol, price, change, detail) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(report_id, date, row['rank'], row['symbol'], row['price'], row['change'],
+              json.dumps(row['detail'], ensure_ascii=False)) for row in parsed['watchlist']])
+        self.conn.execute("INSERT INTO reports_fts (rowid, body) VALUES (?, ?)", (report_id, text))
+
+    # -----------------------------------------------------------------------
+    # 查询
+    # -----------------------------------------------------------------------
+
+    def watchlist_history(self, symbol, limit=10):
+        """
+        某支股票最近进入观察名单的记录（按日期从新到旧）
+
+        Returns:
+            list: [{'date', 'rank', 'price', 'change', 'stance', 'detail'}]
+        """
+        rows = self.conn.execute("""
+            SELECT w.date, w.rank, w.price, w.change, r.stance, w.detail
+            FROM watchlist w JOIN reports r ON r.id = w.report_id
+            WHERE w.symbol = ? ORDER BY w.date DESC, w.rank LIMIT ?
+        """, (symbol.upper(), limit)).fetchall()
+        return [{'date': date, 'rank': rank, 'price': price, 'change': change,
+                 'stance': stance, 'detail': json.loads(detail)}
+                for date, rank, price, change, stance, detail in rows]
+
+    def last_watchlisted(self, symbol):
+        """某支股票最近一次进入观察名单的记录，从未进入时返回 None"""
+        history = self.watchlist_history(symbol, limit=1)
+        return history[0] if history else None
+
+    def stance_counts(self, since=None, until=None):
+        """
+        日期范围内（含两端，YYYY-MM-DD）各市场立场的天数，同一天有多份报告时取最新的一份
+
+        Returns:
+            dict: {市场立场: 天数}，休市日与取不到立场的报告不计入
+        """
+        rows = self.conn.execute("""
+            SELECT stance, COUNT(*) FROM (
+                SELECT date, stance, MAX(mtime_ns) FROM reports
+                WHERE stance IS NOT NULL AND date >= ? AND date <= ?
+                GROUP BY date
+            ) GROUP BY stance
+        """, (since or '0000-00-00', until or '9999-99-99')).fetchall()
+        return dict(rows)
+
+    def vix_series(self, since=None, until=None):
+        """日期范围内每天的 VIX：[(日期, VIX)]"""
+        rows = self.conn.execute("""
+            SELECT date, vix, MAX(mtime_ns) FROM reports
+            WHERE vix IS NOT NULL AND date >= ? AND date <= ?
+            GROUP BY date ORDER BY date
+        """, (since or '0000-00-00', until or '9999-99-99')).fetchall()
+        return [(date, vix) for date, vix, _ in rows]
+
+    def search(self, query, limit=20):
+        """
+        全文搜索（按日期从新到旧）
+
+        Args:
+            query: 关键词（少于 3 个字符时逐篇匹配，速度较慢）
+
+        Returns:
+            list: [(日期, 文件名, 命中片段)]
+        """
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            sql = ("SELECT r.date, r.name, snippet(reports_fts, 0, '【', '】', '…', 16) "
+                   "FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid "
+                   "WHERE reports_fts MATCH ? ORDER BY r.date DESC LIMIT ?")
+            return [(date, name, snippet.replace('\n', ' '))
+                    for date, name, snippet in self.conn.execute(sql, (phrase, limit))]
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = self.conn.execute(
+            "SELECT r.date, r.name, f.body FROM reports_fts f JOIN reports r ON r.id = f.rowid "
+            "WHERE f.body LIKE ? ESCAPE '\\' ORDER BY r.date DESC LIMIT ?", (pattern, limit))
+        results = []
+        for date, name, body in rows:
+            at = body.find(query)
+            results.append((date, name, body[max(0, at - 30):at + len(query) + 30].replace('\n', ' ')))
+        return results
+
+
+def update_report_index(reports_dir=None):
+    """
+    生成报告后更新索引（失败时只打印警告，不影响报告本身）
+
+    Returns:
+        dict: 更新统计，失败时为 None
+    """
+    try:
+        index = ReportIndex(reports_dir=reports_dir)
+        try:
+            return index.update()
+        finally:
+            index.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️  报告索引更新失败: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 报告归档索引')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('update', help='增量更新索引')
+    watch = sub.add_parser('watch', help='持续监视报告目录')
+    watch.add_argument('--interval', type=float, default=WATCH_INTERVAL, help='检查间隔（秒）')
+    symbol = sub.add_parser('symbol', help='股票进入观察名单的记录')
+    symbol.add_argument('symbol')
+    symbol.add_argument('--limit', type=int, default=10)
+    stance = sub.add_parser('stance', help='各市场立场的天数')
+    stance.add_argument('--since', help='开始日期 YYYY-MM-DD')
+    stance.add_argument('--until', help='结束日期 YYYY-MM-DD')
+    search = sub.add_parser('search', help='全文搜索')
+    search.add_argument('query')
+    search.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--db', help='索引文件路径')
+    parser.add_argument('--reports', help='报告目录')
+    args = parser.parse_args()
+
+    index = ReportIndex(args.db, args.reports)
+    if args.command == 'watch':
+        print(f"👀 监视 {index.reports_dir}（每 {args.interval:.0f}s 检查一次）")
+        while True:
+            stats = index.update()
+            if stats['added'] or stats['updated'] or stats['removed']:
+                print(f"📚 新增 {stats['added']}，更新 {stats['updated']}，移除 {stats['removed']}")
+            time.sleep(args.interval)
+
+    # 查询前先同步一次，保证结果包含最新的报告
+    started = time.perf_counter()
+    stats = index.update()
+    if args.command == 'update':
+        print(f"📚 索引：{index.path}")
+        print(f"   新增 {stats['added']}，更新 {stats['updated']}，移除 {stats['removed']}，"
+              f"未变 {stats['unchanged']}（{time.perf_counter() - started:.2f}s）")
+    elif args.command == 'symbol':
+        history = index.watchlist_history(args.symbol, args.limit)
+        if not history:
+            print(f"{args.symbol.upper()} 从未进入观察名单")
+        for item in history:
+            price = f" ${item['price']:.2f}" if item['price'] is not None else ''
+            change = f" {item['change']:+.1f}%" if item['change'] is not None else ''
+            print(f"{item['date']} 第 {item['rank']} 名{price}{change}（{item['stance'] or '-'}）")
+    elif args.command == 'stance':
+        counts = index.stance_counts(args.since, args.until)
+        total = sum(counts.values())
+        for name in STANCES:
+            print(f"{name:<18} {counts.get(name, 0):>5} 天")
+        print(f"{'合计':<16} {total:>5} 天")
+    elif args.command == 'search':
+        for date, name, snippet in index.search(args.query, args.limit):
+            print(f"{date} {name}: {snippet}")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
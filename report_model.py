@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+结构化报告数据 - 每次运行只计算一次，由各个渲染器输出不同格式
+
+    data = ReportData(date=..., stance=Stance(...), sentiment=Sentiment(...), watchlist=[...])
+    render(data, 'markdown')       # Markdown 报告
+    render(data, 'feishu_card')    # 飞书交互式卡片（dict）
+    render(data, 'text')           # 纯文本
+    render(data, 'json')           # JSON 字符串
+
+渲染器是普通函数 renderer(data, **options)，可用 register_renderer 增加新格式。
+只依赖标准库（GitHub Actions 中只安装了 requests）
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from report_template import ReportTemplate, SectionedReport
+
+# 市场立场 -> (飞书卡片颜色, 图标)
+STANCE_STYLE = {
+    'Aggressive Buy': ('blue', '🟢'),
+    'Conservative Buy': ('yellow', '🟡'),
+    'Hold/Cash': ('red', '🔴'),
+}
+NO_NEWS = "- 暂无最新数据，请自行查看财经新闻\n"
+
+
+@dataclass(slots=True)
+class Stance:
+    """市场立场"""
+    name: str
+    reason: str = ''
+
+    @property
+    def word(self):
+        """立场的第一个单词（小写），如 conservative"""
+        return self.name.split()[0].lower()
+
+    @property
+    def style(self):
+        """(卡片颜色, 图标)"""
+        return STANCE_STYLE.get(self.name, STANCE_STYLE['Conservative Buy'])
+
+
+@dataclass(slots=True)
+class Sentiment:
+    """市场情绪指标"""
+    vix: float = None
+    trend: float = None                                   # 大盘（期货）涨跌幅 %
+    futures: dict = field(default_factory=dict)           # {指数名称: 涨跌幅 %}
+    premarket_volume: dict = field(default_factory=dict)  # {股票代码: 盘前成交量}
+
+    def vix_text(self, digits=1):
+        return f"{self.vix:.{digits}f}" if self.vix is not None else 'N/A'
+
+    def trend_text(self):
+        return f"{self.trend:+.1f}%" if self.trend is not None else 'N/A'
+
+    def futures_text(self):
+        text = ' / '.join(f"{name} {move:+.1f}%" for name, move in self.futures.items())
+        return text or '待开盘确认'
+
+    def volume_text(self):
+        text = ' / '.join(f"{symbol} {value / 1e6:.1f}M"
+                          for symbol, value in self.premarket_volume.items())
+        return text or '待数据更新'
+
+
+@dataclass(slots=True)
+class WatchlistEntry:
+    """观察名单中的一支股票（评分数据与交易计划都是可选的）"""
+    symbol: str
+    logic: str = ''
+    entry: str = ''
+    stop: str = ''
+    probability: str = ''
+    price: float = None
+    change: float = None
+    volume_ratio: float = None
+    score: int = None
+
+
+@dataclass(slots=True)
+class ReportData:
+    """一份报告的全部数据"""
+    date: str
+    stance: Stance
+    sentiment: Sentiment = field(default_factory=Sentiment)
+    watchlist: list = field(default_factory=list)          # [WatchlistEntry]
+    position_advice: str = ''                               # 仓位建议（Markdown 列表）
+    risk_tips: list = field(default_factory=list)           # 风险提示（每条一行）
+    advice: str = ''                                        # 今日建议
+    market_news: list = field(default_factory=list)         # 市场新闻（每条一行）
+    stock_news: list = field(default_factory=list)          # [(股票代码, 动态)]
+    generated_at: str = field(default_factory=lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    def to_dict(self):
+        """转换为可 JSON 序列化的字典"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        由字典构建（兼容旧的 report_data 格式：stance / reason / vix / trend / watchlist / risk_tips 平铺）
+        """
+        data = dict(data)
+        stance = data.pop('stance', 'Conservative Buy')
+        if isinstance(stance, dict):
+            stance = Stance(**stance)
+        else:
+            stance = Stance(stance, data.pop('reason', ''))
+        sentiment = data.pop('sentiment', None)
+        if isinstance(sentiment, dict):
+            sentiment = Sentiment(**sentiment)
+        elif sentiment is None:
+            sentiment = Sentiment(vix=_number(data.pop('vix', None)), trend=_number(data.pop('trend', None)))
+        watchlist = [entry if isinstance(entry, WatchlistEntry) else WatchlistEntry(**entry)
+                     for entry in data.pop('watchlist', [])]
+        risk_tips = data.pop('risk_tips', [])
+        if isinstance(risk_tips, str):
+            risk_tips = [line.lstrip('•- ').strip() for line in risk_tips.splitlines() if line.strip()]
+        stock_news = [tuple(item) for item in data.pop('stock_news', [])]
+        names = set(cls.__dataclass_fields__)
+        return cls(stance=stance, sentiment=sentiment, watchlist=watchlist, risk_tips=risk_tips,
+                   stock_news=stock_news, **{k: v for k, v in data.items() if k in names})
+
+
+def _number(value):
+    """'18.5' / '+0.2%' / 18.5 -> float，无法解析时为 None"""
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 渲染器
+# ---------------------------------------------------------------------------
+
+RENDERERS = {}
+
+
+def register_renderer(name, renderer=None):
+    """
+    注册渲染器（也可作为装饰器使用）
+
+    Args:
+        name: 格式名称
+        renderer: renderer(data, **options) -> 输出
+    """
+    if renderer is None:
+        return lambda fn: register_renderer(name, fn)
+    RENDERERS[name] = renderer
+    return renderer
+
+
+def render(data, fmt='markdown', **options):
+    """
+    用指定格式的渲染器输出报告
+
+    Raises:
+        KeyError: 未注册的格式
+    """
+    return RENDERERS[fmt](data, **options)
+
+
+def format_news(data):
+    """市场新闻与观察名单个股动态（Markdown 列表）"""
+    lines = [f"- {line}\n" for line in data.market_news] or [NO_NEWS]
+    if data.stock_news:
+        lines.append("\n**观察名单个股动态：**\n")
+        lines.extend(f"- **{symbol}**：{text}\n" for symbol, text in data.stock_news)
+    return ''.join(lines)
+
+
+def format_watchlist_lines(watchlist, limit=None):
+    """观察名单（编号列表，每支两行：选股逻辑、入场 / 止损 / 成功率）"""
+    lines = []
+    for i, stock in enumerate(watchlist[:limit], 1):
+        lines.append(f"{i}. **{stock.symbol}** - {stock.logic or 'N/A'}")
+        lines.append(f"   入场：{stock.entry or 'N/A'} | 止损：{stock.stop or 'N/A'} | "
+                     f"成功率：{stock.probability or 'N/A'}")
+    return lines
+
+
+def template_values(data):
+    """Markdown 模板的占位符内容（覆盖默认版式与 marcus_enhanced 版式用到的全部占位符）"""
+    vix = data.sentiment.vix
+    return {
+        'date': data.date,
+        'stance': data.stance.name,
+        'reason': data.stance.reason,
+        'vix': data.sentiment.vix_text(),
+        'futures': data.sentiment.futures_text(),
+        'volume': data.sentiment.volume_text(),
+        'position_advice': data.position_advice,
+        'vix_note': "波动率偏高，注意仓位控制" if vix is not None and vix > 20 else "波动率正常，可适度参与",
+        'news': format_news(data),
+        'stance_word': data.stance.word,
+        'advice': data.advice,
+        'watchlist': ''.join(f"- {s.symbol}: {s.logic}，入场 {s.entry}，止损 {s.stop}\n"
+                             for s in data.watchlist) or "- 暂无\n",
+        'risk_tips': ''.join(f"- {tip}\n" for tip in data.risk_tips),
+        'generated_at': data.generated_at,
+    }
+
+
+# 默认 Markdown 版式（精简版，send_feishu_github 保存的报告）
+MARKDOWN_LAYOUT = SectionedReport([
+    ('header', ReportTemplate("# 📈 Marcus 每日动量报告 | {{date}}\n\n")),
+    ('stance', ReportTemplate("## 市场立场：{{stance}}\n{{reason}}\n\n")),
+    ('watchlist', ReportTemplate("## 5% 观察名单\n{{watchlist}}\n")),
+    ('risk', ReportTemplate("## 风险提示\n{{risk_tips}}")),
+])
+
+
+class MarkdownRenderer:
+    """按模板版式渲染 Markdown（不同脚本可使用各自的版式）"""
+
+    def __init__(self, layout=MARKDOWN_LAYOUT, values=None):
+        """
+        Args:
+            layout: SectionedReport 或 ReportTemplate
+            values: 由报告数据生成占位符内容的函数（默认 template_values）
+        """
+        self.layout = layout
+        self.values = values or template_values
+
+    def __call__(self, data, **extra):
+        """
+        Args:
+            extra: 额外的占位符内容（覆盖由数据生成的值）
+        """
+        values = self.values(data)
+        values.update(extra)
+        return self.layout.render(values)
+
+
+register_renderer('markdown', MarkdownRenderer())
+
+
+@register_renderer('feishu_card')
+def feishu_card(data, note=None):
+    """
+    飞书交互式卡片
+
+    Args:
+        note: 卡片底部的说明（默认为生成时间）
+    """
+    color, emoji = data.stance.style
+    watchlist = (["**📋 5% 观察名单：**", ""] + format_watchlist_lines(data.watchlist, 5)
+                 if data.watchlist else ["**📋 观察名单：** 暂无数据"])
+    risk = '\n'.join(f"• {tip}" for tip in data.risk_tips) or 'N/A'
+    return {
+        "config": {"wide_screen_mode": True},
+        "header": {
+            "template": color,
+            "title": {"tag": "plain_text", "content": f"📈 Marcus 每日动量报告 | {data.date}"},
+        },
+        "elements": [
+            {"tag": "div", "text": {"tag": "lark_md",
+                                    "content": f"**{emoji} 市场立场：{data.stance.name}**\n"
+                                               f"**理由：** {data.stance.reason or 'N/A'}"}},
+            {"tag": "div", "text": {"tag": "lark_md",
+                                    "content": f"**📊 VIX 指数：** {data.sentiment.vix_text()}\n"
+                                               f"**📈 市场趋势：** {data.sentiment.trend_text()}"}},
+            {"tag": "div", "text": {"tag": "lark_md", "content": '\n'.join(watchlist)}},
+            {"tag": "div", "text": {"tag": "lark_md", "content": f"**⚠️ 风险提示**\n\n{risk}"}},
+            {"tag": "hr"},
+            {"tag": "note", "elements": [{
+                "tag": "plain_text",
+                "content": note or f"📅 生成时间：{data.generated_at} | 交易员：Marcus",
+            }]},
+        ],
+    }
+
+
+@register_renderer('text')
+def plain_text(data):
+    """纯文本（短信、终端等不支持 Markdown 的渠道）"""
+    lines = [
+        f"Marcus 每日动量报告 | {data.date}",
+        f"市场立场：{data.stance.name}" + (f"（{data.stance.reason}）" if data.stance.reason else ''),
+        f"VIX：{data.sentiment.vix_text()}  市场趋势：{data.sentiment.trend_text()}",
+    ]
+    if data.watchlist:
+        lines.append("观察名单：")
+        for i, stock in enumerate(data.watchlist, 1):
+            plan = ' | '.join(part for part in (
+                stock.logic, stock.entry and f"入场 {stock.entry}", stock.stop and f"止损 {stock.stop}",
+                stock.probability and f"成功率 {stock.probability}") if part)
+            lines.append(f"  {i}. {stock.symbol}" + (f" - {plan}" if plan else ''))
+    if data.risk_tips:
+        lines.append("风险提示：" + '；'.join(data.risk_tips))
+    if data.advice:
+        lines.append(f"今日建议：{data.advice}")
+    lines.append(f"生成时间：{data.generated_at}")
+    return '\n'.join(lines) + '\n'
+
+
+@register_renderer('json')
+def to_json(data, indent=None):
+    """JSON 字符串（UTF-8 原文，不转义中文）"""
+    return json.dumps(data.to_dict(), ensure_ascii=False, indent=indent)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+预编译报告模板 - 版式只解析一次，拆成固定文本片段与动态占位符
+
+模板中用 {{名称}} 标记动态内容，其余文本原样保留。
+渲染时按顺序把固定片段与占位符的值放进一个列表，最后一次 ''.join，
+不会像逐段 += 那样反复复制整篇报告；同一模板可为大量订阅者渲染不同版本
+"""
+
+import hashlib
+import re
+
+_SLOT = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class ReportTemplate:
+    """预编译的报告模板"""
+
+    def __init__(self, layout):
+        """
+        编译模板
+
+        Args:
+            layout: 模板文本，{{名称}} 为动态占位符
+        """
+        parts = _SLOT.split(layout)
+        self.head = parts[0]
+        # (占位符名称, 其后的固定文本)
+        self.pairs = tuple(zip(parts[1::2], parts[2::2]))
+        self.slots = frozenset(parts[1::2])
+
+    def render(self, values=None, **kwargs):
+        """
+        填充占位符并返回完整文本
+
+        Args:
+            values: {占位符名称: 内容}，也可用关键字参数传入
+
+        Raises:
+            KeyError: 缺少某个占位符的内容
+        """
+        if kwargs:
+            values = {**values, **kwargs} if values else kwargs
+        parts = [self.head]
+        append = parts.append
+        for name, static in self.pairs:
+            value = values[name]
+            append(value if isinstance(value, str) else str(value))
+            append(static)
+        return ''.join(parts)
+
+    def render_many(self, variants):
+        """为多组内容（如不同订阅者）依次渲染，返回生成器"""
+        return (self.render(values) for values in variants)
+
+
+class SectionedReport:
+    """由多个模板章节依次拼接而成的报告"""
+
+    def __init__(self, sections):
+        """
+        Args:
+            sections: [(章节名称, ReportTemplate)]，按报告中的顺序排列
+        """
+        self.sections = list(sections)
+        self.slots = frozenset().union(*(template.slots for _, template in self.sections))
+
+    def render(self, values=None, **kwargs):
+        """渲染完整报告"""
+        if kwargs:
+            values = {**values, **kwargs} if values else kwargs
+        return ''.join(template.render(values) for _, template in self.sections)
+
+
+def section_hash(template, values):
+    """章节输入（占位符内容）的哈希值"""
+    digest = hashlib.sha1()
+    for name in sorted(template.slots):
+        value = values[name]
+        digest.update(name.encode('utf-8') + b'\0')
+        digest.update((value if isinstance(value, str) else str(value)).encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+class IncrementalRenderer:
+    """
+    增量渲染：记录每个章节输入的哈希值，只重新渲染输入有变化的章节
+
+    volatile 中的章节（如生成时间）每次都重新渲染，但不算作内容变化
+    """
+
+    def __init__(self, report, volatile=()):
+        self.report = report
+        self.volatile = frozenset(volatile)
+        self.hashes = {}
+        self.texts = {}
+
+    def update(self, values):
+        """
+        用新的输入更新报告
+
+        Returns:
+            tuple: (完整报告文本, 内容有变化的章节名称列表)
+        """
+        changed = []
+        for name, template in self.report.sections:
+            if name in self.volatile:
+                self.texts[name] = template.render(values)
+                continue
+            digest = section_hash(template, values)
+            if self.hashes.get(name) != digest:
+                self.hashes[name] = digest
+                self.texts[name] = template.render(values)
+                changed.append(name)
+        return ''.join(self.texts[name] for name, _ in self.report.sections), changed
+
+    def section_text(self, name):
+        """最近一次渲染的章节文本"""
+        return self.texts.get(name, '')
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+常驻调度进程 - 在同一个进程里按时运行盘前、开盘确认（10:00）与尾盘（15:30）报告
+
+与 cron 每次冷启动脚本相比：
+- Python 解释器与 pandas / yfinance 等模块只在启动时加载一次
+- 各个任务共用同一份内存中的行情缓存，后面的任务只需下载新增的 K 线
+- 盘中刷新任务保留上次的章节哈希，不必每次从状态文件恢复
+
+触发时间按各自的时区计算（默认 America/New_York，自动处理夏令时），
+也可以按 Asia/Shanghai 等本地时区配置；也可以相对开盘 / 收盘设置（open+30、close-30），
+提前收盘日（13:00）自动跟着提前。默认只在交易日运行（节假日见 trading_calendar）。
+
+用法：
+    python3 scheduler.py                     # 常驻运行
+    python3 scheduler.py --list              # 查看各任务下一次运行时间
+    python3 scheduler.py --run premarket     # 立即运行一次某个任务
+    python3 scheduler.py --config my_schedule.json
+"""
+
+import argparse
+import json
+import os
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import trading_calendar
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.environ.get('MARCUS_SCHEDULE', os.path.join(REPO_DIR, 'schedule.json'))
+
+NEW_YORK = ZoneInfo('America/New_York')
+SHANGHAI = ZoneInfo('Asia/Shanghai')
+DEFAULT_TIMEZONE = 'America/New_York'
+# 错过触发时间（如上一个任务运行过久、机器休眠）超过该秒数则跳过本次
+MISFIRE_GRACE = 600
+# 等待期间最长每隔多少秒重新检查一次时间（系统时间调整、休眠唤醒后及时纠正）
+MAX_SLEEP = 60
+
+# 与报告中交易清单的时间一致：盘前、开盘后方向确认、尾盘仓位调整
+DEFAULT_SCHEDULE = {
+    'timezone': DEFAULT_TIMEZONE,
+    'jobs': [
+        {'name': 'premarket', 'at': '08:30', 'job': 'enhanced_report'},
+        {'name': 'open_confirm', 'at': 'open+30', 'job': 'momentum_report', 'tag': 'open'},
+        {'name': 'pre_close', 'at': 'close-30', 'job': 'momentum_report', 'tag': 'close'},
+    ],
+}
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+# 向后查找触发日的最长天数（覆盖长周末与连续假期）
+MAX_LOOKAHEAD_DAYS = 15
+
+
+def parse_days(days):
+    """'mon-fri' / 'daily' / ['mon', 'wed'] -> 星期序号集合（周一为 0）"""
+    if days is None:
+        return set(range(5))
+    if days == 'daily':
+        return set(range(7))
+    if isinstance(days, str):
+        if '-' in days:
+            first, last = (WEEKDAYS.index(d.strip().lower()[:3]) for d in days.split('-'))
+            return set(range(first, last + 1))
+        days = days.split(',')
+    return {WEEKDAYS.index(d.strip().lower()[:3]) for d in days}
+
+
+def describe_time(at):
+    """同时显示纽约与北京时间"""
+    return (f"{at.astimezone(NEW_YORK):%m-%d %H:%M} 纽约 / "
+            f"{at.astimezone(SHANGHAI):%m-%d %H:%M} 北京")
+
+
+def parse_at(at):
+    """
+    'HH:MM' -> (None, 小时, 分钟)；'open+30' / 'close-30' -> ('open' / 'close', 偏移分钟)
+    """
+    for anchor in ('open', 'close'):
+        if at.startswith(anchor):
+            return anchor, int(at[len(anchor):] or 0)
+    hour, minute = (int(part) for part in at.split(':'))
+    return None, hour, minute
+
+
+class DailyTrigger:
+    """每天固定本地时间触发（按所在时区计算，夏令时切换后仍是同一本地时间）"""
+
+    def __init__(self, at, tz=DEFAULT_TIMEZONE, days=None, trading_days=True):
+        """
+        Args:
+            at: 本地时间 HH:MM，或相对当天开盘 / 收盘的分钟数（open+30、close-30，按纽约时间）
+            tz: 时区名称
+            days: 运行的星期（默认周一到周五，见 parse_days）
+            trading_days: 只在美股交易日运行（触发时刻对应的纽约日期休市时跳过）
+        """
+        self.at = parse_at(at)
+        self.tz = trading_calendar.NEW_YORK if self.at[0] else ZoneInfo(tz)
+        self.days = parse_days(days)
+        self.trading_days = trading_days
+
+    def at_on(self, day):
+        """day 当天的触发时间，休市日的相对触发返回 None"""
+        if self.at[0] is None:
+            return datetime(day.year, day.month, day.day, *self.at[1:], tzinfo=self.tz)
+        bounds = trading_calendar.session_bounds(day)
+        if bounds is None:
+            return None
+        anchor = bounds[0] if self.at[0] == 'open' else bounds[1]
+        return anchor + timedelta(minutes=self.at[1])
+
+    def next_after(self, after):
+        """after（带时区）之后的下一次触发时间"""
+        local = after.astimezone(self.tz)
+        for offset in range(MAX_LOOKAHEAD_DAYS):
+            day = local.date() + timedelta(days=offset)
+            if day.weekday() not in self.days:
+                continue
+            at = self.at_on(day)
+            if at is None or at <= after:
+                continue
+            if self.trading_days and not trading_calendar.is_trading_day(at):
+                continue
+            return at
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 任务
+# ---------------------------------------------------------------------------
+
+def run_enhanced_report(context, tag=None):
+    """增强版报告（新闻搜索 + 市场立场），保存并推送飞书"""
+    import marcus_enhanced
+    marcus_enhanced.main(tag)
+
+
+def run_momentum_report(context, tag=None):
+    """完整版动量报告（行情评分），行情缓存在各次运行间共用"""
+    import marcus_report
+    marcus_report.get_price_cache(keep_in_memory=True)
+    marcus_report.main(tag)
+
+
+def run_intraday_refresh(context, tag=None):
+    """盘中增量刷新一次（进程内保留上次的章节哈希）"""
+    import intraday_refresh
+    refresher = context.get('refresher')
+    if refresher is None:
+        refresher = context['refresher'] = intraday_refresh.IntradayRefresher(
+            state_path=intraday_refresh.STATE_PATH)
+    refresher.refresh()
+
+
+def run_drain_outbox(context, tag=None):
+    """发送飞书队列中的待发消息"""
+    from feishu_outbox import FeishuOutbox, OutboxDrainer
+    outbox = context.get('outbox')
+    if outbox is None:
+        outbox = context['outbox'] = FeishuOutbox()
+    OutboxDrainer(outbox).run(wait=False)
+
+
+def run_report_index(context, tag=None):
+    """增量更新报告归档索引"""
+    from report_index import update_report_index
+    update_report_index()
+
+
+JOBS = {
+    'enhanced_report': run_enhanced_report,
+    'momentum_report': run_momentum_report,
+    'intraday_refresh': run_intraday_refresh,
+    'drain_outbox': run_drain_outbox,
+    'report_index': run_report_index,
+}
+# 启动时预先加载的模块（报告脚本延迟导入的重量级依赖也在这里预先加载，第一次运行任务时不必再等待）
+WARM_MODULES = {
+    'enhanced_report': ['marcus_enhanced', 'asyncio', 'feishu_notifier', 'feishu_outbox'],
+    'momentum_report': ['marcus_report', 'price_cache', 'market_data', 'scoring', 'yfinance'],
+    'intraday_refresh': ['intraday_refresh'],
+    'drain_outbox': ['feishu_outbox'],
+    'report_index': ['report_index'],
+}
+
+
+class ScheduledJob:
+    """配置中的一个任务"""
+
+    def __init__(self, name, job, at, tz=DEFAULT_TIMEZONE, days=None, tag=None, trading_days=True):
+        if job not in JOBS:
+            raise ValueError(f"未知的任务类型：{job}（可选：{', '.join(JOBS)}）")
+        self.name = name
+        self.job = job
+        self.tag = tag
+        self.trigger = DailyTrigger(at, tz, days, trading_days)
+        self.next_at = None
+
+    def run(self, context):
+        JOBS[self.job](context, tag=self.tag)
+
+
+def load_schedule(path=None):
+    """
+    读取调度配置（文件不存在时使用默认的三个任务）
+
+    配置格式：
+        {"timezone": "America/New_York",
+         "jobs": [{"name": "premarket", "at": "08:30", "job": "enhanced_report",
+                   "timezone": "Asia/Shanghai", "days": "mon-fri", "tag": null, "enabled": true,
+                   "trading_days": true}]}
+
+    at 也可以是 open+30 / close-30（相对当天开盘 / 收盘的分钟数）
+
+    Returns:
+        list: [ScheduledJob]
+    """
+    path = path or CONFIG_PATH
+    config = DEFAULT_SCHEDULE
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            config = json.load(f)
+    default_tz = config.get('timezone', DEFAULT_TIMEZONE)
+    return [
+        ScheduledJob(item['name'], item['job'], item['at'], item.get('timezone', default_tz),
+                     item.get('days'), item.get('tag'), item.get('trading_days', True))
+        for item in config.get('jobs', [])
+        if item.get('enabled', True)
+    ]
+
+
+class Scheduler:
+    """单进程调度器：任务依次在主线程中运行，共用 context 中的常驻对象"""
+
+    def __init__(self, jobs, now=None):
+        self.jobs = list(jobs)
+        self.context = {}
+        now = now or datetime.now(timezone.utc)
+        for job in self.jobs:
+            job.next_at = job.trigger.next_after(now)
+
+    def warm_up(self):
+        """预先加载各任务用到的模块"""
+        import importlib
+        started = time.perf_counter()
+        for module in dict.fromkeys(m for job in self.jobs for m in WARM_MODULES[job.job]):
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                print(f"⚠️  预加载 {module} 失败: {e}")
+        print(f"🔥 模块预加载完成（{time.perf_counter() - started:.1f}s）")
+
+    def due_job(self):
+        """下一个要运行的任务"""
+        pending = [job for job in self.jobs if job.next_at is not None]
+        return min(pending, key=lambda job: job.next_at) if pending else None
+
+    def run_job(self, job):
+        """运行一个任务（异常只记录，不影响后续任务）"""
+        started = time.monotonic()
+        print(f"\n▶️  {job.name}（{job.job}）开始：{describe_time(datetime.now(timezone.utc))}")
+        try:
+            job.run(self.context)
+            print(f"✅ {job.name} 完成（{time.monotonic() - started:.1f}s）")
+        except Exception:
+            print(f"❌ {job.name} 失败（{time.monotonic() - started:.1f}s）")
+            traceback.print_exc()
+
+    def run_forever(self):
+        while True:
+            job = self.due_job()
+            if job is None:
+                print("ℹ️  没有需要运行的任务")
+                return
+            print(f"⏳ 下一个任务：{job.name} @ {describe_time(job.next_at)}")
+            while True:
+                remaining = (job.next_at - datetime.now(timezone.utc)).total_seconds()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, MAX_SLEEP))
+
+            late = -remaining
+            if late > MISFIRE_GRACE:
+                print(f"⚠️  {job.name} 已错过 {late / 60:.0f} 分钟，跳过本次")
+            else:
+                self.run_job(job)
+            job.next_at = job.trigger.next_after(max(job.next_at, datetime.now(timezone.utc)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 常驻调度进程')
+    parser.add_argument('--config', help=f'调度配置文件（默认 {CONFIG_PATH}）')
+    parser.add_argument('--list', action='store_true', help='列出各任务下一次运行时间')
+    parser.add_argument('--run', metavar='NAME', help='立即运行一次指定任务后退出')
+    args = parser.parse_args()
+
+    scheduler = Scheduler(load_schedule(args.config))
+    if args.list:
+        for job in sorted(scheduler.jobs, key=lambda job: job.next_at):
+            tag = f" [{job.tag}]" if job.tag else ''
+            print(f"{job.name:<16} {job.job:<18}{tag} 下次：{describe_time(job.next_at)}")
+        return
+    if args.run:
+        job = next((job for job in scheduler.jobs if job.name == args.run), None)
+        if job is None:
+            parser.error(f"配置中没有任务 {args.run}")
+        scheduler.run_job(job)
+        return
+
+    scheduler.warm_up()
+    scheduler.run_forever()
+
+
+if __name__ == '__main__':
+    main()
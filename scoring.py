@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+向量化评分引擎 - 对整个股票池一次性计算动量指标
+规则与 marcus_report.analyze_stock 完全一致，只是把逐支计算换成矩阵运算
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+import indicators as ta
+
+# 与 analyze_stock 相同：少于 5 根 K 线的股票不参与评分
+MIN_BARS = 5
+
+# 评分规则的参数（默认 0-7 分，可用 sweep.py 在历史数据上搜索更优的取值）
+SCORE_PARAMS = {
+    'big_move': 2.0,          # 日涨幅超过该值（%）加 big_move_points 分
+    'big_move_points': 2,
+    'up_points': 1,           # 当日上涨
+    'ma5_points': 1,          # 收盘价站上 MA5
+    'ma20_points': 1,         # 收盘价站上 MA20
+    'volume_surge': 1.5,      # 量比超过该值加 volume_points 分
+    'volume_points': 2,
+}
+
+# 进入观察名单的最低评分（报告、流式评分与回测共用）
+MIN_SCORE = 3
+
+# 市场立场阈值（determine_market_stance、marcus_enhanced.determine_stance 与回测共用）
+STANCE_THRESHOLDS = {
+    'vix_low': 15.0,          # VIX 低于该值且 SPY 涨幅超过 spy_up -> 激进买入
+    'spy_up': 0.5,
+    'vix_high': 25.0,         # VIX 高于该值或 SPY 跌幅超过 spy_down -> 观望
+    'spy_down': -1.0,
+}
+
+
+def panel_field(panel, field):
+    """从 (股票代码, 字段) 多级索引面板中取出 (日期 × 股票) 矩阵"""
+    return panel.xs(field, axis=1, level=1)
+
+
+def score_rules(daily_change, current, ma5, ma20, volume_ratio, params=None):
+    """
+    评分规则（输入为任意形状的同尺寸数组，逐元素计算）
+
+    Args:
+        params: 覆盖 SCORE_PARAMS 中的部分参数（可选）
+
+    Returns:
+        与输入同形状的整数数组；标量输入返回 int
+    """
+    p = SCORE_PARAMS if params is None else {**SCORE_PARAMS, **params}
+    if isinstance(daily_change, (int, float)):
+        # 单支股票的标量输入（流式评分每根 K 线都会调用），不经过 numpy
+        return int(_points(p, daily_change, current, ma5, ma20, volume_ratio))
+    with np.errstate(invalid='ignore'):
+        return np.asarray(_points(p, daily_change, current, ma5, ma20, volume_ratio)).astype(int)
+
+
+def _points(p, daily_change, current, ma5, ma20, volume_ratio):
+    return ((daily_change > p['big_move']) * p['big_move_points']
+            + (daily_change > 0) * p['up_points']
+            + (current > ma5) * p['ma5_points']
+            + (current > ma20) * p['ma20_points']
+            + (volume_ratio > p['volume_surge']) * p['volume_points'])
+
+
+def _align_valid_rows(close, volume):
+    """
+    把每支股票的有效 K 线压到矩阵底部
+
+    停牌或上市较晚的股票在面板里会有空值，逐支分析时这些日期会被
+    dropna 去掉。这里按列稳定排序，使每列最后 n 行恰好是该股票的
+    n 根有效 K 线，后续窗口计算就可以统一用末尾切片完成。
+    """
+    valid = ~np.isnan(close)
+    order = np.argsort(valid, axis=0, kind='stable')
+    close = np.take_along_axis(close, order, axis=0)
+    volume = np.take_along_axis(volume, order, axis=0)
+    valid = np.take_along_axis(valid, order, axis=0)
+    volume = np.where(valid, volume, np.nan)
+    return close, volume, valid.sum(axis=0)
+
+
+def score_matrix(close, volume):
+    """
+    对 (日期 × 股票) 的收盘价 / 成交量矩阵计算最新一天的指标
+
+    Args:
+        close: 收盘价矩阵 ndarray，缺失值为 NaN
+        volume: 成交量矩阵 ndarray，形状与 close 相同
+
+    Returns:
+        dict: 各指标的一维数组（长度为股票数），以及有效标记 valid
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    close, volume, counts = _align_valid_rows(close, volume)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        current = close[-1]
+        prev_close = close[-2] if len(close) >= 2 else np.full_like(current, np.nan)
+        daily_change = (current - prev_close) / prev_close * 100
+
+        ma5 = close[-5:].mean(axis=0)
+        ma20 = np.where(counts >= 20, close[-20:].mean(axis=0), ma5)
+
+        avg_volume = np.nanmean(volume[-10:], axis=0)
+        volume_ratio = np.where(avg_volume > 0, volume[-1] / avg_volume, 1.0)
+
+    score = score_rules(daily_change, current, ma5, ma20, volume_ratio)
+
+    return {
+        'price': current,
+        'change': daily_change,
+        'volume_ratio': volume_ratio,
+        'score': score,
+        'ma5': ma5,
+        'ma20': ma20,
+        'valid': counts >= MIN_BARS,
+    }
+
+
+def score_universe(close, volume):
+    """
+    对整个股票池评分
+
+    Args:
+        close: 收盘价 DataFrame（行为日期，列为股票代码）
+        volume: 成交量 DataFrame，索引与列与 close 一致
+
+    Returns:
+        DataFrame: 以股票代码为索引，列为 price/change/volume_ratio/score/ma5/ma20，
+            K 线不足的股票不包含在内
+    """
+    volume = volume.reindex(index=close.index, columns=close.columns)
+    metrics = score_matrix(close.to_numpy(dtype=float), volume.to_numpy(dtype=float))
+    valid = metrics.pop('valid')
+    result = pd.DataFrame(metrics, index=close.columns)
+    result.index.name = 'symbol'
+    return result[valid]
+
+
+def indicator_matrix(high, low, close, names=None):
+    """
+    对 (日期 × 股票) 的最高价 / 最低价 / 收盘价矩阵计算最新一天的技术指标
+
+    与 score_matrix 一样先把每支股票的有效 K 线压到矩阵底部，
+    停牌日不会打断布林带、N 日新高等窗口指标
+
+    Args:
+        names: 需要的指标（见 indicators.INDICATORS，默认全部）
+
+    Returns:
+        dict: 指标名称 -> 一维数组（长度为股票数）
+    """
+    close = np.asarray(close, dtype=float)
+    order = np.argsort(~np.isnan(close), axis=0, kind='stable')
+    high, low, close = (np.take_along_axis(np.asarray(m, dtype=float), order, axis=0)
+                        for m in (high, low, close))
+    return ta.latest(high, low, close, names)
+
+
+def score_panel(panel, indicators=None):
+    """
+    对 fetch_price_panel 格式的面板评分
+
+    Args:
+        panel: 日线面板
+        indicators: 额外附加的技术指标列（如 ['rsi', 'atr', 'breakout']），
+            只作参考，不影响评分
+    """
+    scores = score_universe(panel_field(panel, 'Close'), panel_field(panel, 'Volume'))
+    if indicators:
+        close = panel_field(panel, 'Close')
+        extra = indicator_matrix(panel_field(panel, 'High').reindex_like(close),
+                                 panel_field(panel, 'Low').reindex_like(close), close, indicators)
+        extra = pd.DataFrame(extra, index=close.columns)
+        scores = scores.join(extra)
+    return scores
+
+
+def iter_rows(scores):
+    """按股票池顺序逐行产出与 analyze_stock 相同结构的字典"""
+    for symbol, row in scores.to_dict('index').items():
+        yield {'symbol': symbol, **row}
+
+
+def select_top_k(items, k, key):
+    """
+    流式选出 key 最大的前 k 个元素
+
+    只保留大小为 k 的最小堆，内存占用为 O(k)；key 相同时先到的元素
+    排在前面（与 list.sort(reverse=True) 的稳定排序结果一致）
+    """
+    if k <= 0:
+        return []
+    heap = []
+    for seq, item in enumerate(items):
+        # 堆顶是当前最差的元素：key 最小，同 key 时最晚到达
+        entry = (key(item), -seq, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(key=lambda e: (e[0], e[1]), reverse=True)
+    return [item for _, _, item in heap]
+
+
+def top_candidates(scores, min_score=MIN_SCORE, limit=5):
+    """
+    按评分筛选观察名单，返回与 analyze_stock 相同结构的字典列表
+
+    评分相同的股票保持股票池中的原始顺序
+    """
+    passed = (row for row in iter_rows(scores) if row['score'] >= min_score)
+    return select_top_k(passed, limit, key=lambda row: row['score'])
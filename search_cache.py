@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+搜索结果缓存 - 按规范化后的查询语句与结果数量缓存 OpenClaw web_search 输出
+带过期时间（TTL）与按总大小淘汰，存储在本地 SQLite
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL = 900                    # 15 分钟
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024  # 20 MB
+
+
+def normalize_query(query):
+    """规范化查询语句：忽略大小写与多余空白"""
+    return ' '.join(query.lower().split())
+
+
+def cache_key(query, count):
+    """查询语句 + 结果数量的缓存键"""
+    raw = f"{normalize_query(query)}|{int(count)}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SearchCache:
+    """基于 SQLite 的搜索结果缓存"""
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        初始化搜索缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 结果有效期（秒）
+            max_bytes: 缓存结果总大小上限，超出时淘汰最久未使用的结果
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, 'search_cache.sqlite')
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                query TEXT,
+                count INTEGER,
+                result TEXT,
+                size INTEGER,
+                created_at REAL,
+                accessed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at);
+        """)
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def get(self, query, count, max_age=None):
+        """
+        读取未过期的结果，未命中返回 None
+
+        Args:
+            query: 查询语句
+            count: 结果数量
+            max_age: 本次读取可接受的最长缓存时间（秒，可选，默认为缓存的 TTL；
+                只能比 TTL 更短，不改变其他调用方看到的有效期）
+        """
+        key = cache_key(query, count)
+        now = time.time()
+        age = self.ttl if max_age is None else min(self.ttl, max_age)
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT result FROM results WHERE key = ? AND created_at >= ?",
+                (key, now - age)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, query, count, result):
+        """写入结果（出错的结果不缓存），必要时淘汰旧结果"""
+        if not result or result.startswith('Error'):
+            return
+        now = time.time()
+        size = len(result.encode('utf-8'))
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(query, count), normalize_query(query), int(count), result, size, now, now))
+            self._evict(now)
+
+    def _evict(self, now):
+        """删除过期结果，总大小超限时按最久未使用淘汰"""
+        self.conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self.conn.execute(
+                "SELECT key, size FROM results ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM results WHERE key = ?", stale)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+搜索结果结构化提取 - 单次扫描 OpenClaw 输出，提取 VIX、股指期货涨跌、
+个股价格与盘前成交量
+
+所有规则合并为一个预编译的正则表达式，用 finditer 从头到尾扫描一遍，
+按命中的分组名分派，不会对同一段文本重复匹配
+"""
+
+import re
+from functools import lru_cache
+
+_NUMBER = r'\d[\d,]*(?:\.\d+)?'
+
+# 股指名称 -> 统一名称
+FUTURES_NAMES = {
+    's&p 500': 'S&P 500', 's&p': 'S&P 500', 'spx': 'S&P 500', 'es': 'S&P 500',
+    'nasdaq 100': 'Nasdaq 100', 'nasdaq': 'Nasdaq 100', 'ndx': 'Nasdaq 100',
+    'dow jones': 'Dow Jones', 'dow': 'Dow Jones',
+}
+
+_VOLUME_UNITS = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+
+_BASE_RULES = [
+    # VIX 18.5 / VIX: 18.5 / volatility index 18.5
+    ('vix', rf'(?:\bVIX|volatility\s+index)\s*[:\s]\s*(?P<vix_value>{_NUMBER})'),
+    # S&P 500 futures +0.3% / Nasdaq futures rose 0.5% / Dow futures -0.2%
+    ('futures', r'\b(?P<fut_name>S&P(?:\s*500)?|Nasdaq(?:\s*100)?|Dow(?:\s+Jones)?|(?-i:SPX|NDX|ES))'
+                r'\s+futures?\s+(?:(?P<fut_dir>rose|gained|climbed|up|fell|dropped|slipped|down|are|were|at)\s+)?'
+                rf'(?P<fut_move>[+\-−]?{_NUMBER})\s*%'),
+    # premarket volume 2.3M / on volume of 2.3M（归属于同一行最近出现的股票）
+    ('volume', rf'\bvolume\s+(?:of\s+)?(?P<vol_value>{_NUMBER})\s*(?P<vol_unit>[KMB])\b'),
+]
+
+_NEGATIVE_WORDS = {'fell', 'dropped', 'slipped', 'down'}
+
+
+def _to_float(text):
+    return float(text.replace(',', '').replace('−', '-'))
+
+
+@lru_cache(maxsize=32)
+def compile_pattern(symbols=()):
+    """
+    把所有提取规则合并成一个正则（按股票列表缓存）
+
+    Args:
+        symbols: 需要提取价格的股票代码元组
+    """
+    rules = list(_BASE_RULES)
+    if symbols:
+        # 股票代码区分大小写，避免把普通单词（如 coin、meta）当成代码
+        alternation = '(?-i:' + '|'.join(re.escape(s) for s in sorted(symbols, key=len, reverse=True)) + ')'
+        # NVDA ... $145.20（同一行内 60 个字符以内，中间不含其他数字）
+        rules.insert(2, ('price', rf'\b(?P<price_sym>{alternation})\b[^\n$\d]{{0,60}}?\$(?P<price_value>{_NUMBER})'))
+        # 单独出现的股票代码，用于确定后续成交量 / 价格的归属
+        rules.append(('mention', rf'\b(?P<mention_sym>{alternation})\b'))
+        # 单独出现的美元价格，归属于同一行最近出现的股票
+        rules.append(('dollar', rf'\$(?P<dollar_value>{_NUMBER})'))
+    # 先用单个字符集快速排除不可能匹配的位置（各规则的首字母：VIX/volatility/volume、
+    # S&P/SPX、Nasdaq/NDX、Dow、ES、$ 以及股票代码首字母），比逐个尝试所有分支快得多
+    first = '[vsnde$]'
+    if symbols:
+        first += '|(?-i:[' + ''.join(sorted({re.escape(s[0]) for s in symbols})) + '])'
+    combined = '|'.join(f'(?P<{name}>{body})' for name, body in rules)
+    return re.compile(f'(?={first})(?:{combined})', re.IGNORECASE)
+
+
+def extract_metrics(text, symbols=()):
+    """
+    单次扫描提取市场指标
+
+    Args:
+        text: 搜索结果文本（可为多条结果拼接）
+        symbols: 需要提取价格/成交量的股票代码
+
+    Returns:
+        dict:
+            - vix: 第一次出现的 VIX 数值（没有则为 None）
+            - futures: {股指名称: 涨跌幅%}（每个股指取第一次出现的值）
+            - prices: {股票代码: 价格}
+            - premarket_volume: {股票代码: 成交量（股）}
+    """
+    metrics = {'vix': None, 'futures': {}, 'prices': {}, 'premarket_volume': {}}
+    if not text:
+        return metrics
+
+    symbols = tuple(sorted({s.upper() for s in symbols}))
+    current = None       # 当前行最近出现的股票
+    line_start = 0
+    for match in compile_pattern(symbols).finditer(text):
+        kind = match.lastgroup
+        # 换行后不再沿用上一行的股票
+        if text.count('\n', line_start, match.start()):
+            current = None
+        line_start = match.start()
+
+        if kind == 'vix':
+            if metrics['vix'] is None:
+                metrics['vix'] = _to_float(match.group('vix_value'))
+        elif kind == 'futures':
+            name = FUTURES_NAMES.get(' '.join(match.group('fut_name').lower().split()))
+            move = _to_float(match.group('fut_move'))
+            direction = (match.group('fut_dir') or '').lower()
+            if direction in _NEGATIVE_WORDS and move > 0:
+                move = -move
+            metrics['futures'].setdefault(name, move)
+        elif kind == 'price':
+            current = match.group('price_sym').upper()
+            metrics['prices'].setdefault(current, _to_float(match.group('price_value')))
+        elif kind == 'mention':
+            current = match.group('mention_sym').upper()
+        elif kind == 'dollar' and current:
+            metrics['prices'].setdefault(current, _to_float(match.group('dollar_value')))
+        elif kind == 'volume' and current:
+            volume = _to_float(match.group('vol_value')) * _VOLUME_UNITS[match.group('vol_unit').upper()]
+            metrics['premarket_volume'].setdefault(current, volume)
+    return metrics
+
+
+def futures_trend(metrics, default=None):
+    """由股指期货涨跌估计市场趋势（优先标普，其次纳指、道指）"""
+    futures = metrics.get('futures', {})
+    for name in ('S&P 500', 'Nasdaq 100', 'Dow Jones'):
+        if name in futures:
+            return futures[name]
+    return default
@@ -5,129 +5,68 @@ Marcus - GitHub Actions 版本
 """
 
 import json
-import urllib.request
 import os
-from datetime import datetime
+
+from feishu_outbox import FeishuOutbox, spawn_drainer
+from report_index import REPORTS_DIR, update_report_index
+from report_model import ReportData, Sentiment, Stance, WatchlistEntry, render
+import trading_calendar
+
+def build_report_data(today):
+    """报告数据（简化版，实际可接入 API）"""
+    return ReportData(
+        date=today,
+        stance=Stance("Conservative Buy", "VIX=18.5 中性，市场震荡格局"),
+        sentiment=Sentiment(vix=18.5, trend=0.2),
+        # 观察名单
+        watchlist=[
+            WatchlistEntry("NVDA", "AI 芯片龙头", "$145", "$138", "68%"),
+            WatchlistEntry("TSLA", "高 Beta 特性", "$250", "$235", "55%"),
+            WatchlistEntry("AMD", "半导体复苏", "$125", "$118", "62%"),
+            WatchlistEntry("META", "广告增长", "$580", "$550", "65%"),
+            WatchlistEntry("COIN", "加密货币联动", "BTC>$95K", "-12%", "52%"),
+        ],
+        risk_tips=["仓位建议：30-50%", "分散配置，不超过 3 支股票", "单笔亏损 < 2%"],
+    )
+
 
 def generate_report():
     """生成 Marcus 报告"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    weekday = datetime.now().strftime('%A')
+    today = trading_calendar.market_date().isoformat()
+    # 按纽约日期判断是否休市（周末、节假日；Actions 的定时任务按 UTC 触发）
+    closed = None if trading_calendar.is_trading_day() else trading_calendar.closed_reason()
     
-    # 周末检查（可以通过环境变量跳过，用于测试）
+    # 休市检查（可以通过环境变量跳过，用于测试）
     skip_weekend = os.environ.get('SKIP_WEEKEND', 'true').lower() == 'true'
-    if weekday in ['Saturday', 'Sunday'] and skip_weekend:
-        return None, "周末休市"
-    
-    # 如果是周末但不跳过（测试模式），添加标记
-    if weekday in ['Saturday', 'Sunday']:
-        today += " (周末测试)"
-    
-    # 市场数据（简化版，实际可接入 API）
-    vix = 18.5
-    trend = "+0.2%"
-    stance = "Conservative Buy"
-    reason = "VIX=18.5 中性，市场震荡格局"
-    
-    # 观察名单
-    watchlist = [
-        {"symbol": "NVDA", "logic": "AI 芯片龙头", "entry": "$145", "stop": "$138", "prob": "68%"},
-        {"symbol": "TSLA", "logic": "高 Beta 特性", "entry": "$250", "stop": "$235", "prob": "55%"},
-        {"symbol": "AMD", "logic": "半导体复苏", "entry": "$125", "stop": "$118", "prob": "62%"},
-        {"symbol": "META", "logic": "广告增长", "entry": "$580", "stop": "$550", "prob": "65%"},
-        {"symbol": "COIN", "logic": "加密货币联动", "entry": "BTC>$95K", "stop": "-12%", "prob": "52%"},
-    ]
+    if closed and skip_weekend:
+        return None, f"休市（{closed}）"
     
-    # 构建飞书卡片
-    card = {
-        "config": {
-            "wide_screen_mode": True
-        },
-        "header": {
-            "template": "yellow",
-            "title": {
-                "tag": "plain_text",
-                "content": f"📈 Marcus 每日动量报告 | {today}"
-            }
-        },
-        "elements": [
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"**🟡 市场立场：{stance}**\n**理由：** {reason}"
-                }
-            },
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"**📊 VIX 指数：** {vix}\n**📈 市场趋势：** {trend}"
-                }
-            },
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": "**📋 5% 观察名单：**\n\n" + 
-                    "\n".join([
-                        f"{i}. **{s['symbol']}** - {s['logic']}\n   入场：{s['entry']} | 止损：{s['stop']} | 成功率：{s['prob']}"
-                        for i, s in enumerate(watchlist, 1)
-                    ])
-                }
-            },
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": """**⚠️ 风险提示**
-
-• 仓位建议：30-50%
-• 分散配置，不超过 3 支股票
-• 单笔亏损 < 2%"""
-                }
-            },
-            {
-                "tag": "hr"
-            },
-            {
-                "tag": "note",
-                "elements": [
-                    {
-                        "tag": "plain_text",
-                        "content": f"🤖 GitHub Actions 自动发送 | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Marcus"
-                    }
-                ]
-            }
-        ]
-    }
+    # 如果是休市日但不跳过（测试模式），添加标记
+    if closed:
+        today += " (休市测试)"
     
-    report_text = f"""# 📈 Marcus 每日动量报告 | {today}
-
-## 市场立场：{stance}
-{reason}
-
-## 5% 观察名单
-- NVDA: AI 芯片龙头，入场${145}, 止损${138}
-- TSLA: 高 Beta 特性，入场${250}, 止损${235}
-- AMD: 半导体复苏，入场${125}, 止损${118}
-- META: 广告增长，入场${580}, 止损${550}
-- COIN: 加密货币联动，BTC>$95K 介入
-
-## 风险提示
-仓位建议：30-50%，单笔亏损<2%
-"""
+    # 报告数据只构建一次，飞书卡片与 Markdown 报告都由它渲染
+    data = build_report_data(today)
+    card = render(data, 'feishu_card',
+                  note=f"🤖 GitHub Actions 自动发送 | {data.generated_at} | Marcus")
+    report_text = render(data, 'markdown')
     
     # 保存报告
-    os.makedirs('reports', exist_ok=True)
-    with open(f'reports/{today}_report.md', 'w') as f:
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    with open(os.path.join(REPORTS_DIR, f'{today}_report.md'), 'w') as f:
         f.write(report_text)
     
     return card, report_text
 
 
-def send_to_feishu(card):
-    """发送报告到飞书"""
+def send_to_feishu(card, outbox=None):
+    """
+    把报告卡片加入飞书发送队列（立即返回，由 feishu_outbox 的发送进程负责发送与重试）
+    
+    Args:
+        card: 飞书卡片
+        outbox: 发送队列（可选，默认使用 MARCUS_OUTBOX_PATH）
+    """
     webhook_url = os.environ.get('FEISHU_WEBHOOK')
     
     if not webhook_url:
@@ -141,25 +80,17 @@ def send_to_feishu(card):
     }
     
     try:
-        req = urllib.request.Request(
-            webhook_url,
-            data=json.dumps(data).encode('utf-8'),
-            headers={'Content-Type': 'application/json'},
-            method='POST'
-        )
-        
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            
-            if result.get('code') == 0 or result.get('StatusCode') == 0:
-                print("✅ 飞书通知发送成功！")
-                return True
-            else:
-                print(f"❌ 发送失败：{result}")
-                return False
+        outbox = outbox or FeishuOutbox()
+        # 幂等键按日期区分，重跑不会重复推送
+        key = f"send_feishu_github:{trading_calendar.market_date().isoformat()}@{webhook_url}"
+        if outbox.enqueue(webhook_url, json.dumps(data).encode('utf-8'), key=key):
+            print("✅ 已加入飞书发送队列")
+        else:
+            print("ℹ️  今日报告已在发送队列中，跳过重复推送")
+        return True
                 
     except Exception as e:
-        print(f"❌ 发送失败：{e}")
+        print(f"❌ 加入发送队列失败：{e}")
         return False
 
 
@@ -174,14 +105,18 @@ if __name__ == '__main__':
         exit(0)
     
     print(report_text)
+    update_report_index(REPORTS_DIR)
     print("")
     print("="*50)
     
     success = send_to_feishu(card)
     
     if success:
+        # GitHub Actions 中由工作流的下一步运行发送进程，本地运行时在后台启动
+        if os.environ.get('GITHUB_ACTIONS') != 'true':
+            spawn_drainer()
         print("")
-        print("✅ 报告已生成并发送到飞书！")
+        print("✅ 报告已生成，正在后台发送到飞书！")
         exit(0)
     else:
         print("")
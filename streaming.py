@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+盘中流式评分引擎 - 逐根 K 线（分钟线或日线）更新动量指标与观察名单
+
+每支股票维护最近 20 根日线的滚动和（MA5 / MA20 / 10 日均量），
+当天的日线随分钟线不断更新（收盘价取最新价、成交量累加），
+每根 K 线的指标与评分更新为常数时间；评分规则与 analyze_stock 完全一致。
+评分不变、或变化不影响名单（低于入选门槛且不在名单内）时不触及观察名单；
+否则重选名单，耗时与评分不低于名单最低分的股票数成正比（按评分分桶，只看高分桶）。
+观察名单变化时产出事件：
+    {'type': 'added' / 'removed' / 'rank', 'symbol', 'score', 'rank', 'time'}
+
+K 线来源：
+    - 回放文件：CSV（time,symbol,open,high,low,close,volume）或 JSON lines
+    - 实时行情：本地适配程序，每行输出一条 JSON 格式的 K 线（字段同上）
+
+用法：
+    python3 streaming.py --replay bars.csv --seed-period 1mo
+    python3 streaming.py --live-cmd "python3 my_feed_adapter.py" --universe universe.txt
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import shlex
+import subprocess
+import sys
+import time
+
+from indicators import RollingWindow
+from scoring import MIN_BARS, MIN_SCORE, score_rules
+
+TOP_K = 5
+
+
+class SymbolState:
+    """单支股票的滚动状态"""
+
+    __slots__ = ('day', 'bars', 'prev_close', 'close5', 'close20', 'volume10', 'day_volume')
+
+    def __init__(self):
+        self.day = None
+        self.bars = 0
+        self.prev_close = None
+        self.close5 = RollingWindow(5)
+        self.close20 = RollingWindow(20)
+        self.volume10 = RollingWindow(10)
+        self.day_volume = 0.0
+
+    def update(self, day, close, volume):
+        """
+        用一根 K 线更新状态
+
+        Args:
+            day: 交易日（YYYY-MM-DD）
+            close: 最新价
+            volume: 这根 K 线的成交量（同一天内累加）
+        """
+        if day != self.day:
+            # 新的一天：上一天的收盘价成为昨收，开始一根新的日线
+            if self.day is not None:
+                self.prev_close = self.close5.values[-1]
+            self.day = day
+            self.bars += 1
+            self.day_volume = volume
+            self.close5.push(close)
+            self.close20.push(close)
+            self.volume10.push(volume)
+        else:
+            self.day_volume += volume
+            self.close5.replace_last(close)
+            self.close20.replace_last(close)
+            self.volume10.replace_last(self.day_volume)
+
+    def metrics(self):
+        """当前指标（与 analyze_stock 结构相同，K 线不足时返回 None）"""
+        if self.bars < MIN_BARS:
+            return None
+        current = self.close5.values[-1]
+        daily_change = (current - self.prev_close) / self.prev_close * 100
+        ma5 = self.close5.mean()
+        ma20 = self.close20.mean() if self.bars >= 20 else ma5
+        avg_volume = self.volume10.mean()
+        volume_ratio = self.day_volume / avg_volume if avg_volume > 0 else 1
+        score = score_rules(daily_change, current, ma5, ma20, volume_ratio)
+        return {
+            'price': current,
+            'change': daily_change,
+            'volume_ratio': volume_ratio,
+            'score': int(score),
+            'ma5': ma5,
+            'ma20': ma20,
+        }
+
+
+class StreamingEngine:
+    """流式评分引擎：逐根 K 线更新指标，维护观察名单并产出变化事件"""
+
+    def __init__(self, universe=(), min_score=MIN_SCORE, top_k=TOP_K):
+        """
+        Args:
+            universe: 股票池（决定同分时的排序，未列出的股票按首次出现顺序排在后面）
+            min_score: 进入观察名单的最低评分
+            top_k: 观察名单长度
+        """
+        self.min_score = min_score
+        self.top_k = top_k
+        self.order = {symbol: i for i, symbol in enumerate(universe)}
+        self.states = {}
+        self.scores = {}
+        # 评分 -> 该评分的股票集合（观察名单只需查看高分桶）
+        self.buckets = {}
+        self.watchlist = []
+        self.ticks = 0
+
+    def _state(self, symbol):
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = SymbolState()
+            self.order.setdefault(symbol, len(self.order))
+        return state
+
+    def seed(self, panel, before=None):
+        """
+        用日线历史面板（fetch_price_panel 格式）初始化滚动窗口
+
+        Args:
+            panel: 日线面板（每支股票只用到最近 20 根日线）
+            before: 只使用该日期（YYYY-MM-DD）之前的日线，避免与随后流入的当天分钟线重复计算
+        """
+        if before is not None:
+            panel = panel[panel.index < before]
+        symbols = list(dict.fromkeys(panel.columns.get_level_values(0)))
+        days = [ts.strftime('%Y-%m-%d') for ts in panel.index]
+        for symbol in symbols:
+            data = panel[symbol][['Close', 'Volume']].tail(20)
+            state = self._state(symbol)
+            for day, close, volume in zip(days[-len(data):], data['Close'], data['Volume']):
+                if close == close:   # 跳过缺失值（NaN）
+                    state.update(day, float(close), float(volume))
+            self._rescore(symbol, state)
+        self.watchlist = self._compute_watchlist()
+
+    def on_bar(self, bar):
+        """
+        处理一根 K 线
+
+        Args:
+            bar: {'time': 'YYYY-MM-DD HH:MM[:SS]', 'symbol', 'close', 'volume', ...}
+
+        Returns:
+            list: 观察名单变化事件（没有变化时为空列表）
+        """
+        self.ticks += 1
+        symbol = bar['symbol']
+        state = self._state(symbol)
+        state.update(str(bar['time'])[:10], float(bar['close']), float(bar.get('volume') or 0))
+        if not self._rescore(symbol, state):
+            return []
+        return self._refresh_watchlist(bar['time'])
+
+    def _rescore(self, symbol, state):
+        """重新评分，返回评分是否变化"""
+        metrics = state.metrics()
+        score = metrics['score'] if metrics else None
+        old = self.scores.get(symbol)
+        if score == old:
+            return False
+        if old is not None:
+            self.buckets[old].discard(symbol)
+        if score is not None:
+            self.buckets.setdefault(score, set()).add(symbol)
+            self.scores[symbol] = score
+        else:
+            self.scores.pop(symbol, None)
+        # 只有评分跨越观察名单门槛或涉及名单内股票时才需要重算名单
+        return (symbol in self.watchlist
+                or (score is not None and score >= self._cutoff()))
+
+    def _cutoff(self):
+        """进入观察名单所需的最低评分"""
+        if len(self.watchlist) < self.top_k:
+            return self.min_score
+        return max(self.min_score, self.scores.get(self.watchlist[-1], self.min_score))
+
+    def _compute_watchlist(self):
+        """
+        按评分从高到低、同分按股票池顺序选出前 top_k 支
+
+        从最高分桶往下取，凑满 top_k 即停止；每个桶内按股票池顺序取前几支，
+        耗时与所扫描桶内的股票数成正比（不是常数时间）
+        """
+        selected = []
+        for score in sorted((s for s in self.buckets if s >= self.min_score), reverse=True):
+            need = self.top_k - len(selected)
+            if need <= 0:
+                break
+            selected.extend(heapq.nsmallest(need, self.buckets[score], key=self.order.__getitem__))
+        return selected
+
+    def _refresh_watchlist(self, at):
+        new = self._compute_watchlist()
+        old = self.watchlist
+        if new == old:
+            return []
+        self.watchlist = new
+        events = []
+        new_set, old_set = set(new), set(old)
+        for symbol in old:
+            if symbol not in new_set:
+                events.append({'type': 'removed', 'symbol': symbol,
+                               'score': self.scores.get(symbol), 'rank': None, 'time': at})
+        for rank, symbol in enumerate(new, 1):
+            kind = 'added' if symbol not in old_set else 'rank'
+            if kind == 'rank' and old.index(symbol) + 1 == rank:
+                continue
+            events.append({'type': kind, 'symbol': symbol,
+                           'score': self.scores[symbol], 'rank': rank, 'time': at})
+        return events
+
+    def current_watchlist(self):
+        """当前观察名单（与 generate_watchlist 结构相同的字典列表）"""
+        return [{'symbol': symbol, **self.states[symbol].metrics()} for symbol in self.watchlist]
+
+
+def _parse_bar(record):
+    bar = dict(record)
+    bar['close'] = float(bar['close'])
+    bar['volume'] = float(bar.get('volume') or 0)
+    return bar
+
+
+def replay_file(path, speed=0.0):
+    """
+    从回放文件读取 K 线（.csv 或 JSON lines）
+
+    Args:
+        path: 文件路径
+        speed: 回放速度倍数（0 表示不等待，尽快回放；60 表示 1 分钟数据 1 秒回放完）
+    """
+    with open(path, 'r', newline='') as f:
+        if path.endswith('.csv'):
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        yield from _paced((_parse_bar(r) for r in records), speed)
+
+
+def _paced(bars, speed):
+    """按 K 线时间间隔回放"""
+    if not speed:
+        yield from bars
+        return
+    from datetime import datetime
+    start_wall = start_bar = None
+    for bar in bars:
+        at = datetime.fromisoformat(str(bar['time']))
+        if start_bar is None:
+            start_wall, start_bar = time.monotonic(), at
+        delay = (at - start_bar).total_seconds() / speed - (time.monotonic() - start_wall)
+        if delay > 0:
+            time.sleep(delay)
+        yield bar
+
+
+def live_feed(cmd):
+    """启动本地行情适配程序，逐行读取其输出的 JSON K 线"""
+    proc = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, text=True, bufsize=1)
+    try:
+        for line in proc.stdout:
+            if line.strip():
+                try:
+                    yield _parse_bar(json.loads(line))
+                except (ValueError, KeyError):
+                    continue
+    finally:
+        proc.terminate()
+
+
+def print_event(event):
+    icons = {'added': '🟢 进入', 'removed': '🔴 移出', 'rank': '🔁 排名'}
+    rank = f" 第 {event['rank']} 名" if event['rank'] else ''
+    print(f"{event['time']} {icons[event['type']]} {event['symbol']}{rank}（评分 {event['score']}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 盘中流式评分')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--replay', metavar='FILE', help='回放文件（.csv 或 JSON lines）')
+    source.add_argument('--live-cmd', metavar='CMD', help='本地行情适配程序（每行输出一条 JSON K 线）')
+    parser.add_argument('--speed', type=float, default=0.0, help='回放速度倍数（0 为尽快回放）')
+    parser.add_argument('--universe', help='股票池文件（决定同分排序，默认按首次出现顺序）')
+    parser.add_argument('--seed-period', help='先下载日线历史初始化指标（如 1mo）')
+    args = parser.parse_args()
+
+    universe = []
+    if args.universe:
+        from marcus_report import load_universe
+        universe = list(load_universe(args.universe))
+    engine = StreamingEngine(universe)
+
+    bars = replay_file(args.replay, args.speed) if args.replay else live_feed(args.live_cmd)
+    if args.seed_period:
+        if args.replay:
+            # 回放文件先读一遍，得到股票列表与第一天的日期
+            bars = list(bars)
+            universe = universe or list(dict.fromkeys(bar['symbol'] for bar in bars))
+            first_day = str(bars[0]['time'])[:10] if bars else None
+        else:
+            from datetime import datetime
+            from zoneinfo import ZoneInfo
+            first_day = datetime.now(ZoneInfo('America/New_York')).strftime('%Y-%m-%d')
+        from marcus_report import fetch_price_panel
+        panel = fetch_price_panel(universe, period=args.seed_period)
+        if panel is not None:
+            engine.seed(panel, before=first_day)
+
+    start = time.perf_counter()
+    for bar in bars:
+        for event in engine.on_bar(bar):
+            print_event(event)
+    elapsed = time.perf_counter() - start
+    print(f"\n处理 {engine.ticks} 根 K 线，用时 {elapsed:.2f}s", file=sys.stderr)
+    for rank, stock in enumerate(engine.current_watchlist(), 1):
+        print(f"{rank}. {stock['symbol']} ${stock['price']:.2f} {stock['change']:+.1f}% "
+              f"量比 {stock['volume_ratio']:.1f}x 评分 {stock['score']}")
+
+
+if __name__ == '__main__':
+    main()
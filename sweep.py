@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+参数搜索 - 在历史日线上批量回测市场立场阈值与评分权重的不同组合
+
+- 网格搜索（全部组合）或随机抽样，候选值见 SEARCH_SPACE
+- 多进程并行（默认使用全部 CPU 核心）
+- 行情矩阵与不依赖参数的指标只计算一次，放进共享内存，子进程直接映射，不逐个 pickle
+- 按时间切分：前段为样本内，最后 --oos 比例的交易日为样本外，结果按样本外指标排序
+
+用法：
+    python3 sweep.py --period 10y
+    python3 sweep.py --search random --samples 500 --metric cagr
+    python3 sweep.py --synthetic 500 --years 10 --workers 4 --output sweep.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backtest import align_sessions, daily_indicators, daily_stance, run_backtest, summarize
+from scoring import MIN_SCORE, SCORE_PARAMS, STANCE_THRESHOLDS, panel_field
+
+# 各参数的候选值（第二个值为当前默认值）
+SEARCH_SPACE = {
+    'vix_low': [12.0, 15.0, 18.0],
+    'vix_high': [22.0, 25.0, 30.0],
+    'spy_up': [0.0, 0.5, 1.0],
+    'spy_down': [-0.5, -1.0, -2.0],
+    'big_move': [1.0, 2.0, 3.0],
+    'big_move_points': [1, 2, 3],
+    'volume_surge': [1.2, 1.5, 2.0],
+    'volume_points': [1, 2, 3],
+    'min_score': [3, 4],
+}
+# 排序指标 -> 越大越好为 True
+METRICS = {
+    'sharpe': True,
+    'cagr': True,
+    'total_return': True,
+    'hit_rate': True,
+    'avg_trade': True,
+    'max_drawdown': False,
+}
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+# 共享内存中各数组的起始位置按缓存行对齐
+ALIGN = 64
+
+
+def grid_candidates(space=None):
+    """网格搜索：全部参数组合"""
+    space = space or SEARCH_SPACE
+    for values in itertools.product(*space.values()):
+        yield dict(zip(space, values))
+
+
+def random_candidates(n, seed=0, space=None):
+    """随机搜索：不重复地抽取 n 组参数（不超过组合总数）"""
+    space = space or SEARCH_SPACE
+    total = np.prod([len(values) for values in space.values()])
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < min(n, total):
+        combo = tuple(rng.choice(values) for values in space.values())
+        if combo not in seen:
+            seen.add(combo)
+            yield dict(zip(space, combo))
+
+
+# ---------------------------------------------------------------------------
+# 共享内存
+# ---------------------------------------------------------------------------
+
+class SharedArrays:
+    """把一组 numpy 数组复制进同一块共享内存，子进程用 attach(spec) 按偏移量映射"""
+
+    def __init__(self, arrays):
+        """
+        Args:
+            arrays: {名称: numpy 数组}
+        """
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout[name] = (offset, array.shape, array.dtype.str)
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.spec = {'name': self.shm.name, 'layout': layout}
+        for name, view in _views(self.shm, layout).items():
+            view[...] = arrays[name]
+
+    def close(self):
+        """释放共享内存（只由创建它的主进程调用）"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(shm, layout, readonly=False):
+    views = {}
+    for name, (offset, shape, dtype) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        view.flags.writeable = not readonly
+        views[name] = view
+    return views
+
+
+def attach(spec):
+    """
+    在子进程中映射主进程创建的共享内存
+
+    Returns:
+        tuple: (SharedMemory, {名称: 只读数组})，SharedMemory 需保持引用直到不再使用数组
+    """
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    return shm, _views(shm, spec['layout'], readonly=True)
+
+
+# ---------------------------------------------------------------------------
+# 子进程
+# ---------------------------------------------------------------------------
+
+_WORKER = {}
+
+
+def init_worker(spec, split):
+    """进程池初始化：映射共享内存（每个子进程只执行一次）"""
+    _WORKER['shm'], _WORKER['data'] = attach(spec)
+    _WORKER['split'] = split
+
+
+def split_stats(result, start, end):
+    """第 start 到 end 个交易日（不含）的汇总指标；交易收益从第 1 天开始，需错开一行"""
+    trade_slice = slice(max(start - 1, 0), None if end is None else end - 1)
+    return summarize(result['trade_returns'][trade_slice],
+                     result['daily_returns'][start:end],
+                     result['stopped'][trade_slice])
+
+
+def evaluate(params, data=None, split=None):
+    """
+    回测一组参数
+
+    Args:
+        params: SEARCH_SPACE 中的一组取值（缺省的参数使用默认值）
+        data: 行情与指标数组（默认取子进程映射的共享内存）
+        split: 样本外起始的交易日序号
+
+    Returns:
+        dict: params / in_sample / out_of_sample
+    """
+    data = data if data is not None else _WORKER['data']
+    split = split if split is not None else _WORKER['split']
+    thresholds = {k: params[k] for k in STANCE_THRESHOLDS if k in params}
+    score_params = {k: params[k] for k in SCORE_PARAMS if k in params}
+    stance = daily_stance(data['vix'], data['spy'], thresholds) if 'vix' in data else None
+    indicators = {k: data[k] for k in ('change', 'ma5', 'ma20', 'volume_ratio')}
+    result = run_backtest(data['open'], data['high'], data['low'], data['close'], data['volume'],
+                          stance=stance, min_score=params.get('min_score', MIN_SCORE),
+                          score_params=score_params, indicators=indicators)
+    return {
+        'params': params,
+        'in_sample': split_stats(result, 0, split),
+        'out_of_sample': split_stats(result, split, None),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 主进程
+# ---------------------------------------------------------------------------
+
+def prepare_arrays(panel, vix=None, spy=None):
+    """
+    对齐交易日后取出回测用的矩阵，并预先计算与参数无关的指标
+
+    Returns:
+        tuple: ({名称: 数组}, 日期索引)
+    """
+    close = align_sessions(panel_field(panel, 'Close'))
+    arrays = {f.lower(): panel_field(panel, f).reindex_like(close).to_numpy(dtype=float)
+              for f in FIELDS}
+    arrays.update(daily_indicators(arrays['close'], arrays['volume']))
+    if vix is not None and spy is not None:
+        arrays['vix'] = vix.reindex(close.index).ffill().to_numpy(dtype=float)
+        arrays['spy'] = spy.reindex(close.index).ffill().to_numpy(dtype=float)
+    return arrays, close.index
+
+
+def split_index(n_days, oos):
+    """样本外起始的交易日序号（样本内、样本外都至少保留 1 天）"""
+    return min(max(int(round(n_days * (1 - oos))), 1), n_days - 1)
+
+
+def rank_results(results, metric='sharpe', min_trades=0):
+    """按样本外指标排序（样本外交易笔数不足 min_trades 的组合排除）"""
+    kept = [r for r in results if r['out_of_sample']['trades'] >= min_trades]
+    return sorted(kept, key=lambda r: r['out_of_sample'][metric], reverse=METRICS[metric])
+
+
+def run_sweep(arrays, candidates, oos=0.3, workers=None, chunksize=None):
+    """
+    并行回测全部候选参数
+
+    Args:
+        arrays: prepare_arrays 的结果
+        candidates: 参数字典列表
+        oos: 样本外占全部交易日的比例
+        workers: 进程数（默认 CPU 核心数）
+        chunksize: 每次派发给子进程的参数组数（默认按进程数自动计算）
+
+    Returns:
+        list: 每组参数的 evaluate 结果（与 candidates 顺序一致）
+    """
+    candidates = list(candidates)
+    split = split_index(len(arrays['close']), oos)
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(candidates) // (workers * 4))
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(shared.spec, split)) as pool:
+            return list(pool.map(evaluate, candidates, chunksize=chunksize))
+
+
+def format_params(params):
+    """只显示与默认值不同的参数"""
+    defaults = {**STANCE_THRESHOLDS, **SCORE_PARAMS, 'min_score': MIN_SCORE}
+    changed = [f"{k}={v:g}" for k, v in params.items() if defaults.get(k) != v]
+    return ' '.join(changed) or '（默认参数）'
+
+
+def print_ranking(ranked, metric, top):
+    """打印排名前 top 的参数组合"""
+    print(f"{'#':>3} {'样本外' + metric:>12} {'样本内' + metric:>12} {'样本外年化':>10} "
+          f"{'回撤':>7} {'交易':>6}  参数")
+    for i, r in enumerate(ranked[:top], 1):
+        ins, oos = r['in_sample'], r['out_of_sample']
+        print(f"{i:>3} {oos[metric]:>15.3f} {ins[metric]:>15.3f} {oos['cagr']:>+14.1%} "
+              f"{oos['max_drawdown']:>9.1%} {oos['trades']:>8}  {format_params(r['params'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Marcus 策略参数搜索')
+    parser.add_argument('--period', default='10y', help='历史区间（yfinance 格式）')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='使用 N 支随机游走股票（含合成的 ^VIX / SPY）')
+    parser.add_argument('--years', type=int, default=10, help='随机数据的年数')
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid', help='网格或随机搜索')
+    parser.add_argument('--samples', type=int, default=200, help='随机搜索的参数组数')
+    parser.add_argument('--seed', type=int, default=0, help='随机搜索的种子')
+    parser.add_argument('--oos', type=float, default=0.3, help='样本外交易日比例')
+    parser.add_argument('--metric', choices=list(METRICS), default='sharpe', help='排序指标（样本外）')
+    parser.add_argument('--min-trades', type=int, default=30, help='样本外最少交易笔数')
+    parser.add_argument('--workers', type=int, help='进程数（默认 CPU 核心数）')
+    parser.add_argument('--top', type=int, default=10, help='显示前 N 组')
+    parser.add_argument('--output', help='把全部结果（已排序）写入 JSON 文件')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from synthetic_data import SyntheticMarket
+        market = SyntheticMarket(n_days=args.years * 252, end='2026-02-27')
+        panel = market.panel(market.universe(args.synthetic))
+        index = market.panel(['^VIX', 'SPY'])
+    else:
+        from marcus_report import MOMENTUM_STOCKS, fetch_price_panel
+        panel = fetch_price_panel(MOMENTUM_STOCKS, period=args.period)
+        index = fetch_price_panel(['^VIX', 'SPY'], period=args.period)
+        if panel is None or index is None or not {'^VIX', 'SPY'} <= set(index.columns.get_level_values(0)):
+            print("❌ 行情下载失败，无法搜索参数（请检查网络或稍后重试）")
+            sys.exit(1)
+    arrays, dates = prepare_arrays(panel, index['^VIX']['Close'], index['SPY']['Close'])
+
+    if args.search == 'grid':
+        candidates = list(grid_candidates())
+    else:
+        candidates = list(random_candidates(args.samples, args.seed))
+    workers = args.workers or os.cpu_count() or 1
+    print(f"🔍 {len(candidates)} 组参数，{workers} 个进程，"
+          f"{len(dates)} 个交易日 × {arrays['close'].shape[1]} 支股票")
+
+    start = time.perf_counter()
+    results = run_sweep(arrays, candidates, oos=args.oos, workers=workers)
+    elapsed = time.perf_counter() - start
+    ranked = rank_results(results, args.metric, args.min_trades)
+    split = dates[split_index(len(dates), args.oos)]
+    print(f"⏱️  耗时 {elapsed:.1f}s（{elapsed / len(candidates) * 1000:.0f} ms/组），"
+          f"样本外从 {split:%Y-%m-%d} 开始\n")
+
+    if not ranked:
+        print(f"⚠️  没有样本外交易笔数 >= {args.min_trades} 的参数组合")
+        return
+    print_ranking(ranked, args.metric, args.top)
+    best = ranked[0]['params']
+    print("\n🏆 最优参数：")
+    print(f"   STANCE_THRESHOLDS = {json.dumps({k: best[k] for k in STANCE_THRESHOLDS})}")
+    print(f"   SCORE_PARAMS 覆盖 = {json.dumps({k: best[k] for k in SCORE_PARAMS if k in best})}")
+    print(f"   MIN_SCORE = {best['min_score']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(ranked, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+离线合成数据源 - 生成确定性的行情与新闻，用于基准测试与回测测速
+同一股票代码在任何批次组合下都得到相同的数据
+"""
+
+import zlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import trading_calendar
+from price_cache import slice_period
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+NEWS_TEMPLATES = [
+    "Stock futures {dir} ahead of the open as VIX {vix:.2f}; S&P 500 futures {spx:+.1f}%, Nasdaq futures {ndx:+.1f}%",
+    "{sym} shares {dir} premarket to ${price:.2f} on volume of {vol:.1f}M after analyst update",
+    "Treasury yields steady as traders await economic data; volatility index {vix:.1f}",
+    "{sym} extends rally, up {chg:+.1f}% premarket; sector peers mixed",
+    "Markets in focus: Fed speakers, earnings from {sym} and peers",
+]
+
+
+class SyntheticMarket:
+    """确定性的随机游走行情与新闻生成器"""
+
+    def __init__(self, seed=0, n_days=300, end=None, gap_ratio=0.0):
+        """
+        初始化合成数据源
+
+        Args:
+            seed: 随机种子
+            n_days: 每支股票生成的交易日数量
+            end: 最后一个交易日（默认今天或之前最近的交易日，日期按真实交易日历排列）
+            gap_ratio: 上市较晚（前段缺失数据）的股票比例
+        """
+        self.seed = seed
+        self.gap_ratio = gap_ratio
+        end = pd.Timestamp(end or date.today())
+        try:
+            self.index = pd.DatetimeIndex(trading_calendar.sessions_ending(end.date(), n_days), dtype='datetime64[ns]')
+        except ValueError:
+            # 超出交易日历范围时按工作日排列
+            self.index = pd.bdate_range(end=end, periods=n_days)
+
+    def universe(self, n):
+        """生成 n 个股票代码"""
+        return [f'S{i:04d}' for i in range(n)]
+
+    def _rng(self, key):
+        return np.random.default_rng([self.seed, zlib.crc32(key.encode('utf-8'))])
+
+    def bars(self, symbols):
+        """生成 (字段, 日期 × 股票) 矩阵字典"""
+        n_days = len(self.index)
+        data = {f: np.empty((n_days, len(symbols))) for f in FIELDS}
+        for j, symbol in enumerate(symbols):
+            rng = self._rng(symbol)
+            noise = rng.standard_normal((5, n_days))
+            base = 15 if symbol == '^VIX' else 20 + 480 * rng.random()
+            close = base * np.exp(np.cumsum(0.0003 + 0.02 * noise[0]))
+            open_ = close * np.exp(0.005 * noise[1])
+            data['Close'][:, j] = close
+            data['Open'][:, j] = open_
+            data['High'][:, j] = np.maximum(open_, close) * (1 + np.abs(0.01 * noise[2]))
+            data['Low'][:, j] = np.minimum(open_, close) * (1 - np.abs(0.01 * noise[3]))
+            data['Volume'][:, j] = np.exp(15 + 0.5 * noise[4])
+            if rng.random() < self.gap_ratio:
+                missing = rng.integers(1, n_days - 5)
+                for f in FIELDS:
+                    data[f][:missing, j] = np.nan
+        return data
+
+    def panel(self, symbols):
+        """完整历史的 (股票代码, 字段) 面板"""
+        symbols = list(dict.fromkeys(symbols))
+        data = self.bars(symbols)
+        values = np.stack([data[f] for f in FIELDS], axis=2).reshape(len(self.index), -1)
+        columns = pd.MultiIndex.from_product([symbols, FIELDS])
+        return pd.DataFrame(values, index=self.index, columns=columns)
+
+    def fetch_price_panel(self, symbols, period='1mo', batch_size=None, start=None):
+        """与 marcus_report.fetch_price_panel 签名一致的下载函数"""
+        panel = self.panel(symbols)
+        if start:
+            return panel[panel.index >= pd.Timestamp(start)]
+        return slice_period(panel, period, today=self.index[-1])
+
+    def minute_bars(self, symbols, minutes=390):
+        """
+        生成下一个交易日的分钟线（按时间排序，每分钟依次给出所有股票）
+
+        以历史最后一天的收盘价为起点随机游走，全天成交量与日线成交量同一量级
+        """
+        day = trading_calendar.next_trading_day(self.index[-1]).isoformat()
+        last_close = self.bars(symbols)['Close'][-1]
+        rng = self._rng(f'minute|{day}|{len(symbols)}')
+        drift = rng.normal(0, 0.02, len(symbols)) / minutes
+        steps = drift + 0.001 * rng.standard_normal((minutes, len(symbols)))
+        close = np.where(np.isnan(last_close), 50.0, last_close) * np.exp(np.cumsum(steps, axis=0))
+        volume = np.exp(15 + 0.5 * rng.standard_normal(len(symbols))) / minutes
+        volume = volume * rng.uniform(0.2, 1.8, (minutes, len(symbols)))
+        for m in range(minutes):
+            stamp = f"{day} {9 + (30 + m) // 60:02d}:{(30 + m) % 60:02d}"
+            for j, symbol in enumerate(symbols):
+                yield {'time': stamp, 'symbol': symbol,
+                       'close': float(close[m, j]), 'volume': float(volume[m, j])}
+
+    def search(self, query, count=5):
+        """根据查询生成确定性的新闻搜索结果文本"""
+        rng = self._rng(f'{query}|{count}')
+        symbol = query.split()[0].upper()
+        lines = []
+        for i in range(count):
+            template = NEWS_TEMPLATES[i % len(NEWS_TEMPLATES)]
+            lines.append(f"{i + 1}. " + template.format(
+                dir='rise' if rng.random() > 0.5 else 'slip',
+                vix=12 + 20 * rng.random(),
+                spx=rng.normal(0, 0.8),
+                ndx=rng.normal(0, 1.0),
+                sym=symbol,
+                price=20 + 480 * rng.random(),
+                vol=rng.random() * 20,
+                chg=rng.normal(0, 3),
+            ))
+        return '\n'.join(lines) + '\n'
+
+
+def make_panel(n_symbols, n_days, seed=0, gap_ratio=0.0):
+    """快捷函数：生成 n_symbols 支股票、n_days 个交易日的面板"""
+    market = SyntheticMarket(seed=seed, n_days=n_days, end='2026-02-27', gap_ratio=gap_ratio)
+    return market.panel(market.universe(n_symbols))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+并发抓取的回归测试：结果顺序、超时放弃、被放弃的请求不阻止进程退出、批量下载缺失的股票逐支重试
+
+    python3 -m pytest test_concurrent_fetch.py
+"""
+
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import marcus_report
+from concurrent_fetch import fetch_all
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def test_results_keep_input_order_and_errors_become_none():
+    assert fetch_all(lambda x: 1 / x, [1, 0, 2, 4], rate=None) == [1.0, None, 0.5, 0.25]
+
+
+def test_timed_out_requests_are_abandoned():
+    started = time.monotonic()
+    results = fetch_all(lambda x: time.sleep(30) if x == 1 else x, range(4),
+                        max_workers=2, rate=None, timeout=0.3)
+    assert results == [0, None, 2, 3]
+    assert time.monotonic() - started < 5
+
+
+def test_abandoned_requests_do_not_block_exit():
+    script = ("import time\n"
+              "from concurrent_fetch import fetch_all\n"
+              "print(fetch_all(lambda x: time.sleep(60), [1, 2], rate=None, timeout=0.2))\n")
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=30)
+    assert result.stdout.strip() == '[None, None]'
+    assert time.monotonic() - started < 20
+
+
+def test_missing_batch_symbols_are_fetched_individually(monkeypatch):
+    import yfinance as yf
+    calls = []
+
+    def download(batch, period=None, start=None, **kwargs):
+        batch = list(batch)
+        calls.append(batch)
+        if len(batch) > 1 and 'FLAKY' in batch:
+            raise ConnectionError('batch failed')
+        columns = pd.MultiIndex.from_product([batch, FIELDS])
+        data = pd.DataFrame(1.0, index=pd.date_range('2026-03-02', periods=3), columns=columns)
+        if 'DEAD' in batch:
+            data.loc[:, ('DEAD', slice(None))] = np.nan   # 批量请求中失败的股票整列为空
+        return data
+
+    monkeypatch.setattr(yf, 'download', download)
+    panel = marcus_report.fetch_price_panel(['A', 'DEAD', 'B', 'FLAKY'], batch_size=2)
+    assert sorted(set(panel.columns.get_level_values(0))) == ['A', 'B', 'FLAKY']
+    assert sorted(calls[2:]) == [['B'], ['DEAD'], ['FLAKY']]
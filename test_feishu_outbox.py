@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+飞书发送队列的回归测试：幂等键、租约、同群顺序、指数退避与发送结果分类
+
+    python3 -m pytest test_feishu_outbox.py
+"""
+
+import time
+
+import pytest
+
+import feishu_outbox
+from feishu_outbox import (FeishuOutbox, OutboxDrainer, backoff_delay, deliver, message_key)
+
+HOOK_A = 'https://open.feishu.cn/open-apis/bot/v2/hook/a'
+HOOK_B = 'https://open.feishu.cn/open-apis/bot/v2/hook/b'
+
+
+class FakePool:
+    """按顺序返回预设响应的连接池，记录发送过的请求体"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def post(self, url, body, **kwargs):
+        self.sent.append((url, body))
+        response = self.responses.pop(0) if self.responses else (200, 'OK', b'{"code": 0}')
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = FeishuOutbox(str(tmp_path / 'outbox.sqlite'))
+    yield box
+    box.close()
+
+
+def test_enqueue_is_idempotent_by_key(outbox):
+    assert outbox.enqueue(HOOK_A, b'report', key='marcus:2026-03-02')
+    assert not outbox.enqueue(HOOK_A, b'changed body', key='marcus:2026-03-02')
+    assert outbox.enqueue(HOOK_A, b'report', key='marcus:2026-03-03')
+    assert outbox.counts() == {'pending': 2}
+
+
+def test_default_key_is_webhook_plus_body(outbox):
+    assert outbox.enqueue(HOOK_A, b'same')
+    assert not outbox.enqueue(HOOK_A, b'same')
+    assert outbox.enqueue(HOOK_B, b'same')
+    assert message_key(HOOK_A, b'same') != message_key(HOOK_B, b'same')
+
+
+def test_claim_leases_messages_until_expiry(outbox):
+    outbox.enqueue(HOOK_A, b'1')
+    now = time.time()
+    first = outbox.claim(now=now + 1)
+    assert [row[2] for row in first] == [b'1']
+    # 已被占用的消息在租约期内不会被其他发送进程取出
+    assert outbox.claim(now=now + 2) == []
+    # 发送进程崩溃、租约过期后重新可发
+    again = outbox.claim(now=now + 2 + feishu_outbox.LEASE_SECONDS)
+    assert [row[0] for row in again] == [first[0][0]]
+
+
+def test_claim_keeps_per_webhook_order(outbox):
+    for body in (b'a1', b'a2'):
+        outbox.enqueue(HOOK_A, body)
+    outbox.enqueue(HOOK_B, b'b1')
+    rows = outbox.claim()
+    assert [row[2] for row in rows] == [b'a1', b'a2', b'b1']
+
+    # a1 推迟重试后，同群的 a2 不能越过它先发；其他群不受影响
+    outbox.retry_later(rows[0][0], 'HTTP 错误：500', delay=60)
+    outbox.retry_later(rows[1][0], '等待前一条消息发送', delay=60, count_attempt=False)
+    outbox.retry_later(rows[2][0], 'HTTP 错误：500', delay=0)
+    assert [row[2] for row in outbox.claim()] == [b'b1']
+
+
+@pytest.mark.parametrize('attempts', range(1, 12))
+def test_backoff_delay_doubles_with_jitter_and_cap(attempts):
+    nominal = min(feishu_outbox.BACKOFF_CAP, feishu_outbox.BACKOFF_BASE * 2 ** (attempts - 1))
+    for _ in range(20):
+        delay = backoff_delay(attempts)
+        assert nominal * 0.5 <= delay <= nominal
+    assert backoff_delay(attempts) <= feishu_outbox.BACKOFF_CAP
+
+
+@pytest.mark.parametrize('response, outcome', [
+    ((200, 'OK', b'{"code": 0}'), 'sent'),
+    ((200, 'OK', b'{"StatusCode": 0}'), 'sent'),
+    ((200, 'OK', b'{"code": 9499}'), 'retry'),
+    ((429, 'Too Many Requests', b''), 'retry'),
+    ((502, 'Bad Gateway', b''), 'retry'),
+    ((200, 'OK', b'not json'), 'retry'),
+    (ConnectionResetError('reset'), 'retry'),
+    ((400, 'Bad Request', b''), 'fail'),
+    ((200, 'OK', b'{"code": 19001}'), 'fail'),
+])
+def test_deliver_classifies_responses(response, outcome):
+    assert deliver(HOOK_A, b'{}', FakePool(response))[0] == outcome
+
+
+def test_drainer_retries_then_sends_in_order(outbox, monkeypatch):
+    monkeypatch.setattr(feishu_outbox, 'backoff_delay', lambda attempts: 0.0)
+    outbox.enqueue(HOOK_A, b'first')
+    outbox.enqueue(HOOK_A, b'second')
+    pool = FakePool((503, 'Service Unavailable', b''))
+    drainer = OutboxDrainer(outbox, pool=pool, rate=1000, burst=1000)
+
+    assert drainer.run(timeout=5) == 0
+    assert [body for _, body in pool.sent] == [b'first', b'first', b'second']
+    assert outbox.counts() == {'sent': 2}
+    # 排在失败消息之后的消息只是顺延，不计入失败次数
+    attempts = dict(outbox.conn.execute("SELECT body, attempts FROM messages"))
+    assert attempts == {b'first': 2, b'second': 1}
+
+
+def test_drainer_gives_up_after_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(feishu_outbox, 'backoff_delay', lambda attempts: 0.0)
+    outbox.enqueue(HOOK_A, b'doomed')
+    pool = FakePool(*[(500, 'Internal Server Error', b'')] * 3)
+    drainer = OutboxDrainer(outbox, pool=pool, max_attempts=3, rate=1000, burst=1000)
+
+    drainer.run(timeout=5)
+    assert len(pool.sent) == 3
+    assert outbox.counts() == {'failed': 1}
+    assert outbox.failures()[0][2] == 3
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+技术指标的回归测试：批量计算与增量计算逐根 K 线一致（含缺失值、修改最后一根 K 线），
+观察名单附带的指标在整批评分与逐支分析中一致
+
+    python3 -m pytest test_indicators.py
+"""
+
+import numpy as np
+import pytest
+
+import indicators as ta
+from synthetic_data import make_panel
+
+N_DAYS = 80
+
+
+@pytest.fixture(scope='module')
+def bars():
+    """随机游走的最高价 / 最低价 / 收盘价（第一列前 10 天缺失，模拟上市较晚）"""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (N_DAYS, 3)), axis=0))
+    high = close * (1 + rng.uniform(0, 0.02, close.shape))
+    low = close * (1 - rng.uniform(0, 0.02, close.shape))
+    for m in (high, low, close):
+        m[:10, 0] = np.nan
+    return high, low, close
+
+
+def replay(make, bars, column, feed):
+    """逐根 K 线喂给增量指标（跳过缺失值），返回每天的 value（缺失日为 NaN）"""
+    high, low, close = (m[:, column] for m in bars)
+    indicator = make()
+    out = np.full(N_DAYS, np.nan)
+    for t in range(N_DAYS):
+        if np.isnan(close[t]):
+            continue
+        value = feed(indicator, high[t], low[t], close[t])
+        out[t] = np.nan if value is None else value
+    return out
+
+
+def assert_close(batch, incremental):
+    np.testing.assert_allclose(incremental, batch, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('column', range(3))
+def test_rsi(bars, column):
+    out = replay(ta.RSI, bars, column, lambda i, h, l, c: i.update(c))
+    assert_close(ta.rsi(bars[2])[:, column], out)
+
+
+@pytest.mark.parametrize('column', range(3))
+def test_atr(bars, column):
+    out = replay(ta.ATR, bars, column, lambda i, h, l, c: i.update(h, l, c))
+    assert_close(ta.atr(*bars)[:, column], out)
+
+
+@pytest.mark.parametrize('column', range(3))
+def test_ema(bars, column):
+    out = replay(ta.EMA, bars, column, lambda i, h, l, c: i.update(c))
+    assert_close(ta.ema(bars[2])[:, column], out)
+
+
+@pytest.mark.parametrize('column', range(1, 3))
+def test_bollinger(bars, column):
+    # 布林带窗口内有缺失值时批量结果为 NaN，只比较没有缺失值的列
+    batch = ta.bollinger(bars[2])
+    for band in range(3):
+        out = replay(ta.Bollinger, bars, column,
+                     lambda i, h, l, c: None if i.update(c) is None else i.value[band])
+        assert_close(batch[band][:, column], out)
+
+
+@pytest.mark.parametrize('column', range(1, 3))
+def test_rolling_high(bars, column):
+    out = replay(ta.RollingHigh, bars, column, lambda i, h, l, c: i.update(h))
+    assert_close(ta.rolling_high(bars[0], include_current=True)[:, column], out)
+
+
+def test_replacing_last_bar_matches_final_bar(bars):
+    """盘中反复修改最后一根 K 线，结果与直接用收盘后的 K 线相同"""
+    high, low, close = (m[:, 1] for m in bars)
+    rsi, atr, ema = ta.RSI(), ta.ATR(), ta.EMA()
+    bollinger, rolling_high = ta.Bollinger(), ta.RollingHigh()
+    for t in range(N_DAYS):
+        # 先用开盘附近的价格建立当天的 K 线，再修改为收盘后的值
+        first = close[t] * 0.99
+        for new_bar, (h, l, c) in ((True, (first, first, first)), (False, (high[t], low[t], close[t]))):
+            rsi.update(c, new_bar)
+            atr.update(h, l, c, new_bar)
+            ema.update(c, new_bar)
+            bollinger.update(c, new_bar)
+            rolling_high.update(h, new_bar)
+    assert rsi.value == pytest.approx(ta.rsi(close)[-1, 0])
+    assert atr.value == pytest.approx(ta.atr(high, low, close)[-1, 0])
+    assert ema.value == pytest.approx(ta.ema(close)[-1, 0])
+    assert bollinger.value[1] == pytest.approx(ta.bollinger(close)[1][-1, 0])
+    assert rolling_high.value == pytest.approx(ta.rolling_high(high, include_current=True)[-1, 0])
+
+
+def test_rolling_window_mean():
+    window = ta.RollingWindow(5)
+    values = np.random.default_rng(1).normal(100, 5, 3000)
+    for value in values:
+        window.push(value)
+    window.replace_last(1.0)
+    assert window.mean() == pytest.approx((values[-5:-1].sum() + 1.0) / 5)
+
+
+def test_watchlist_indicators_match_per_symbol():
+    from marcus_report import WATCHLIST_INDICATORS, analyze_stock
+    from scoring import score_panel
+
+    panel = make_panel(30, 60, gap_ratio=0.2)
+    scores = score_panel(panel, indicators=WATCHLIST_INDICATORS)
+    for symbol in scores.index:
+        single = analyze_stock(symbol, panel, indicators=WATCHLIST_INDICATORS)
+        assert np.isclose(single['rsi'], scores.loc[symbol, 'rsi'], equal_nan=True), symbol
+        assert bool(single['breakout']) == bool(scores.loc[symbol, 'breakout']), symbol
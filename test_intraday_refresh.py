@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+盘中增量刷新的回归测试：输入不变不推送、只推送变化的章节、重启后沿用当天状态与幂等键
+
+    python3 -m pytest test_intraday_refresh.py
+"""
+
+from datetime import datetime
+
+import pytest
+
+import marcus_enhanced
+from intraday_refresh import NEW_YORK, SECTION_TITLES, IntradayRefresher
+
+
+class FakeFeed:
+    """可修改的搜索结果，记录推送的 (文本, 幂等键)"""
+
+    def __init__(self):
+        self.market = "VIX 18.2. S&P 500 futures +0.4%"
+        self.stocks = {symbol: f"{symbol} stock $100.00 up 1.0% premarket volume 2M"
+                       for symbol in marcus_enhanced.WATCHLIST_SYMBOLS}
+        self.pushed = []
+
+    def fetch(self, symbols):
+        return self.market, dict(self.stocks)
+
+    def notify(self, text, key):
+        self.pushed.append((text, key))
+
+    def refresher(self, state_path=None):
+        return IntradayRefresher(fetch=self.fetch, notify=self.notify, state_path=state_path)
+
+
+@pytest.fixture
+def feed():
+    return FakeFeed()
+
+
+@pytest.fixture
+def now():
+    # 状态文件按当天的纽约日期读取，测试时间取当前时间
+    return datetime.now(NEW_YORK)
+
+
+def test_first_refresh_only_sets_baseline(feed, now):
+    refresher = feed.refresher()
+    assert set(refresher.refresh(now)) >= set(SECTION_TITLES)
+    assert feed.pushed == []
+
+
+def test_unchanged_inputs_push_nothing(feed, now):
+    refresher = feed.refresher()
+    refresher.refresh(now)
+    assert refresher.refresh(now) == []
+    assert refresher.refresh(now) == []
+    assert feed.pushed == [] and refresher.pushes == 0
+
+
+def test_pushes_only_changed_sections(feed, now):
+    refresher = feed.refresher()
+    refresher.refresh(now)
+    feed.market = "VIX 31.0. S&P 500 futures -2.0%"
+    changed = [name for name in refresher.refresh(now) if name in SECTION_TITLES]
+
+    assert 'stance' in changed and 'watchlist' not in changed
+    assert len(feed.pushed) == 1
+    text, key = feed.pushed[0]
+    titles = text.split('**更新内容：** ')[1].split('\n')[0]
+    assert titles == '、'.join(SECTION_TITLES[name] for name in changed)
+    for name in set(SECTION_TITLES) - set(changed):
+        assert refresher.renderer.section_text(name) not in text
+    assert key.startswith(f"marcus_intraday:{now.strftime('%Y-%m-%d %H:%M')}:")
+
+
+def test_restart_reuses_state_and_key(feed, now, tmp_path):
+    state_path = str(tmp_path / 'intraday_state.json')
+    feed.refresher(state_path).refresh(now)
+
+    # 推送后、保存状态前进程退出：重启后重新推送同一条更新，幂等键相同，发送队列会去重
+    crashing = FakeFeed()
+    crashing.market = feed.market = "VIX 31.0. S&P 500 futures -2.0%"
+
+    def notify_then_crash(text, key):
+        crashing.pushed.append((text, key))
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        IntradayRefresher(fetch=feed.fetch, notify=notify_then_crash, state_path=state_path).refresh(now)
+    restarted = feed.refresher(state_path)
+    restarted.refresh(now)
+    assert [key for _, key in feed.pushed] == [key for _, key in crashing.pushed]
+
+    # 状态已保存后再次重启：输入没有变化，不再推送
+    feed.refresher(state_path).refresh(now)
+    assert len(feed.pushed) == 1
+
+
+def test_state_from_another_day_is_ignored(feed, now, tmp_path):
+    state_path = str(tmp_path / 'intraday_state.json')
+    refresher = feed.refresher(state_path)
+    refresher.save_state('2000-01-03')
+    assert feed.refresher(state_path).report is None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+行情数据访问层的回归测试：并发请求合并（同一股票只下载一次）、较窄区间直接截取、
+只保留常驻股票、下载失败与无数据股票的重试
+
+    python3 -m pytest test_market_data.py
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from market_data import MarketData
+from synthetic_data import SyntheticMarket
+
+
+class Source:
+    """记录请求的数据源；gate 未打开时下载阻塞，模拟进行中的请求"""
+
+    def __init__(self, market):
+        self.market = market
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = False
+
+    def get_panel(self, symbols, period):
+        self.calls.append((tuple(symbols), period))
+        self.gate.wait(10)
+        if self.fail:
+            raise ConnectionError('download failed')
+        symbols = [s for s in symbols if s != 'MISSING']
+        return self.market.fetch_price_panel(symbols, period) if symbols else None
+
+
+@pytest.fixture
+def source():
+    # 使用默认的结束日期：MarketData 按今天截取区间
+    return Source(SyntheticMarket(seed=4, n_days=300))
+
+
+def test_concurrent_requests_are_coalesced(source):
+    data = MarketData(source)
+    symbols = source.market.universe(11)
+    source.gate.clear()
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(data.histories, symbols[i % 4:i % 4 + 8]) for i in range(16)]
+        # 第一次下载阻塞期间，其他线程的请求等待进行中的结果
+        time.sleep(0.2)
+        source.gate.set()
+        results = [future.result() for future in futures]
+    assert data.fetch_counts == {symbol: 1 for symbol in symbols}
+    assert sum(len(batch) for batch, _ in source.calls) == len(symbols)
+    for i, result in enumerate(results):
+        assert list(result) == symbols[i % 4:i % 4 + 8]
+    assert data._inflight == {}
+
+
+def test_narrower_periods_are_sliced(source):
+    data = MarketData(source)
+    wide = data.history('S0000', '6mo')
+    assert data.history('S0000', '1mo').index[-1] == wide.index[-1]
+    assert len(data.history('S0000', '5d')) < len(data.history('S0000', '1mo')) < len(wide)
+    assert source.calls == [(('S0000',), '6mo')]
+
+    # 较窄的请求按 min_period 下载，之后不超过该区间的请求不再下载
+    data.history('S0001', '5d')
+    data.history('S0001', '1mo')
+    assert source.calls[1:] == [(('S0001',), '1mo')]
+    data.history('S0001', '3mo')
+    assert source.calls[2:] == [(('S0001',), '3mo')]
+
+    panel = data.panel(['S0001', 'S0000'], '1mo')
+    assert list(dict.fromkeys(panel.columns.get_level_values(0))) == ['S0001', 'S0000']
+    assert panel.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(panel['S0000'], data.history('S0000', '1mo'), check_freq=False)
+
+
+def test_only_resident_symbols_are_kept(source):
+    data = MarketData(source, resident=['^VIX'])
+    for _ in range(2):
+        data.histories(['^VIX', 'S0000'])
+    assert data.fetch_counts == {'^VIX': 1, 'S0000': 2}
+    assert list(data._frames) == ['^VIX']
+
+
+def test_failures_and_missing_symbols_are_retried(source):
+    data = MarketData(source)
+    source.fail = True
+    with pytest.raises(ConnectionError):
+        data.history('S0000')
+    assert data._inflight == {}
+    source.fail = False
+    assert data.history('S0000') is not None
+
+    assert data.histories(['MISSING', 'S0000']).keys() == {'S0000'}
+    assert data.panel(['MISSING']) is None
+    assert data.fetch_counts['MISSING'] == 2
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+报告分段的回归测试：每段不超过字节上限、优先按章节拆分、表格重复表头、多字节字符不被截断
+
+    python3 -m pytest test_message_split.py
+"""
+
+import json
+
+import pytest
+
+from feishu_notifier import FEISHU_MAX_BYTES, FeishuNotifier
+from message_split import split_markdown
+
+
+def utf8_cost(line):
+    return len(line.encode('utf-8')) + 1
+
+
+def chunk_cost(lines, cost=utf8_cost):
+    return sum(cost(line) for line in lines)
+
+
+def report(sections=6, rows=8):
+    """若干章节的中文报告，每章带一张表格"""
+    parts = ["# 📈 每日动量报告 | 2026-03-02", ""]
+    for s in range(sections):
+        parts += [f"## {s + 1}️⃣ 第 {s + 1} 章", "", "说明文字：市场震荡，注意仓位控制。", "",
+                  "| 股票代码 | 当前价 | 日涨跌 |", "|---------|-------|-------|"]
+        parts += [f"| S{s}{r:03d} | ${100 + r:.2f} | +{r / 10:.1f}% |" for r in range(rows)]
+        parts.append("")
+    return '\n'.join(parts)
+
+
+@pytest.mark.parametrize('budget', [200, 400, 1000, 5000])
+def test_chunks_fit_budget_and_keep_content(budget):
+    text = report()
+    chunks = split_markdown(text, budget)
+    assert all(chunk_cost(chunk) <= budget for chunk in chunks)
+    # 除了被拆分的表格重复表头以外，内容按原顺序完整保留
+    header = {"| 股票代码 | 当前价 | 日涨跌 |", "|---------|-------|-------|"}
+    kept = [line for chunk in chunks for line in chunk if line.strip() and line not in header]
+    original = [line for line in text.split('\n') if line.strip() and line not in header]
+    assert kept == original
+
+
+def test_small_report_is_one_chunk():
+    text = report(sections=2, rows=2)
+    assert split_markdown(text, 10_000) == [text.strip().split('\n')]
+
+
+def test_splits_on_section_boundaries_when_sections_fit():
+    text = report(sections=4, rows=3)
+    section = chunk_cost(report(sections=1, rows=3).split('\n')[2:])
+    chunks = split_markdown(text, int(section * 1.5))
+    assert len(chunks) > 1
+    for chunk in chunks[1:]:
+        assert chunk[0].startswith('## ')
+
+
+def test_oversized_table_repeats_header():
+    text = report(sections=1, rows=200)
+    chunks = split_markdown(text, 1000)
+    table_chunks = [chunk for chunk in chunks if any(line.startswith('| S0') for line in chunk)]
+    assert len(table_chunks) > 1
+    for chunk in table_chunks:
+        first_row = next(i for i, line in enumerate(chunk) if line.startswith('|'))
+        assert chunk[first_row] == "| 股票代码 | 当前价 | 日涨跌 |"
+        assert chunk[first_row + 1].startswith('|---')
+
+
+def test_long_multibyte_line_is_split_on_character_boundaries():
+    line = '波动率偏高，注意仓位控制。' * 200
+    chunks = split_markdown(line, 301)
+    assert all(chunk_cost(chunk) <= 301 for chunk in chunks)
+    assert ''.join(piece for chunk in chunks for piece in chunk) == line
+
+
+class CapturePool:
+    """记录请求体而不发送的连接池"""
+
+    def __init__(self):
+        self.bodies = []
+
+    def post(self, url, body, **kwargs):
+        self.bodies.append(body)
+        return 200, 'OK', b'{"code": 0}'
+
+    def fan_out(self, urls, body, send, max_workers=None):
+        return [send(url, body) for url in urls]
+
+
+def test_notifier_posts_stay_under_feishu_limit():
+    pool = CapturePool()
+    notifier = FeishuNotifier('https://open.feishu.cn/open-apis/bot/v2/hook/x', pool=pool)
+    result = notifier.send_markdown('Marcus 每日动量报告', report(sections=40, rows=60))
+    assert result['success'] and result['parts'] == len(pool.bodies) > 1
+    assert all(len(body) <= FEISHU_MAX_BYTES for body in pool.bodies)
+    titles = [json.loads(body)['content']['post']['zh_cn']['title'] for body in pool.bodies]
+    assert titles[-1].endswith(f"({len(titles)}/{len(titles)})")
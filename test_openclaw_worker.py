@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+常驻 OpenClaw 会话的回归测试：乱序响应按 id 对应、超时请求注销、进程退出后自动重启、
+未配置启动命令时不可用
+
+    python3 -m pytest test_openclaw_worker.py
+"""
+
+import sys
+import textwrap
+import time
+
+import pytest
+
+from openclaw_worker import OpenClawWorker, WorkerCrashed, WorkerUnavailable
+
+# 实现了逐行 JSON 协议的假工作进程：sleep 命令延迟响应（其他请求先返回），crash 命令退出进程
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, sys, threading, time
+
+    lock = threading.Lock()
+
+    def reply(message, delay):
+        time.sleep(delay)
+        with lock:
+            sys.stdout.write(json.dumps(message) + '\\n')
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        command, args = request['command'], request['args']
+        if command == 'crash':
+            os._exit(1)
+        if command == 'fail':
+            message = {'id': request['id'], 'stdout': '', 'error': 'search failed'}
+        else:
+            message = {'id': request['id'], 'stdout': ' '.join(args), 'error': None}
+        delay = float(args[0]) if command == 'sleep' else 0.0
+        threading.Thread(target=reply, args=(message, delay), daemon=True).start()
+""")
+
+
+@pytest.fixture
+def worker():
+    worker = OpenClawWorker([sys.executable, '-c', FAKE_WORKER])
+    yield worker
+    worker.close()
+
+
+def test_out_of_order_responses_match_requests(worker):
+    slow = worker.submit('sleep', ['0.3', 'slow'])
+    fast = worker.submit('web_search', ['--query', 'fast'])
+    assert fast.result(timeout=10) == '--query fast'
+    assert not slow.done()
+    assert slow.result(timeout=10) == '0.3 slow'
+    assert worker.pending == {}
+
+
+def test_errors_and_timeouts(worker):
+    assert worker.run('fail', [], timeout=10) == 'Error: search failed'
+    assert worker.run('sleep', ['5'], timeout=0.2).startswith('Error: 命令超时')
+    # 超时的请求已注销，迟到的响应会被丢弃
+    assert worker.pending == {}
+    assert worker.run('web_search', ['ok'], timeout=10) == 'ok'
+
+
+def test_restarts_after_crash(worker):
+    pending = worker.submit('sleep', ['5'])
+    worker.submit('crash', [])
+    with pytest.raises(WorkerCrashed):
+        pending.result(timeout=10)
+    # 下一次请求自动重启进程
+    assert worker.run('web_search', ['again'], timeout=10) == 'again'
+
+
+def test_gives_up_after_repeated_crashes(worker):
+    with pytest.raises(WorkerUnavailable):
+        for _ in range(10):
+            worker.submit('crash', [])
+            deadline = time.monotonic() + 10
+            while worker.proc is not None and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+
+def test_unavailable_without_command(monkeypatch):
+    monkeypatch.delenv('OPENCLAW_WORKER_CMD', raising=False)
+    with pytest.raises(WorkerUnavailable):
+        OpenClawWorker().submit('web_search', [])
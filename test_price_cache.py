@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+本地行情缓存的回归测试：增量补齐（与最后一根 K 线重叠）、盘中未收盘 K 线的覆盖、
+已定型日线不再请求、内存合并不产生重复日期，结果与重新完整下载一致
+
+    python3 -m pytest test_price_cache.py
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import price_cache
+import trading_calendar
+from price_cache import PriceCache, final_bar_cutoff, slice_period
+from synthetic_data import SyntheticMarket
+
+SYMBOLS = ['S0000', 'S0001', 'S0002']
+
+
+class Feed:
+    """
+    模拟数据源：只能看到 asof（含）之前的日线；partial=True 时最后一天尚未收盘，
+    收盘价与成交量只是盘中的值，之后的下载会返回修正后的数据
+    """
+
+    def __init__(self, market):
+        self.truth = market.panel(SYMBOLS + ['S0003'])
+        self.asof = self.truth.index[-10]
+        self.partial = False
+        self.calls = []
+
+    def visible(self):
+        panel = self.truth[self.truth.index <= self.asof].copy()
+        if self.partial:
+            last = panel.index[-1]
+            panel.loc[last, (slice(None), 'Close')] *= 0.98
+            panel.loc[last, (slice(None), 'Volume')] *= 0.4
+        return panel
+
+    def __call__(self, symbols, period=None, start=None):
+        self.calls.append((tuple(symbols), period, start))
+        panel = self.visible().loc[:, lambda p: p.columns.get_level_values(0).isin(symbols)]
+        if start:
+            return panel[panel.index >= pd.Timestamp(start)]
+        return slice_period(panel, period, today=self.asof)
+
+    def advance(self, days=1, partial=False):
+        self.asof = self.truth.index[self.truth.index.get_loc(self.asof) + days]
+        self.partial = partial
+
+    def fresh(self, symbols, period):
+        """重新完整下载的结果（与 get_panel 格式相同）"""
+        panel = slice_period(self.visible(), period, today=self.asof)
+        return panel.loc[:, pd.MultiIndex.from_product([symbols, price_cache.FIELDS])]
+
+
+@pytest.fixture
+def feed():
+    return Feed(SyntheticMarket(seed=5, n_days=120, end='2026-02-27'))
+
+
+def assert_same(actual, expected):
+    pd.testing.assert_frame_equal(actual, expected, check_names=False, check_freq=False,
+                                  check_index_type=False, check_column_type=False)
+    assert not actual.index.duplicated().any()
+
+
+@pytest.mark.parametrize('keep_in_memory', [False, True])
+def test_delta_fetch_overwrites_partial_bar(feed, tmp_path, keep_in_memory):
+    cache = PriceCache(feed, str(tmp_path), keep_in_memory=keep_in_memory)
+    feed.partial = True
+    today = feed.asof.date()
+    assert_same(cache.get_panel(SYMBOLS, '1mo', today=today), feed.fresh(SYMBOLS, '1mo'))
+
+    # 同一天再次运行（盘中数据更新），再到第二天：只请求最后一根 K 线之后的增量（含最后一天）
+    for partial, days in ((True, 0), (False, 1), (False, 2)):
+        last_date = cache._bars(SYMBOLS)[SYMBOLS[0]][0][-1]
+        feed.advance(days, partial)
+        feed.calls.clear()
+        panel = cache.get_panel(SYMBOLS, '1mo', today=feed.asof.date())
+        assert feed.calls == [(tuple(SYMBOLS), None, str(last_date)[:10])]
+        assert_same(panel, feed.fresh(SYMBOLS, '1mo'))
+
+
+def test_new_symbol_and_wider_period_are_fetched_in_full(feed, tmp_path):
+    cache = PriceCache(feed, str(tmp_path))
+    today = feed.asof.date()
+    cache.get_panel(SYMBOLS[:2], '1mo', today=today)
+    feed.calls.clear()
+    cache.get_panel(SYMBOLS, '1mo', today=today)
+    full = [call for call in feed.calls if call[2] is None]
+    assert full == [((SYMBOLS[2],), '1mo', None)]
+
+    feed.calls.clear()
+    panel = cache.get_panel(SYMBOLS, '3mo', today=today)
+    assert (tuple(SYMBOLS), '3mo', None) in feed.calls
+    assert_same(panel, feed.fresh(SYMBOLS, '3mo'))
+
+
+def test_finalized_bars_are_not_requested_again(feed, tmp_path, monkeypatch):
+    cache = PriceCache(feed, str(tmp_path))
+    cache.get_panel(SYMBOLS, '1mo', today=feed.asof.date())
+    last_key = feed.asof.strftime('%Y-%m-%d')
+
+    # 最近一个交易日的日线在下载之后才定型：仍需补齐一次
+    monkeypatch.setattr(price_cache, 'final_bar_cutoff', lambda now=None: (last_key, 2e9 + 1))
+    feed.calls.clear()
+    cache.update(SYMBOLS, '1mo')
+    assert len(feed.calls) == 1
+
+    # 在定型之后下载过：不再请求
+    monkeypatch.setattr(price_cache, 'final_bar_cutoff', lambda now=None: (last_key, 0.0))
+    feed.calls.clear()
+    cache.update(SYMBOLS, '1mo')
+    assert feed.calls == []
+
+    # 交易时段内（None）：当天日线仍在变化，照常增量请求
+    monkeypatch.setattr(price_cache, 'final_bar_cutoff', lambda now=None: None)
+    cache.update(SYMBOLS, '1mo')
+    assert len(feed.calls) == 1
+
+
+def test_final_bar_cutoff_follows_the_session():
+    ny = trading_calendar.NEW_YORK
+    assert final_bar_cutoff(datetime(2024, 11, 27, 11, 0, tzinfo=ny)) is None
+    # 感恩节次日 13:00 提前收盘，收盘后即取当天
+    day, final_at = final_bar_cutoff(datetime(2024, 11, 29, 14, 0, tzinfo=ny))
+    assert day == '2024-11-29'
+    assert final_at == datetime(2024, 11, 29, 13, 0, tzinfo=ny).timestamp() + price_cache.FINAL_BAR_DELAY
+    # 周末取周五
+    assert final_bar_cutoff(datetime(2024, 12, 1, 12, 0, tzinfo=ny))[0] == '2024-11-29'
+
+
+def test_memory_matches_database_after_evict(feed, tmp_path):
+    cache = PriceCache(feed, str(tmp_path), keep_in_memory=True, retention_days=20)
+    cache.get_panel(SYMBOLS, '3mo', today=feed.asof.date())
+    feed.advance(1)
+    cache.get_panel(SYMBOLS, '3mo', today=feed.asof.date())
+    cache.evict(today=feed.asof.date())
+    reread = cache._read_bars(SYMBOLS)
+    for symbol in SYMBOLS:
+        dates, values = cache.memory[symbol]
+        np.testing.assert_array_equal(dates, reread[symbol][0])
+        np.testing.assert_allclose(values, reread[symbol][1])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+报告归档索引的回归测试：解析 render_report 生成的报告（立场、VIX、观察名单表格）与列表形式的观察名单、
+增量更新（未变、改动、删除）、按股票 / 立场 / VIX / 全文查询
+
+    python3 -m pytest test_report_index.py
+"""
+
+import os
+
+import pytest
+
+from marcus_report import render_report
+from report_index import ReportIndex, parse_report
+
+WATCHLIST = [
+    {'symbol': 'NVDA', 'price': 145.2, 'change': 3.4, 'volume_ratio': 2.1, 'ma5': 140.0,
+     'score': 5, 'rsi': 68.0, 'breakout': True},
+    {'symbol': 'TSLA', 'price': 1204.5, 'change': -1.2, 'volume_ratio': 1.6, 'ma5': 1190.0,
+     'score': 3, 'rsi': float('nan'), 'breakout': False},
+]
+
+
+def report(stance='Conservative Buy', vix=18.5, watchlist=WATCHLIST, reason='美联储按兵不动'):
+    return render_report('2026-03-02', {'vix': vix}, stance, reason, watchlist)
+
+
+def write(reports_dir, name, text):
+    path = reports_dir / name
+    path.write_text(text, encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    reports_dir = tmp_path / 'reports'
+    reports_dir.mkdir()
+    index = ReportIndex(str(tmp_path / 'index.sqlite'), str(reports_dir))
+    index.dir = reports_dir
+    yield index
+    index.close()
+
+
+def test_parses_rendered_report():
+    parsed = parse_report(report())
+    assert parsed['stance'] == 'Conservative Buy'
+    assert parsed['vix'] == 18.5
+    assert not parsed['closed']
+    assert [(row['rank'], row['symbol'], row['price'], row['change']) for row in parsed['watchlist']] == \
+        [(1, 'NVDA', 145.2, 3.4), (2, 'TSLA', 1204.5, -1.2)]
+    assert parsed['watchlist'][0]['detail']['20 日新高'] == '✅ 突破'
+
+
+def test_parses_bullet_watchlist_and_closed_day():
+    text = "## 观察名单\n\n1. **AMD**: 突破 $180\n- COIN - 放量\n- note: 小写不计入\n"
+    assert [row['symbol'] for row in parse_report(text)['watchlist']] == ['AMD', 'COIN']
+    with open(os.path.join(os.path.dirname(__file__), 'reports', '2026-02-28_report.md'), encoding='utf-8') as f:
+        closed = parse_report(f.read())
+    assert closed['closed'] and closed['stance'] is None and closed['watchlist'] == []
+
+
+def test_incremental_update(index):
+    write(index.dir, '2026-03-02_report.md', report())
+    write(index.dir, '2026-03-03_report.md', report('Aggressive Buy', 14.0, WATCHLIST[:1]))
+    write(index.dir, 'DEMO_report.md', report('Hold/Cash'))
+    assert index.update() == {'added': 2, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    assert index.update() == {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 2}
+
+    path = write(index.dir, '2026-03-03_report.md', report('Hold/Cash', 26.0, []))
+    os.utime(path, ns=(1, 10**18))
+    (index.dir / '2026-03-02_report.md').unlink()
+    assert index.update() == {'added': 0, 'updated': 1, 'removed': 1, 'unchanged': 0}
+    assert index.stance_counts() == {'Hold/Cash': 1}
+    assert index.last_watchlisted('NVDA') is None
+    assert index.conn.execute("SELECT COUNT(*) FROM reports_fts").fetchone() == (1,)
+
+
+def test_missing_reports_dir_keeps_index(index, tmp_path):
+    write(index.dir, '2026-03-02_report.md', report())
+    index.update()
+    index.reports_dir = str(tmp_path / 'missing')
+    assert index.update() == {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    assert index.last_watchlisted('nvda')['date'] == '2026-03-02'
+
+
+def test_queries(index):
+    write(index.dir, '2026-03-02_report.md', report())
+    write(index.dir, '2026-03-03_report.md', report('Aggressive Buy', 14.0, WATCHLIST[1:]))
+    # 同一天的 open / close 两份报告只取最新的一份
+    path = write(index.dir, '2026-03-04_open_report.md', report('Hold/Cash', 24.0, []))
+    os.utime(path, ns=(1, 10**18))
+    write(index.dir, '2026-03-04_close_report.md', report('Conservative Buy', 21.0, [], '降息'))
+    index.update()
+
+    assert [(item['date'], item['rank']) for item in index.watchlist_history('tsla')] == \
+        [('2026-03-03', 1), ('2026-03-02', 2)]
+    assert index.last_watchlisted('NVDA')['stance'] == 'Conservative Buy'
+    assert index.stance_counts() == {'Conservative Buy': 2, 'Aggressive Buy': 1}
+    assert index.stance_counts(since='2026-03-03', until='2026-03-03') == {'Aggressive Buy': 1}
+    assert index.vix_series() == [('2026-03-02', 18.5), ('2026-03-03', 14.0), ('2026-03-04', 21.0)]
+
+    hits = index.search('美联储')
+    assert [name for _, name, _ in hits] == \
+        ['2026-03-04_open_report.md', '2026-03-03_report.md', '2026-03-02_report.md']
+    assert '【美联储】' in hits[0][2]
+    assert [date for date, _, _ in index.search('财报季注意')] == \
+        ['2026-03-04', '2026-03-04', '2026-03-03', '2026-03-02']
+    # 少于 3 个字符时逐篇匹配，% 与 _ 按字面匹配
+    assert [name for _, name, _ in index.search('降息')] == ['2026-03-04_close_report.md']
+    assert index.search('4%') != [] and index.search('9%') == [] and index.search('_') == []
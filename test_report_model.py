@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+结构化报告数据的回归测试：旧格式字典的兼容、字典 / JSON 往返、各渲染器输出（飞书卡片、Markdown、
+纯文本）、自定义渲染器注册
+
+    python3 -m pytest test_report_model.py
+"""
+
+import json
+
+import pytest
+
+import marcus_enhanced
+from report_model import (RENDERERS, ReportData, Sentiment, Stance, WatchlistEntry, register_renderer,
+                          render)
+
+WATCHLIST = [WatchlistEntry(symbol, f"{symbol} 逻辑", f"${100 + i}", f"${90 + i}", f"{60 + i}%")
+             for i, symbol in enumerate(['NVDA', 'TSLA', 'AMD', 'META', 'COIN', 'PLTR'])]
+
+
+@pytest.fixture
+def data():
+    return ReportData(
+        date='2026-03-02',
+        stance=Stance('Aggressive Buy', 'VIX 回落'),
+        sentiment=Sentiment(vix=14.2, trend=0.6, futures={'S&P 500': 0.6}, premarket_volume={'NVDA': 2.3e6}),
+        watchlist=WATCHLIST,
+        risk_tips=['单笔亏损 < 2%', '财报季注意黑天鹅'],
+        advice='积极参与',
+        market_news=['美联储按兵不动'],
+        stock_news=[('NVDA', '新品发布')],
+        generated_at='2026-03-02 09:00:00',
+    )
+
+
+def test_from_legacy_dict():
+    data = ReportData.from_dict({
+        'date': '2026-03-02', 'stance': 'Hold/Cash', 'reason': 'VIX 飙升', 'vix': '28.5', 'trend': '-1.2%',
+        'watchlist': [{'symbol': 'NVDA', 'logic': 'AI', 'entry': '$145'}],
+        'risk_tips': '• 降低仓位\n- 严格止损\n', 'unknown': 1,
+    })
+    assert data.stance == Stance('Hold/Cash', 'VIX 飙升')
+    assert (data.sentiment.vix, data.sentiment.trend) == (28.5, -1.2)
+    assert data.watchlist == [WatchlistEntry('NVDA', 'AI', '$145')]
+    assert data.risk_tips == ['降低仓位', '严格止损']
+    assert ReportData.from_dict({'date': 'x', 'vix': 'N/A'}).sentiment.vix is None
+
+
+def test_dict_and_json_round_trip(data):
+    assert ReportData.from_dict(data.to_dict()) == data
+    text = render(data, 'json')
+    assert '美联储' in text   # 中文不转义
+    assert ReportData.from_dict(json.loads(text)) == data
+
+
+def test_feishu_card(data):
+    card = render(data, 'feishu_card')
+    assert card['header']['template'] == 'blue'
+    assert card['header']['title']['content'].endswith('2026-03-02')
+    content = [element['text']['content'] for element in card['elements'] if element['tag'] == 'div']
+    assert '🟢 市场立场：Aggressive Buy' in content[0]
+    assert '14.2' in content[1] and '+0.6%' in content[1]
+    # 卡片最多列出 5 支
+    assert '5. **COIN**' in content[2] and 'PLTR' not in content[2]
+    assert '• 单笔亏损 < 2%' in content[3]
+    assert card['elements'][-1]['elements'][0]['content'].startswith('📅 生成时间：2026-03-02 09:00:00')
+    assert render(data, 'feishu_card', note='测试')['elements'][-1]['elements'][0]['content'] == '测试'
+
+    empty = ReportData('2026-03-02', Stance('Unknown'))
+    card = render(empty, 'feishu_card')
+    assert card['header']['template'] == 'yellow'
+    assert 'N/A' in card['elements'][1]['text']['content']
+
+
+def test_markdown_and_text(data):
+    markdown = render(data, 'markdown')
+    assert markdown.startswith('# 📈 Marcus 每日动量报告 | 2026-03-02')
+    assert '- PLTR: PLTR 逻辑，入场 $105，止损 $95\n' in markdown
+    assert render(data, 'markdown', reason='覆盖').count('覆盖') == 1
+
+    text = render(data, 'text')
+    assert '市场立场：Aggressive Buy（VIX 回落）' in text
+    assert '  1. NVDA - NVDA 逻辑 | 入场 $100 | 止损 $90 | 成功率 60%' in text
+    assert render(ReportData('2026-03-02', Stance('Hold/Cash')), 'text').count('\n') == 4
+
+
+def test_enhanced_layout_fills_every_placeholder(data):
+    report = marcus_enhanced.render_markdown(data)
+    assert '{{' not in report
+    assert 'S&P 500 +0.6%' in report and 'NVDA 2.3M' in report and '**NVDA**：新品发布' in report
+
+
+def test_register_renderer(data, monkeypatch):
+    monkeypatch.setattr('report_model.RENDERERS', dict(RENDERERS))
+
+    @register_renderer('symbols')
+    def symbols(data, sep=','):
+        return sep.join(stock.symbol for stock in data.watchlist)
+
+    assert render(data, 'symbols', sep=' ') == 'NVDA TSLA AMD META COIN PLTR'
+    with pytest.raises(KeyError):
+        render(data, 'pdf')
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+常驻调度进程的回归测试：星期配置、按时区触发（跨夏令时）、相对开盘 / 收盘的触发（提前收盘日）、
+跳过休市日、配置读取、错过触发时间的处理与任务异常隔离
+
+    python3 -m pytest test_scheduler.py
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import scheduler
+from scheduler import DailyTrigger, ScheduledJob, Scheduler, load_schedule, parse_days
+from trading_calendar import NEW_YORK
+
+SHANGHAI = ZoneInfo('Asia/Shanghai')
+
+
+def test_parse_days():
+    assert parse_days(None) == {0, 1, 2, 3, 4}
+    assert parse_days('daily') == set(range(7))
+    assert parse_days('Tue-Thu') == {1, 2, 3}
+    assert parse_days('mon,wed') == parse_days(['Monday', 'wed']) == {0, 2}
+
+
+def test_fixed_time_keeps_local_time_across_dst():
+    trigger = DailyTrigger('08:30')
+    # 2026-03-08 美国进入夏令时：周五 08:30 EST 之后的下一次是周一 08:30 EDT
+    at = trigger.next_after(datetime(2026, 3, 6, 9, 0, tzinfo=NEW_YORK))
+    assert at == datetime(2026, 3, 9, 8, 30, tzinfo=NEW_YORK)
+    assert at.astimezone(timezone.utc).hour == 12
+    assert trigger.next_after(datetime(2026, 3, 5, 13, 29, tzinfo=timezone.utc)) == \
+        datetime(2026, 3, 5, 8, 30, tzinfo=NEW_YORK)
+
+
+def test_other_timezone_checks_the_new_york_trading_day():
+    trigger = DailyTrigger('21:30', tz='Asia/Shanghai')
+    # 北京时间周五 21:30 对应纽约耶稣受难日（休市），下一次是周一
+    at = trigger.next_after(datetime(2024, 3, 29, 12, 0, tzinfo=SHANGHAI))
+    assert at == datetime(2024, 4, 1, 21, 30, tzinfo=SHANGHAI)
+    assert DailyTrigger('21:30', 'Asia/Shanghai', trading_days=False).next_after(
+        datetime(2024, 3, 29, 12, 0, tzinfo=SHANGHAI)) == datetime(2024, 3, 29, 21, 30, tzinfo=SHANGHAI)
+
+
+def test_relative_to_open_and_close():
+    after = datetime(2024, 11, 27, 17, 0, tzinfo=NEW_YORK)
+    # 感恩节休市，次日 13:00 提前收盘
+    assert DailyTrigger('close-30').next_after(after) == datetime(2024, 11, 29, 12, 30, tzinfo=NEW_YORK)
+    assert DailyTrigger('open+30').next_after(after) == datetime(2024, 11, 29, 10, 0, tzinfo=NEW_YORK)
+    assert DailyTrigger('open', days='daily').next_after(after) == datetime(2024, 11, 29, 9, 30, tzinfo=NEW_YORK)
+
+
+def test_load_schedule(tmp_path):
+    jobs = load_schedule(str(tmp_path / 'missing.json'))
+    assert [(job.name, job.job, job.tag) for job in jobs] == [
+        ('premarket', 'enhanced_report', None), ('open_confirm', 'momentum_report', 'open'),
+        ('pre_close', 'momentum_report', 'close')]
+
+    path = tmp_path / 'schedule.json'
+    path.write_text(json.dumps({'timezone': 'Asia/Shanghai', 'jobs': [
+        {'name': 'index', 'at': '06:00', 'job': 'report_index', 'days': 'daily', 'trading_days': False},
+        {'name': 'off', 'at': '07:00', 'job': 'drain_outbox', 'enabled': False},
+    ]}))
+    [job] = load_schedule(str(path))
+    assert job.trigger.tz == SHANGHAI and job.trigger.days == set(range(7)) and not job.trigger.trading_days
+
+    path.write_text(json.dumps({'jobs': [{'name': 'x', 'at': '06:00', 'job': 'nope'}]}))
+    with pytest.raises(ValueError):
+        load_schedule(str(path))
+
+
+class OnceTrigger:
+    """只触发一次的触发器"""
+
+    def __init__(self, at):
+        self.at = at
+
+    def next_after(self, after):
+        return self.at if self.at > after else None
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def job(context, tag=None):
+        calls.append(tag)
+        context['runs'] = context.get('runs', 0) + 1
+        if tag == 'fail':
+            raise RuntimeError('boom')
+
+    monkeypatch.setitem(scheduler.JOBS, 'fake', job)
+    return calls
+
+
+def make_job(name, minutes, tag=None):
+    job = ScheduledJob(name, 'fake', '08:30', tag=tag)
+    job.trigger = OnceTrigger(datetime.now(timezone.utc) + timedelta(minutes=minutes))
+    return job
+
+
+def test_runs_due_jobs_in_order_and_skips_misfires(calls, monkeypatch):
+    now = datetime.now(timezone.utc)
+    jobs = [make_job('late', -(scheduler.MISFIRE_GRACE / 60 + 5), 'late'),
+            make_job('second', 1 / 600, 'second'), make_job('first', -1, 'fail')]
+    # 从一小时前开始计算，已过触发时间的任务也会排上
+    sched = Scheduler(jobs, now=now - timedelta(hours=1))
+    monkeypatch.setattr(scheduler.time, 'sleep', lambda seconds: None)
+    sched.run_forever()
+    # 错过超过 MISFIRE_GRACE 的任务跳过；失败的任务不影响后续任务，context 在各任务间共用
+    assert calls == ['fail', 'second']
+    assert sched.context['runs'] == 2
+    assert all(job.next_at is None for job in jobs)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+向量化评分的回归测试：score_panel 与逐支 analyze_stock 结果一致（含停牌、上市较晚的缺失日期），
+select_top_k 同分时的顺序与原来的排序取前 K 一致
+
+    python3 -m pytest test_scoring.py
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from marcus_report import analyze_stock, generate_watchlist, iter_scored_stocks
+from market_data import MarketData
+from scoring import MIN_BARS, MIN_SCORE, score_panel, select_top_k, top_candidates
+from synthetic_data import SyntheticMarket, make_panel
+
+FIELDS = ['price', 'change', 'volume_ratio', 'ma5', 'ma20']
+
+
+@pytest.mark.parametrize('n_days', [8, 22, 60])
+def test_score_panel_matches_analyze_stock(n_days):
+    # 约 30% 的股票上市较晚；再随机挖掉一些日期模拟停牌
+    panel = make_panel(60, n_days, seed=n_days, gap_ratio=0.3)
+    rng = np.random.default_rng(n_days)
+    holes = rng.random(panel.shape[0] * 60) < 0.05
+    for symbol, day in zip(*np.nonzero(holes.reshape(60, -1))):
+        panel.iloc[day, symbol * 5:(symbol + 1) * 5] = np.nan
+    scores = score_panel(panel)
+
+    for symbol in dict.fromkeys(panel.columns.get_level_values(0)):
+        expected = analyze_stock(symbol, panel)
+        if expected is None:
+            assert symbol not in scores.index, symbol
+            assert panel[symbol]['Close'].notna().sum() < MIN_BARS
+            continue
+        row = scores.loc[symbol]
+        assert row['score'] == expected['score'], symbol
+        for field in FIELDS:
+            assert np.isclose(row[field], expected[field], equal_nan=True), (symbol, field)
+
+
+def old_watchlist(rows, k, min_score=MIN_SCORE):
+    """原 generate_watchlist 的做法：全部评分后稳定排序取前 k"""
+    results = [row for row in rows if row['score'] >= min_score]
+    results.sort(key=lambda row: row['score'], reverse=True)
+    return results[:k]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_select_top_k_matches_sort(seed):
+    rng = random.Random(seed)
+    rows = [{'symbol': f"S{i:03d}", 'score': rng.randint(0, 7)} for i in range(rng.randint(0, 40))]
+    for k in (0, 1, 5, 50):
+        passed = (row for row in rows if row['score'] >= MIN_SCORE)
+        assert select_top_k(passed, k, key=lambda row: row['score']) == old_watchlist(rows, k)
+
+
+def test_top_candidates_and_watchlist_match_old_order():
+    # 最后一个交易日取今天之前最近的交易日，MarketData 按当前日期截取区间
+    market = SyntheticMarket(seed=3, n_days=30, gap_ratio=0.1)
+    symbols = market.universe(80)
+    panel = market.panel(symbols)
+    rows = [row for row in (analyze_stock(s, panel) for s in symbols) if row]
+    expected = [row['symbol'] for row in old_watchlist(rows, 5)]
+
+    assert [row['symbol'] for row in top_candidates(score_panel(panel))] == expected
+
+    class PanelSource:
+        def get_panel(self, batch, period):
+            return panel.loc[:, panel.columns.get_level_values(0).isin(batch)]
+
+    # 分批流式评分也不改变顺序（批次边界落在同分股票之间）
+    data = MarketData(PanelSource())
+    assert [stock['symbol'] for stock in generate_watchlist(symbols, data=data)] == expected
+    passed = (row for row in iter_scored_stocks(symbols, batch_size=7, data=data) if row['score'] >= MIN_SCORE)
+    assert [row['symbol'] for row in select_top_k(passed, 5, key=lambda row: row['score'])] == expected
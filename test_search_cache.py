@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+搜索结果缓存的回归测试：查询规范化、过期时间、出错结果不缓存、按总大小淘汰最久未使用的结果、
+单次读取的 max_age
+
+    python3 -m pytest test_search_cache.py
+"""
+
+import time
+
+import pytest
+
+from search_cache import SearchCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SearchCache(str(tmp_path), ttl=60, max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+def age(cache, query, count, seconds):
+    """把已缓存结果的写入时间往前调"""
+    with cache.conn:
+        cache.conn.execute("UPDATE results SET created_at = created_at - ? WHERE key = ?",
+                           (seconds, cache_key(query, count)))
+
+
+def test_query_is_normalized():
+    assert cache_key('NVDA  stock price', 3) == cache_key(' nvda stock   PRICE ', '3')
+    assert cache_key('NVDA stock price', 3) != cache_key('NVDA stock price', 5)
+
+
+def test_hit_miss_and_ttl(cache):
+    assert cache.get('VIX today', 5) is None
+    cache.put('VIX today', 5, 'VIX 18.5')
+    assert cache.get('vix   TODAY', 5) == 'VIX 18.5'
+    age(cache, 'VIX today', 5, 61)
+    assert cache.get('VIX today', 5) is None
+
+
+def test_max_age_only_shortens_this_read(cache):
+    cache.put('VIX today', 5, 'VIX 18.5')
+    age(cache, 'VIX today', 5, 30)
+    assert cache.get('VIX today', 5, max_age=10) is None
+    assert cache.get('VIX today', 5, max_age=3600) == 'VIX 18.5'   # 不超过 TTL
+    assert cache.get('VIX today', 5) == 'VIX 18.5'
+    assert cache.ttl == 60
+
+
+def test_errors_are_not_cached(cache):
+    cache.put('VIX today', 5, 'Error: 搜索超时（30s）')
+    cache.put('VIX today', 5, '')
+    assert cache.get('VIX today', 5) is None
+
+
+def test_evicts_least_recently_used_over_budget(cache):
+    for i in range(3):
+        cache.put(f'query {i}', 5, 'x' * 400)
+        time.sleep(0.01)
+    # 第三条写入时超出 1000 字节，最久未使用的 query 0 被淘汰
+    assert cache.get('query 0', 5) is None
+    assert cache.get('query 1', 5) is not None
+    time.sleep(0.01)
+    cache.put('query 3', 5, 'x' * 400)
+    # query 1 刚被读取过，淘汰的是 query 2
+    assert cache.get('query 2', 5) is None
+    assert cache.get('query 1', 5) is not None and cache.get('query 3', 5) is not None
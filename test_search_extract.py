@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+搜索结果提取的回归测试：VIX、股指期货方向、个股价格与成交量的归属（只在同一行内）、
+与原 parse_vix_from_search 的结果一致
+
+    python3 -m pytest test_search_extract.py
+"""
+
+import re
+
+import pytest
+
+from search_extract import extract_metrics, futures_trend
+from synthetic_data import SyntheticMarket
+
+SYMBOLS = ['NVDA', 'TSLA', 'AMD', 'META', 'COIN']
+
+TEXT = """Markets: VIX 18.5 as S&P 500 futures rose 0.4% and Nasdaq futures fell 0.8%; Dow futures -0.2%
+NVDA shares up premarket to $145.20 on volume of 2.3M after analyst update
+Meta platforms news: the coin toss. TSLA trades at $1,204.50, premarket volume 850K
+AMD
+volume 5M at $3
+volatility index: 22
+"""
+
+
+def test_extracts_all_metrics_in_one_pass():
+    metrics = extract_metrics(TEXT, SYMBOLS)
+    assert metrics['vix'] == 18.5   # 只取第一次出现的值
+    assert metrics['futures'] == {'S&P 500': 0.4, 'Nasdaq 100': -0.8, 'Dow Jones': -0.2}
+    assert metrics['prices'] == {'NVDA': 145.2, 'TSLA': 1204.5}
+    assert metrics['premarket_volume'] == {'NVDA': 2.3e6, 'TSLA': 850e3}
+    assert futures_trend(metrics) == 0.4
+
+
+def test_lowercase_words_are_not_tickers_and_lines_do_not_leak():
+    # coin / meta 是普通单词；AMD 单独一行，下一行的成交量与价格不归属于它
+    metrics = extract_metrics(TEXT, SYMBOLS)
+    assert 'COIN' not in metrics['prices'] and 'META' not in metrics['prices']
+    assert 'AMD' not in metrics['premarket_volume'] and 'AMD' not in metrics['prices']
+
+
+def test_empty_and_missing_values():
+    assert extract_metrics('', SYMBOLS) == {'vix': None, 'futures': {}, 'prices': {}, 'premarket_volume': {}}
+    assert futures_trend(extract_metrics('Dow Jones futures up 1.1%'), default=0.0) == 1.1
+    assert futures_trend(extract_metrics('no futures today'), default=0.0) == 0.0
+
+
+def old_parse_vix(text):
+    """原 marcus_enhanced.parse_vix_from_search 的规则"""
+    for pattern in (r'VIX\s*[:\s]+(\d+\.?\d*)', r'VIX\s+(\d+\.?\d*)', r'volatility\s+index\s*[:\s]+(\d+\.?\d*)'):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+@pytest.mark.parametrize('i', range(30))
+def test_vix_matches_old_parser_on_synthetic_results(i):
+    text = SyntheticMarket(seed=i).search(f'stock market news premarket futures VIX {i}', 5)
+    assert extract_metrics(text, SYMBOLS)['vix'] == old_parse_vix(text)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+流式评分引擎的回归测试：逐日回放与盘中分钟线的指标和评分与 analyze_stock 一致、
+每根 K 线后的观察名单与整体重选一致（同分按股票池顺序）、名单变化事件、回放文件读取
+
+    python3 -m pytest test_streaming.py
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from marcus_report import analyze_stock
+from scoring import MIN_SCORE
+from streaming import StreamingEngine, replay_file
+from synthetic_data import SyntheticMarket
+
+FIELDS = ['price', 'change', 'volume_ratio', 'ma5', 'ma20']
+
+
+def daily_bars(panel):
+    """把日线面板拆成按日期排序的 K 线（跳过缺失值）"""
+    for ts, row in panel.iterrows():
+        for symbol in dict.fromkeys(panel.columns.get_level_values(0)):
+            close = row[(symbol, 'Close')]
+            if close == close:
+                yield {'time': ts.strftime('%Y-%m-%d'), 'symbol': symbol,
+                       'close': close, 'volume': row[(symbol, 'Volume')]}
+
+
+def closing_panel(panel, bars):
+    """把当天分钟线合成为一根日线，追加到历史面板末尾"""
+    last = {}
+    for bar in bars:
+        last[bar['symbol']] = (bar['close'], last.get(bar['symbol'], (None, 0.0))[1] + bar['volume'])
+    row = pd.DataFrame(np.nan, index=[pd.Timestamp(bars[-1]['time'][:10])], columns=panel.columns)
+    for symbol, (close, volume) in last.items():
+        row[(symbol, 'Close')] = close
+        row[(symbol, 'Volume')] = volume
+    return pd.concat([panel, row])
+
+
+def expected_watchlist(engine, top_k=5):
+    """由全部评分整体重选：评分从高到低，同分按股票池顺序"""
+    passed = [s for s, score in engine.scores.items() if score >= MIN_SCORE]
+    return sorted(passed, key=lambda s: (-engine.scores[s], engine.order[s]))[:top_k]
+
+
+def assert_matches(engine, panel):
+    for symbol in dict.fromkeys(panel.columns.get_level_values(0)):
+        expected = analyze_stock(symbol, panel)
+        state = engine.states.get(symbol)
+        metrics = state.metrics() if state else None
+        if expected is None:
+            assert metrics is None, symbol
+            continue
+        assert metrics['score'] == expected['score'], symbol
+        for field in FIELDS:
+            assert np.isclose(metrics[field], expected[field]), (symbol, field)
+
+
+def replay(engine, bars):
+    """逐根回放，检查每根 K 线后的名单与事件"""
+    for bar in bars:
+        old = list(engine.watchlist)
+        events = engine.on_bar(bar)
+        new = engine.watchlist
+        assert new == expected_watchlist(engine)
+        assert {e['symbol'] for e in events if e['type'] == 'removed'} == set(old) - set(new)
+        assert {e['symbol'] for e in events if e['type'] == 'added'} == set(new) - set(old)
+        for event in events:
+            assert event['time'] == bar['time']
+            if event['type'] != 'removed':
+                assert new[event['rank'] - 1] == event['symbol']
+                assert event['score'] == engine.scores[event['symbol']]
+        # 名次变化的股票都有事件
+        moved = {s for rank, s in enumerate(new) if s in old and old.index(s) != rank}
+        assert moved == {e['symbol'] for e in events if e['type'] == 'rank'}
+        assert bool(events) == (new != old)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_daily_replay_matches_analyze_stock(seed):
+    market = SyntheticMarket(seed=seed, n_days=40, end='2026-02-27', gap_ratio=0.2)
+    symbols = market.universe(40)
+    panel = market.panel(symbols)
+    engine = StreamingEngine(symbols)
+    replay(engine, daily_bars(panel))
+    assert_matches(engine, panel)
+    assert engine.ticks == int(panel.xs('Close', axis=1, level=1).notna().sum().sum())
+
+
+def test_intraday_bars_after_seed_match_closing_panel():
+    market = SyntheticMarket(seed=7, n_days=30, end='2026-02-27', gap_ratio=0.1)
+    symbols = market.universe(30)
+    panel = market.panel(symbols)
+    bars = list(market.minute_bars(symbols, minutes=60))
+
+    engine = StreamingEngine(symbols)
+    engine.seed(panel)
+    assert engine.watchlist == expected_watchlist(engine)
+    replay(engine, bars)
+    assert_matches(engine, closing_panel(panel, bars))
+    assert [stock['symbol'] for stock in engine.current_watchlist()] == engine.watchlist
+
+
+def test_seed_before_skips_the_streamed_day():
+    market = SyntheticMarket(seed=2, n_days=30, end='2026-02-27')
+    symbols = market.universe(10)
+    panel = market.panel(symbols)
+    last_day = panel.index[-1].strftime('%Y-%m-%d')
+
+    engine = StreamingEngine(symbols)
+    engine.seed(panel, before=last_day)
+    replay(engine, (bar for bar in daily_bars(panel) if bar['time'] == last_day))
+    assert_matches(engine, panel)
+
+
+def test_replay_file(tmp_path):
+    bars = [{'time': '2026-03-02 09:30', 'symbol': 'NVDA', 'open': 1, 'high': 1, 'low': 1,
+             'close': '145.5', 'volume': '1200'},
+            {'time': '2026-03-02 09:31', 'symbol': 'TSLA', 'open': 1, 'high': 1, 'low': 1,
+             'close': 250, 'volume': None}]
+    csv_path = tmp_path / 'bars.csv'
+    csv_path.write_text('time,symbol,open,high,low,close,volume\n'
+                        '2026-03-02 09:30,NVDA,1,1,1,145.5,1200\n'
+                        '2026-03-02 09:31,TSLA,1,1,1,250,\n')
+    jsonl_path = tmp_path / 'bars.jsonl'
+    jsonl_path.write_text('\n'.join(json.dumps(bar) for bar in bars) + '\n\n')
+    for path in (csv_path, jsonl_path):
+        parsed = list(replay_file(str(path)))
+        assert [(bar['symbol'], bar['close'], bar['volume']) for bar in parsed] == \
+            [('NVDA', 145.5, 1200.0), ('TSLA', 250.0, 0.0)]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+交易日历的回归测试：节假日与补休规则、临时休市、提前收盘、逐年交易日数与前后交易日
+
+    python3 -m pytest test_trading_calendar.py
+"""
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import trading_calendar
+from trading_calendar import NEW_YORK
+
+# NYSE 公布的逐年交易日数
+SESSIONS_PER_YEAR = {
+    2018: 251, 2019: 252, 2020: 253, 2021: 252,
+    2022: 251, 2023: 250, 2024: 252, 2025: 250,
+}
+
+
+@pytest.mark.parametrize('year, count', SESSIONS_PER_YEAR.items())
+def test_sessions_per_year(year, count):
+    assert len(trading_calendar.sessions_between(date(year, 1, 1), date(year, 12, 31))) == count
+    assert trading_calendar.get_calendar().session_count(date(year, 1, 1), date(year, 12, 31)) == count
+
+
+@pytest.mark.parametrize('day', [
+    date(2024, 3, 29),    # 耶稣受难日
+    date(2022, 6, 20),    # 六月节落在周日，周一补休
+    date(2021, 7, 5),     # 独立日落在周日，周一补休
+    date(2020, 7, 3),     # 独立日落在周六，周五补休
+    date(2018, 12, 5),    # 老布什国葬
+    date(2025, 1, 9),     # 卡特国葬
+    date(2012, 10, 29),   # 飓风桑迪
+    date(2025, 11, 27),   # 感恩节
+])
+def test_holidays_are_closed(day):
+    assert not trading_calendar.is_trading_day(day)
+    assert trading_calendar.session_bounds(day) is None
+    assert trading_calendar.closed_reason(day)
+
+
+@pytest.mark.parametrize('day', [
+    date(2021, 12, 31),   # 2022 年元旦落在周六，不在前一年的周五补休
+    date(2021, 6, 18),    # 六月节从 2022 年起才休市
+    date(2024, 3, 28),
+])
+def test_regular_sessions(day):
+    assert trading_calendar.is_trading_day(day)
+    open_at, close_at = trading_calendar.session_bounds(day)
+    assert (open_at.hour, open_at.minute, close_at.hour) == (9, 30, 16)
+
+
+@pytest.mark.parametrize('day', [
+    date(2019, 7, 3), date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24), date(2025, 7, 3),
+])
+def test_early_closes(day):
+    assert trading_calendar.get_calendar().is_early_close(day)
+    assert trading_calendar.session_bounds(day)[1] == datetime.combine(day, datetime.min.time().replace(hour=13), NEW_YORK)
+
+
+def test_independence_day_eve_early_close():
+    # 2023-07-03 是周一，提前收盘；2022-07-01 是周五（独立日在下周一），照常收盘
+    calendar = trading_calendar.get_calendar()
+    assert calendar.is_early_close(date(2023, 7, 3))
+    assert not calendar.is_early_close(date(2022, 7, 1))
+
+
+def test_next_and_previous_skip_weekends_and_holidays():
+    assert trading_calendar.next_trading_day(date(2024, 3, 28)) == date(2024, 4, 1)
+    assert trading_calendar.previous_trading_day(date(2024, 4, 1)) == date(2024, 3, 28)
+    assert trading_calendar.next_trading_day(date(2024, 12, 31), n=2) == date(2025, 1, 3)
+    assert trading_calendar.sessions_ending(date(2025, 1, 10), 3) == [
+        date(2025, 1, 7), date(2025, 1, 8), date(2025, 1, 10)]
+
+
+def test_market_date_uses_new_york_time():
+    # 北京时间周六凌晨仍是纽约周五的交易日
+    beijing = datetime(2026, 3, 7, 4, 30, tzinfo=ZoneInfo('Asia/Shanghai'))
+    assert trading_calendar.market_date(beijing) == date(2026, 3, 6)
+    assert trading_calendar.is_trading_day(beijing)
+
+
+def test_last_closed_session_on_half_day():
+    calendar = trading_calendar.get_calendar()
+    before_close = datetime(2024, 11, 29, 12, 0, tzinfo=NEW_YORK)
+    after_close = datetime(2024, 11, 29, 14, 0, tzinfo=NEW_YORK)
+    assert calendar.last_closed_session(before_close)[0] == date(2024, 11, 27)
+    assert calendar.last_closed_session(after_close)[0] == date(2024, 11, 29)
+    assert not calendar.is_open(after_close)
+
+
+def test_out_of_range_raises():
+    with pytest.raises(ValueError):
+        trading_calendar.sessions_between(date(1980, 1, 1), date(1980, 12, 31))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Webhook 连接池的回归测试：keep-alive 连接复用、并发发送顺序、服务端关闭空闲连接后自动换新连接、
+非幂等请求发出后断线不重发、代理环境变量
+
+    python3 -m pytest test_webhook_pool.py
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from webhook_pool import WebhookPool, _uses_proxy
+
+PROXY_VARS = ['HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'NO_PROXY',
+              'http_proxy', 'https_proxy', 'all_proxy', 'no_proxy']
+
+
+class Handler(BaseHTTPRequestHandler):
+    """记录请求；/drop 读完请求后不响应直接断开"""
+
+    protocol_version = 'HTTP/1.1'
+    timeout = 0.3   # 空闲超过该时间服务端关闭 keep-alive 连接
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.received.append((self.path, body))
+        if self.path == '/drop':
+            self.close_connection = True
+            return
+        payload = b'{"code": 0}'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    for name in PROXY_VARS:
+        monkeypatch.delenv(name, raising=False)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.received = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool():
+    pool = WebhookPool(timeout=5)
+    yield pool
+    pool.close()
+
+
+def connects(pool):
+    return sum(host.connects for host in pool.hosts.values())
+
+
+def test_sequential_posts_reuse_one_connection(server, pool):
+    for i in range(5):
+        assert pool.post(f"{server.url}/hook?i={i}", b'{}') == (200, 'OK', b'{"code": 0}')
+    assert connects(pool) == 1
+    assert [path for path, _ in server.received] == [f"/hook?i={i}" for i in range(5)]
+
+
+def test_fan_out_keeps_url_order(server, pool):
+    urls = [f"{server.url}/hook/{i}" for i in range(8)]
+    results = pool.fan_out(urls, b'{"msg": 1}', send=lambda url, body: (url, pool.post(url, body)[0]))
+    assert results == [(url, 200) for url in urls]
+    assert sorted(path for path, _ in server.received) == sorted(f"/hook/{i}" for i in range(8))
+    assert connects(pool) <= 8
+
+
+def test_connection_closed_by_server_is_replaced(server, pool):
+    pool.post(f"{server.url}/hook", b'1')
+    time.sleep(Handler.timeout * 3)   # 服务端已关闭空闲连接
+    assert pool.post(f"{server.url}/hook", b'2')[0] == 200
+    assert connects(pool) == 2
+    assert [body for _, body in server.received] == [b'1', b'2']
+
+
+@pytest.mark.parametrize('idempotent, attempts', [(False, 1), (True, 2)])
+def test_post_is_resent_only_when_idempotent(server, pool, idempotent, attempts):
+    pool.post(f"{server.url}/hook", b'warm')   # 之后的请求使用复用的连接
+    with pytest.raises(Exception):
+        pool.post(f"{server.url}/drop", b'message', idempotent=idempotent)
+    assert [body for path, body in server.received if path == '/drop'] == [b'message'] * attempts
+
+
+def test_proxy_environment(server, pool, monkeypatch):
+    assert not _uses_proxy('https', 'open.feishu.cn')
+    monkeypatch.setenv('HTTPS_PROXY', 'http://proxy.internal:3128')
+    monkeypatch.setenv('NO_PROXY', 'localhost,.example.com')
+    assert _uses_proxy('https', 'open.feishu.cn')
+    assert not _uses_proxy('https', 'hooks.example.com')
+
+    # 走代理时请求发给代理服务器（请求行为完整 URL），不经过连接池
+    monkeypatch.setenv('HTTP_PROXY', server.url)
+    status, _, _ = pool.post('http://feishu.invalid/hook', b'{}')
+    assert status == 200
+    assert server.received[-1][0] == 'http://feishu.invalid/hook'
+    assert pool.hosts == {}
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+启动与分阶段耗时统计 - 报告脚本的 --timings 参数
+
+    timer = StageTimer(enabled=args.timings)
+    timer.add('导入模块', IMPORT_SECONDS)
+    with timer.stage('获取数据'):
+        ...
+    timer.report()
+
+只依赖标准库，导入本模块几乎没有开销（休市日的空跑也能在几十毫秒内结束）
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """按顺序记录各阶段耗时，未启用时不输出"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+        self.started = time.perf_counter()
+
+    def add(self, name, seconds):
+        """记录一个已经测得的阶段耗时"""
+        self.stages.append((name, seconds))
+
+    @contextmanager
+    def stage(self, name):
+        """计时一个阶段（阶段内抛出异常时同样记录）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def report(self, file=None):
+        """输出各阶段耗时（到标准错误，不混入报告内容）"""
+        if not self.enabled:
+            return
+        file = file or sys.stderr
+        print("\n⏱️  耗时统计：", file=file)
+        for name, seconds in self.stages:
+            print(f"   {seconds * 1000:8.1f} ms  {name}", file=file)
+        total = sum(seconds for _, seconds in self.stages)
+        print(f"   {total * 1000:8.1f} ms  合计", file=file)
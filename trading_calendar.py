@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+美股（NYSE / Nasdaq）交易日历 - 离线规则计算节假日与提前收盘，预先展开成紧凑的日期索引
+
+节假日规则（按现行规则，周六的节日提前到周五、周日的节日顺延到周一）：
+- 元旦（1 月 1 日；逢周六不补休，因为 12 月 31 日是年末结算日）
+- 马丁·路德·金纪念日（1 月第三个周一，1998 年起）
+- 总统日（2 月第三个周一）
+- 耶稣受难日（复活节前的周五）
+- 阵亡将士纪念日（5 月最后一个周一）
+- 六月节（6 月 19 日，2022 年起）
+- 独立日（7 月 4 日）
+- 劳动节（9 月第一个周一）
+- 感恩节（11 月第四个周四）
+- 圣诞节（12 月 25 日）
+另有国葬、飓风等临时休市日（SPECIAL_CLOSURES），以后新增的临时休市需手动补充。
+
+提前收盘（13:00）：独立日前一天（7 月 3 日为周一至周四时）、感恩节次日、平安夜（周一至周四）
+
+日历在第一次使用时展开为 FIRST_YEAR ~ LAST_YEAR 的逐日状态表（每天 1 字节）与
+累计交易日数组，之后判断交易日、查找前后交易日、数区间内交易日都是 O(1)。
+只依赖标准库（GitHub Actions 中只安装了 requests）。
+
+用法：
+    python3 trading_calendar.py                  # 今天是否开市
+    python3 trading_calendar.py --year 2026      # 列出全年休市日与提前收盘日
+"""
+
+import argparse
+from array import array
+from itertools import accumulate, compress
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+NEW_YORK = ZoneInfo('America/New_York')
+
+# 常规交易时段与提前收盘时间（纽约时间）
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# 预先展开的年份范围（范围之外按规则逐日计算，结果相同但不是 O(1)）
+FIRST_YEAR = 1990
+LAST_YEAR = 2099
+
+# 逐日状态
+CLOSED, FULL_DAY, HALF_DAY = 0, 1, 2
+# 状态 -> 是否开市（bytes.translate 查表）
+_IS_SESSION = bytes([0, 1, 1]) + bytes(253)
+
+# 不在固定规则内的临时休市日
+SPECIAL_CLOSURES = {
+    date(1994, 4, 27): '尼克松国葬',
+    date(2001, 9, 11): '9·11 事件',
+    date(2001, 9, 12): '9·11 事件',
+    date(2001, 9, 13): '9·11 事件',
+    date(2001, 9, 14): '9·11 事件',
+    date(2004, 6, 11): '里根国葬',
+    date(2007, 1, 2): '福特国葬',
+    date(2012, 10, 29): '飓风桑迪',
+    date(2012, 10, 30): '飓风桑迪',
+    date(2018, 12, 5): '老布什国葬',
+    date(2025, 1, 9): '卡特国葬',
+}
+
+WEEKDAY_NAMES = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+
+
+def easter(year):
+    """复活节日期（公历，Anonymous Gregorian 算法）"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """某月第 n 个星期几（n 为 -1 时取最后一个）"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """周六的节日提前到周五，周日的节日顺延到周一"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def holidays(year):
+    """
+    某一年的休市日（不含周末）
+
+    Returns:
+        dict: {日期: 节日名称}
+    """
+    result = {}
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        result[_observed(new_year)] = '元旦'
+    if year >= 1998:
+        result[_nth_weekday(year, 1, 0, 3)] = '马丁·路德·金纪念日'
+    result[_nth_weekday(year, 2, 0, 3)] = '总统日'
+    result[easter(year) - timedelta(days=2)] = '耶稣受难日'
+    result[_nth_weekday(year, 5, 0, -1)] = '阵亡将士纪念日'
+    if year >= 2022:
+        result[_observed(date(year, 6, 19))] = '六月节'
+    result[_observed(date(year, 7, 4))] = '独立日'
+    result[_nth_weekday(year, 9, 0, 1)] = '劳动节'
+    result[_nth_weekday(year, 11, 3, 4)] = '感恩节'
+    result[_observed(date(year, 12, 25))] = '圣诞节'
+    result.update((day, name) for day, name in SPECIAL_CLOSURES.items() if day.year == year)
+    return result
+
+
+def early_closes(year):
+    """
+    某一年的提前收盘日（13:00 收盘）
+
+    Returns:
+        dict: {日期: 说明}
+    """
+    result = {}
+    july3 = date(year, 7, 3)
+    if july3.weekday() < 4:
+        result[july3] = '独立日前夕'
+    result[_nth_weekday(year, 11, 3, 4) + timedelta(days=1)] = '感恩节次日'
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 4:
+        result[christmas_eve] = '平安夜'
+    closed = holidays(year)
+    return {day: name for day, name in result.items() if day not in closed}
+
+
+def to_date(value):
+    """
+    date / datetime / 'YYYY-MM-DD' -> date
+
+    带时区的时间先换算为纽约时间再取日期（北京时间凌晨对应的是纽约前一天的交易）
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(NEW_YORK)
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def market_now():
+    """当前纽约时间"""
+    return datetime.now(NEW_YORK)
+
+
+class TradingCalendar:
+    """预先展开的交易日历（逐日状态表 + 累计交易日数，各项查询均为 O(1)）"""
+
+    def __init__(self, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+        self.first = date(first_year, 1, 1)
+        self.last = date(last_year, 12, 31)
+        self.base = self.first.toordinal()
+        n_days = self.last.toordinal() - self.base + 1
+
+        # 先标记所有工作日，再清除节假日、标记提前收盘
+        status = bytearray([FULL_DAY]) * n_days
+        first_saturday = (5 - self.first.weekday()) % 7
+        for start in (first_saturday, first_saturday + 1):
+            status[start::7] = bytes(len(range(start, n_days, 7)))
+        self.names = {}
+        for year in range(first_year, last_year + 1):
+            for day, name in holidays(year).items():
+                if day.weekday() < 5:
+                    status[day.toordinal() - self.base] = CLOSED
+                    self.names[day] = name
+            for day, name in early_closes(year).items():
+                status[day.toordinal() - self.base] = HALF_DAY
+                self.names[day] = name
+        self.status = status
+
+        # before[i]：第 i 天之前的交易日数；sessions：全部交易日的序数（升序）
+        flags = status.translate(_IS_SESSION)
+        self.sessions = array('l', compress(range(self.base, self.base + n_days), flags))
+        self.before = array('l', [0])
+        self.before.extend(accumulate(flags))
+
+    def _index(self, day):
+        """日期在状态表中的位置，超出范围时返回 None"""
+        i = day.toordinal() - self.base
+        return i if 0 <= i < len(self.status) else None
+
+    def day_status(self, day):
+        """CLOSED / FULL_DAY / HALF_DAY"""
+        day = to_date(day)
+        i = self._index(day)
+        if i is not None:
+            return self.status[i]
+        if day.weekday() >= 5 or day in holidays(day.year):
+            return CLOSED
+        return HALF_DAY if day in early_closes(day.year) else FULL_DAY
+
+    def is_trading_day(self, day):
+        """是否为交易日"""
+        return self.day_status(day) != CLOSED
+
+    def is_early_close(self, day):
+        """是否提前收盘"""
+        return self.day_status(day) == HALF_DAY
+
+    def closed_reason(self, day):
+        """休市 / 提前收盘的原因（如 '感恩节'、'周六'），正常交易日返回 None"""
+        day = to_date(day)
+        status = self.day_status(day)
+        if status == FULL_DAY:
+            return None
+        if day.weekday() >= 5 and status == CLOSED:
+            return WEEKDAY_NAMES[day.weekday()]
+        if self._index(day) is not None:
+            return self.names.get(day)
+        return holidays(day.year).get(day) or early_closes(day.year).get(day)
+
+    def session_bounds(self, day):
+        """
+        交易时段（纽约时间）
+
+        Returns:
+            tuple: (开盘时间, 收盘时间)，休市日返回 None
+        """
+        day = to_date(day)
+        status = self.day_status(day)
+        if status == CLOSED:
+            return None
+        close = EARLY_CLOSE if status == HALF_DAY else SESSION_CLOSE
+        return (datetime.combine(day, SESSION_OPEN, NEW_YORK),
+                datetime.combine(day, close, NEW_YORK))
+
+    def is_open(self, now=None):
+        """当前是否在常规交易时段内"""
+        now = now or market_now()
+        bounds = self.session_bounds(now)
+        return bounds is not None and bounds[0] <= now.astimezone(NEW_YORK) < bounds[1]
+
+    def _position(self, day):
+        """(该日之前的交易日数, 截至该日的交易日数)"""
+        i = self._index(day)
+        if i is None:
+            raise ValueError(f"日期 {day} 超出交易日历范围 {self.first} ~ {self.last}")
+        return self.before[i], self.before[i + 1]
+
+    def next_trading_day(self, day, n=1):
+        """day 之后的第 n 个交易日（不含 day）"""
+        _, upto = self._position(to_date(day))
+        k = upto + n - 1
+        if k >= len(self.sessions):
+            raise ValueError(f"超出交易日历范围（{self.last}）")
+        return date.fromordinal(self.sessions[k])
+
+    def previous_trading_day(self, day, n=1):
+        """day 之前的第 n 个交易日（不含 day）"""
+        before, _ = self._position(to_date(day))
+        k = before - n
+        if k < 0:
+            raise ValueError(f"超出交易日历范围（{self.first}）")
+        return date.fromordinal(self.sessions[k])
+
+    def sessions_between(self, start, end):
+        """[start, end] 之间的全部交易日"""
+        lo, _ = self._position(to_date(start))
+        _, hi = self._position(to_date(end))
+        return [date.fromordinal(o) for o in self.sessions[lo:hi]]
+
+    def sessions_ending(self, end, count):
+        """截至 end（含）的最后 count 个交易日"""
+        _, hi = self._position(to_date(end))
+        if count > hi:
+            raise ValueError(f"超出交易日历范围（{self.first}）")
+        return [date.fromordinal(o) for o in self.sessions[hi - count:hi]]
+
+    def session_count(self, start, end):
+        """[start, end] 之间的交易日数"""
+        lo, _ = self._position(to_date(start))
+        _, hi = self._position(to_date(end))
+        return max(hi - lo, 0)
+
+    def last_closed_session(self, now=None):
+        """
+        最近一个已经收盘的交易日及其收盘时间
+
+        Returns:
+            tuple: (日期, 收盘时间)
+        """
+        now = (now or market_now()).astimezone(NEW_YORK)
+        day = now.date()
+        bounds = self.session_bounds(day)
+        if bounds is None or now < bounds[1]:
+            day = self.previous_trading_day(day)
+            bounds = self.session_bounds(day)
+        return day, bounds[1]
+
+
+_calendar = None
+
+
+def get_calendar():
+    """共用的交易日历（第一次调用时展开，约几毫秒）"""
+    global _calendar
+    if _calendar is None:
+        _calendar = TradingCalendar()
+    return _calendar
+
+
+def market_date(now=None):
+    """当前（或 now 对应的）纽约日期"""
+    return to_date(now or market_now())
+
+
+def is_trading_day(day=None):
+    """day（默认纽约今天）是否为交易日"""
+    return get_calendar().is_trading_day(day or market_now())
+
+
+def closed_reason(day=None):
+    """day（默认纽约今天）休市或提前收盘的原因"""
+    return get_calendar().closed_reason(day or market_now())
+
+
+def session_bounds(day=None):
+    """day（默认纽约今天）的交易时段，休市日返回 None"""
+    return get_calendar().session_bounds(day or market_now())
+
+
+def is_open(now=None):
+    """当前是否在常规交易时段内"""
+    return get_calendar().is_open(now)
+
+
+def next_trading_day(day=None, n=1):
+    return get_calendar().next_trading_day(day or market_now(), n)
+
+
+def previous_trading_day(day=None, n=1):
+    return get_calendar().previous_trading_day(day or market_now(), n)
+
+
+def sessions_between(start, end):
+    return get_calendar().sessions_between(start, end)
+
+
+def sessions_ending(end, count):
+    return get_calendar().sessions_ending(end, count)
+
+
+def last_closed_session(now=None):
+    return get_calendar().last_closed_session(now)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='美股交易日历')
+    parser.add_argument('--date', help='查询日期（YYYY-MM-DD，默认纽约今天）')
+    parser.add_argument('--year', type=int, help='列出该年的休市日与提前收盘日')
+    args = parser.parse_args()
+
+    calendar = get_calendar()
+    if args.year:
+        days = sorted({**holidays(args.year), **early_closes(args.year)}.items())
+        for day, name in days:
+            bounds = calendar.session_bounds(day)
+            state = f"{bounds[1]:%H:%M} 提前收盘" if bounds else '休市'
+            print(f"{day}  {WEEKDAY_NAMES[day.weekday()]}  {state:<10} {name}")
+        total = calendar.session_count(date(args.year, 1, 1), date(args.year, 12, 31))
+        print(f"\n{args.year} 年共 {total} 个交易日")
+        return
+
+    day = to_date(args.date) if args.date else market_date()
+    bounds = calendar.session_bounds(day)
+    if bounds is None:
+        print(f"{day} 休市（{calendar.closed_reason(day)}），下一个交易日：{calendar.next_trading_day(day)}")
+    else:
+        note = f"（{calendar.closed_reason(day)}）" if calendar.is_early_close(day) else ''
+        print(f"{day} 交易日：{bounds[0]:%H:%M} - {bounds[1]:%H:%M} 纽约时间{note}")
+
+
+if __name__ == '__main__':
+    main()
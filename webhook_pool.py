@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Webhook 连接池 - 按主机复用 keep-alive 连接，并发向多个 webhook 发送同一份数据
+
+每个主机维护一组空闲的 HTTP(S) 连接，发送完成后放回池中，
+后续请求不必重新建立 TCP 连接与 TLS 握手；
+fan_out 用线程池并发发送，同一份请求体（bytes）在所有接收方之间共享
+
+POST 不是幂等的：请求发出后连接断开时，服务端可能已经处理过这条消息，
+此时只有调用方声明可以安全重发（idempotent=True）才会重试，否则把错误交给调用方
+（飞书发送队列会按自己的退避策略重试）。
+配置了 HTTPS_PROXY / HTTP_PROXY 等代理环境变量时改用 urllib 发送（与原来的行为一致，不复用连接）
+"""
+
+import http.client
+import os
+import queue
+import select
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DEFAULT_POOL_SIZE = 16      # 每个主机最多保持的连接数
+DEFAULT_CONCURRENCY = 16    # 并发发送的最大请求数
+DEFAULT_TIMEOUT = 30.0
+
+# 复用的空闲连接可能已被服务端关闭：请求还没有完整发出时遇到这些错误，换一个新连接重试一次
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def _dropped(conn):
+    """空闲连接是否已被服务端关闭（套接字可读说明收到了 EOF 或多余数据，不能再用）"""
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class HostPool:
+    """单个主机的连接池"""
+
+    def __init__(self, scheme, host, port, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.connects = 0   # 新建连接次数（用于观察复用效果）
+
+    def _new_connection(self):
+        self.connects += 1
+        return self.connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _checkout(self):
+        """取一个空闲连接（跳过已被服务端关闭的），没有时新建，返回 (连接, 是否复用)"""
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                return self._new_connection(), False
+            if not _dropped(conn):
+                return conn, True
+            conn.close()
+
+    def request(self, method, path, body, headers, idempotent=False):
+        """
+        发送请求，返回 (状态码, 原因, 响应体 bytes)
+
+        Args:
+            idempotent: 请求可以安全重发（如带幂等键）；否则请求完整发出之后的断线不重试
+
+        Raises:
+            OSError / http.client.HTTPException: 网络错误
+        """
+        with self.slots:
+            conn, reused = self._checkout()
+            try:
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                except _STALE_ERRORS:
+                    # 请求没有完整发出，服务端不可能处理过，换新连接重发是安全的
+                    if not reused:
+                        raise
+                    conn.close()
+                    conn, reused = self._new_connection(), False
+                    conn.request(method, path, body=body, headers=headers)
+                try:
+                    response = self._read_response(conn)
+                except _STALE_ERRORS:
+                    if not (reused and idempotent):
+                        raise
+                    conn.close()
+                    conn = self._new_connection()
+                    conn.request(method, path, body=body, headers=headers)
+                    response = self._read_response(conn)
+            except Exception:
+                conn.close()
+                raise
+            status, reason, data, will_close = response
+            if will_close:
+                conn.close()
+            else:
+                self.idle.put(conn)
+            return status, reason, data
+
+    @staticmethod
+    def _read_response(conn):
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, response.reason, data, response.will_close
+
+    def close(self):
+        """关闭所有空闲连接"""
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class WebhookPool:
+    """按主机划分的连接池集合"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        """
+        Args:
+            pool_size: 每个主机最多同时使用的连接数
+            timeout: 单次请求超时（秒）
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def host_pool(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self.lock:
+            pool = self.hosts.get(key)
+            if pool is None:
+                pool = self.hosts[key] = HostPool(scheme, host, port, self.pool_size, self.timeout)
+            return pool
+
+    def post(self, url, body, content_type='application/json; charset=utf-8', idempotent=False):
+        """
+        POST 请求体（bytes）到 url，返回 (状态码, 原因, 响应体 bytes)
+
+        Args:
+            idempotent: 重复发送不会产生重复消息（如带幂等键），复用的连接断开时可以重发
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'https'
+        headers = {'Content-Type': content_type, 'Content-Length': str(len(body))}
+        if _uses_proxy(scheme, parts.hostname):
+            return self._post_urllib(url, body, headers)
+        port = parts.port or (443 if scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return self.host_pool(scheme, parts.hostname, port).request('POST', path, body, headers,
+                                                                    idempotent=idempotent)
+
+    def _post_urllib(self, url, body, headers):
+        """通过 urllib 发送（按环境变量使用代理）"""
+        request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.reason, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.reason, e.read()
+
+    def fan_out(self, urls, body, send=None, max_workers=DEFAULT_CONCURRENCY):
+        """
+        并发把同一份请求体发送到多个 url
+
+        Args:
+            urls: webhook 列表
+            body: 请求体 bytes（所有接收方共用）
+            send: 发送函数 send(url, body) -> 结果，默认为 self.post
+            max_workers: 最大并发数
+
+        Returns:
+            list: 与 urls 顺序一致的结果
+        """
+        send = send or self.post
+        urls = list(urls)
+        if len(urls) <= 1:
+            return [send(url, body) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return list(executor.map(lambda url: send(url, body), urls))
+
+    def close(self):
+        """关闭所有主机的空闲连接"""
+        with self.lock:
+            pools = list(self.hosts.values())
+        for pool in pools:
+            pool.close()
+
+
+def _uses_proxy(scheme, host):
+    """代理环境变量（HTTPS_PROXY / HTTP_PROXY / NO_PROXY）是否要求该请求走代理"""
+    return scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(host)
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_webhook_pool():
+    """进程内共享的连接池（池大小与超时可通过 MARCUS_FEISHU_POOL_SIZE / MARCUS_FEISHU_TIMEOUT 配置）"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = WebhookPool(
+                pool_size=int(os.environ.get('MARCUS_FEISHU_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                timeout=float(os.environ.get('MARCUS_FEISHU_TIMEOUT', DEFAULT_TIMEOUT)))
+        return _default_pool